@@ -0,0 +1,98 @@
+"""Near-duplicate check benchmark.
+
+Indexes the synthetic benchmark dataset (once; the index is stored in the
+database), then times duplicate checks for lightly edited copies of stored
+activities and for unrelated text, and checks the p99 against the budget.
+
+Usage::
+
+    python benchmarks/dedup_bench.py                    # 100k activities
+    python benchmarks/dedup_bench.py --size 1000000 --budget-ms 20
+"""
+import argparse
+import os
+import random
+import statistics
+import string
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from rerun_bench import build_dataset  # noqa: E402
+from helpize.dedup import DuplicateDetector  # noqa: E402
+from helpize.storage import ActivityStore  # noqa: E402
+
+SIZE = 100000
+CHECKS = 500
+BUDGET_MS = 10.0  # p99 per check
+
+
+def edited_copy(activity, rng):
+    """The activity as an organiser might resubmit it: reworded slightly."""
+    words = activity["about_event"].split()
+    edit = rng.randrange(3)
+    if edit == 0 and len(words) > 2:
+        i = rng.randrange(len(words) - 1)
+        words[i], words[i + 1] = words[i + 1], words[i]
+    elif edit == 1:
+        words.append(rng.choice(["!", "(updated)", "- all welcome"]))
+    else:
+        words = [word.capitalize() for word in words]
+    return {"about_event": " ".join(words), "place": activity["place"], "date": activity["date"]}
+
+
+def unrelated(rng):
+    words = ["".join(rng.choices(string.ascii_lowercase, k=rng.randrange(4, 9))) for _ in range(6)]
+    return {"about_event": " ".join(words), "place": rng.choice(["Dockyard", "Hilltop", "Airport"]),
+            "date": f"2025-{rng.randrange(1, 13):02d}-{rng.randrange(1, 29):02d}"}
+
+
+def timed_checks(detector, activities):
+    timings, flagged = [], 0
+    for activity in activities:
+        started = time.perf_counter()
+        check = detector.check(activity)
+        timings.append((time.perf_counter() - started) * 1000)
+        flagged += check.duplicate_of is not None
+    timings.sort()
+    return timings, flagged
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Near-duplicate check benchmark")
+    parser.add_argument("--size", type=int, default=SIZE)
+    parser.add_argument("--checks", type=int, default=CHECKS)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    store = ActivityStore(build_dataset(args.size))
+    detector = DuplicateDetector(store)
+    started = time.perf_counter()
+    indexed = 0
+    while count := detector.index_backlog():
+        indexed += count
+    if indexed:
+        print(f"indexed {indexed} activities in {time.perf_counter() - started:.1f} s (once per dataset)")
+
+    rng = random.Random(0)
+    sample = [store.get_activity(activity_id) for activity_id in rng.sample(range(1, args.size + 1), args.checks)]
+    copies, copies_flagged = timed_checks(detector, [edited_copy(activity, rng) for activity in sample])
+    fresh, fresh_flagged = timed_checks(detector, [unrelated(rng) for _ in range(args.checks)])
+    timings = sorted(copies + fresh)
+    p99 = timings[int(len(timings) * 0.99) - 1]
+
+    print(f"{args.size} activities: check p50 {statistics.median(timings):.2f} ms, p99 {p99:.2f} ms, "
+          f"max {timings[-1]:.2f} ms over {len(timings)} checks")
+    print(f"  edited copies flagged: {copies_flagged}/{len(copies)}; "
+          f"unrelated text flagged: {fresh_flagged}/{len(fresh)}")
+    if p99 > args.budget_ms:
+        print(f"  FAILED: p99 above the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+"""Posts-feed ranking benchmark.
+
+Scores every activity of the synthetic benchmark dataset for a set of
+random user profiles and checks that ranking stays under the budget.
+
+Usage::
+
+    python benchmarks/ranking_bench.py                  # 100k activities
+    python benchmarks/ranking_bench.py --size 1000000 --budget-ms 200
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from rerun_bench import PLACES, build_dataset  # noqa: E402
+from helpize.ranking import ActivityColumns, UserProfile, rank  # noqa: E402
+from helpize.storage import CAUSES, ActivityStore  # noqa: E402
+
+SIZE = 100000
+PROFILES = 200
+BUDGET_MS = 50.0  # p99 per ranking
+TOP_K = 20
+
+
+def random_profile(rng):
+    interactions = [(rng.choice(CAUSES), rng.choice(PLACES), rng.choice([1.0, 2.0]))
+                    for _ in range(rng.randrange(0, 30))]
+    return UserProfile(interactions)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Posts-feed ranking benchmark")
+    parser.add_argument("--size", type=int, default=SIZE)
+    parser.add_argument("--profiles", type=int, default=PROFILES)
+    parser.add_argument("--budget-ms", type=float, default=BUDGET_MS)
+    args = parser.parse_args(argv)
+
+    store = ActivityStore(build_dataset(args.size))
+    started = time.perf_counter()
+    columns = ActivityColumns(store.ranking_rows())
+    build_ms = (time.perf_counter() - started) * 1000
+
+    rng = random.Random(0)
+    profiles = [random_profile(rng) for _ in range(args.profiles)]
+    rank(columns, profiles[0], TOP_K)  # warm-up
+    timings = []
+    for profile in profiles:
+        started = time.perf_counter()
+        rank(columns, profile, TOP_K)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    p99 = timings[int(len(timings) * 0.99) - 1]
+
+    print(f"{len(columns)} activities: columns built in {build_ms:.0f} ms (in the background after each change)")
+    print(f"  rank top {TOP_K}: p50 {statistics.median(timings):.2f} ms, p99 {p99:.2f} ms, "
+          f"max {timings[-1]:.2f} ms over {len(timings)} profiles")
+    if p99 > args.budget_ms:
+        print(f"  FAILED: p99 above the {args.budget_ms:.0f} ms budget")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""Concurrent registration load test.
+
+Many simulated sessions, spread over several processes with several threads
+each, sign up for the same event at once. Some of them cancel again, which
+promotes waitlisted users. Afterwards the run checks that the event was never
+overbooked and that its seat counter matches the registration rows, and it
+reports throughput and latency.
+
+Usage::
+
+    python benchmarks/registration_load.py                       # 500 users, 50 seats
+    python benchmarks/registration_load.py --users 2000 --capacity 100 --processes 8
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from multiprocessing import Pool
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from helpize.storage import REGISTERED, WAITLISTED, ActivityStore  # noqa: E402
+
+USERS = 500
+CAPACITY = 50
+PROCESSES = 4
+THREADS = 8
+CANCEL_EVERY = 10  # every Nth user cancels right after signing up
+
+
+def session(store, activity_id, user_id, cancel, barrier, latencies):
+    barrier.wait()  # release every thread of this process at once
+    started = time.perf_counter()
+    store.register(activity_id, user_id)
+    latencies.append(time.perf_counter() - started)
+    if cancel:
+        store.cancel_registration(activity_id, user_id)
+
+
+def worker(args):
+    """Run one process's share of sessions; returns register latencies."""
+    path, activity_id, user_ids, threads = args
+    store = ActivityStore(path)
+    latencies = []
+    for start in range(0, len(user_ids), threads):
+        chunk = user_ids[start:start + threads]
+        barrier = threading.Barrier(len(chunk))
+        pool = [
+            threading.Thread(target=session, args=(
+                store, activity_id, user_id, int(user_id.split("-")[0]) % CANCEL_EVERY == 0, barrier, latencies,
+            ))
+            for user_id in chunk
+        ]
+        for thread in pool:
+            thread.start()
+        for thread in pool:
+            thread.join()
+    return latencies
+
+
+def check(store, activity_id, capacity, users):
+    """Return a list of broken invariants (empty when the run was correct)."""
+    conn = store._connect()
+    counts = dict(conn.execute(
+        "SELECT status, COUNT(*) FROM registrations WHERE activity_id = ? GROUP BY status", (activity_id,)
+    ).fetchall())
+    counter = store.get_activity(activity_id)["registered_count"]
+    cancelled = sum(1 for i in range(users) if i % CANCEL_EVERY == 0)
+    problems = []
+    if counts.get(REGISTERED, 0) > capacity:
+        problems.append(f"overbooked: {counts.get(REGISTERED)} registered for {capacity} seats")
+    if counter != counts.get(REGISTERED, 0):
+        problems.append(f"counter says {counter}, table has {counts.get(REGISTERED, 0)} registered")
+    if counts.get(REGISTERED, 0) + counts.get(WAITLISTED, 0) != users - cancelled:
+        problems.append(f"{sum(counts.values())} registrations for {users - cancelled} remaining users")
+    if counts.get(WAITLISTED) and counts.get(REGISTERED, 0) < capacity:
+        problems.append("free seats left while users wait on the waitlist")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent registration load test")
+    parser.add_argument("--users", type=int, default=USERS)
+    parser.add_argument("--capacity", type=int, default=CAPACITY)
+    parser.add_argument("--processes", type=int, default=PROCESSES)
+    parser.add_argument("--threads", type=int, default=THREADS, help="concurrent sessions per process")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "registrations.db")
+        store = ActivityStore(path)
+        activity_id = store.add_activity({
+            "registration_link": "https://example.org/relief",
+            "date": "2030-01-01",
+            "place": "Harbor",
+            "about_event": "Flood relief sign-up rush",
+            "cause": "Disaster Relief",
+            "poster": "poster.png",
+            "capacity": args.capacity,
+        })
+        user_ids = [f"{i}-{uuid.uuid4().hex[:8]}" for i in range(args.users)]
+        shares = [(path, activity_id, user_ids[i::args.processes], args.threads) for i in range(args.processes)]
+
+        started = time.perf_counter()
+        with Pool(args.processes) as pool:
+            latencies = [latency for share in pool.map(worker, shares) for latency in share]
+        seconds = time.perf_counter() - started
+
+        latencies.sort()
+        print(f"{args.users} sessions ({args.processes} processes x {args.threads} threads) "
+              f"for {args.capacity} seats in {seconds:.2f}s ({args.users / seconds:.0f} sign-ups/s)")
+        print(f"  register latency: p50 {statistics.median(latencies) * 1000:.1f} ms, "
+              f"p99 {latencies[int(len(latencies) * 0.99) - 1] * 1000:.1f} ms, "
+              f"max {latencies[-1] * 1000:.1f} ms")
+        problems = check(store, activity_id, args.capacity, args.users)
+    for problem in problems:
+        print(f"  FAILED: {problem}")
+    if not problems:
+        print("  OK: never overbooked, counter matches the registrations")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""Rerun-latency benchmarks for event.py, dash.py and daw.py.
+
+Drives every navigation path through ``streamlit.testing.v1.AppTest``
+against synthetic datasets and records, per rerun, the wall time, the
+number of rendered elements and the peak Python allocation. Results are
+compared with ``benchmarks/baselines.json``; any step slower than the
+baseline by more than the threshold fails the run.
+
+Usage::
+
+    python benchmarks/rerun_bench.py                      # compare with baselines
+    python benchmarks/rerun_bench.py --sizes 10 1000      # smaller run
+    python benchmarks/rerun_bench.py --update-baseline    # record new baselines
+
+Each (script, size) pair runs in its own subprocess, on its own copy of
+the dataset, so resource caches, imports, peak memory and the posts the
+journey claims, accepts and submits never leak between measurements.
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(BENCH_DIR, ".data")
+BASELINE_PATH = os.path.join(BENCH_DIR, "baselines.json")
+
+SCRIPTS = ["event.py", "dash.py", "daw.py"]
+SIZES = [10, 1000, 100000]
+REPEAT = 3
+THRESHOLD = 0.25  # allowed slowdown over baseline
+MIN_REGRESSION_MS = 5.0  # ignore noise on very fast steps
+
+
+# ---------- SYNTHETIC DATA ----------
+WORDS = ["cleanup", "food", "drive", "blood", "donation", "tutoring", "park", "shelter",
+         "relief", "camp", "library", "river", "seniors", "kits", "workshop", "planting"]
+PLACES = ["City Hall", "Central Park", "Riverside", "North Library", "Community Center",
+          "Main Street", "Harbor", "Old Town", "East School", "Stadium"]
+
+
+def build_dataset(size):
+    """Create (or reuse) a database with ``size`` synthetic activities."""
+    sys.path.insert(0, ROOT)
+    from helpize.storage import CAUSES, VISIBILITIES, ActivityStore
+
+    path = os.path.join(DATA_DIR, f"activities-{size}.db")
+    os.makedirs(DATA_DIR, exist_ok=True)
+    store = ActivityStore(path)
+    existing = store.count_activities(visibility=None)
+    if existing >= size:
+        return path
+    rng = random.Random(size)
+    start = date.today()
+    batch = []
+    for i in range(existing, size):
+        batch.append({
+            "registration_link": f"https://example.org/register/{i}",
+            "activity_file": None,
+            "date": str(start + timedelta(days=rng.randrange(365))),
+            "place": rng.choice(PLACES),
+            "about_event": " ".join(rng.sample(WORDS, 4)) + f" #{i}",
+            "cause": rng.choice(CAUSES),
+            "poster": "poster.png",
+            "visibility": rng.choice(VISIBILITIES),
+        })
+        if len(batch) == 5000:
+            store.add_activities(batch)
+            batch = []
+    if batch:
+        store.add_activities(batch)
+    return path
+
+
+# ---------- JOURNEY ----------
+class Skip(Exception):
+    """The step doesn't apply to this script (e.g. no Dashboard in event.py)."""
+
+
+def switch(page):
+    def step(at):
+        try:
+            at.switch_page(f"helpize/pages/{page}.py")
+        except ValueError:
+            raise Skip(f"no {page} page")
+        at.run()
+    return step
+
+
+def click(label):
+    def step(at):
+        buttons = [button for button in at.button if button.label == label and not button.disabled]
+        if not buttons:
+            raise Skip(f"no {label!r} button")
+        buttons[0].click().run()
+    return step
+
+
+def open_tab(key, label):
+    def step(at):
+        if key not in at.session_state:
+            raise Skip(f"no {label!r} tab")
+        at.session_state[key] = label
+        at.run()
+    return step
+
+
+def search(text):
+    def step(at):
+        at.text_input(key="posts_query").input(text).run()
+    return step
+
+
+# A 1x1 PNG for the poster upload
+POSTER = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+def widget(widgets, label):
+    for candidate in widgets:
+        if candidate.label == label:
+            return candidate
+    raise Skip(f"no {label!r} field")
+
+
+def submit_activity(at):
+    """Fill in every required field of the Submit Activity form and submit it."""
+    widget(at.text_input, "Registration Link").input("https://example.org/register/bench")
+    widget(at.text_input, "Place").input("City Hall")
+    widget(at.text_area, "About the Event").input("Benchmark relief drive")
+    widget(at.selectbox, "Cause").select("Disaster Relief")
+    widget(at.file_uploader, "Poster (Image Upload)").upload("poster.png", POSTER, "image/png")
+    click("Submit Activity")(at)
+
+
+# Every step is exactly one rerun. AppTest doesn't follow st.switch_page()
+# calls made by the script, so accepted posts in daw.py reach the Dashboard
+# through the explicit "nav dashboard" step.
+JOURNEY = [
+    ("home", lambda at: at.run()),
+    ("nav profile", switch("profile")),
+    ("profile > my posts", click("My Posts")),
+    ("my posts > public", click("Public")),
+    ("public > claim batch", click("Claim next 10 posts")),
+    ("public > accepted", click("Accepted")),
+    ("nav dashboard", switch("dashboard")),
+    ("dashboard > next page", click("Next ➡️")),
+    ("dashboard > submit (invalid)", click("Submit Activity")),
+    ("dashboard > submit activity", submit_activity),
+    ("dashboard > next month", click("Next Month ➡️")),
+    ("dashboard > analytics", open_tab("dashboard_tab", "Analytics")),
+    ("nav posts", switch("posts")),
+    ("posts > search", search("food drive")),
+    ("nav profile again", switch("profile")),
+    ("profile > my posts again", click("My Posts")),
+    ("my posts > private", click("Private")),
+    ("nav settings", switch("settings")),
+    ("nav help", switch("help")),
+]
+
+
+def count_elements(node):
+    children = getattr(node, "children", None) or {}
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def run_journey(script, trace_memory=False):
+    """Run the journey once; returns {step: (ms, elements, peak_kb) or None}."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(os.path.join(ROOT, script), default_timeout=120)
+    results = {}
+    for name, step in JOURNEY:
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        try:
+            step(at)
+        except Skip:
+            results[name] = None
+            continue
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            peak = tracemalloc.get_traced_memory()[1] / 1024 if trace_memory else None
+            if trace_memory:
+                tracemalloc.stop()
+        if at.exception:
+            raise RuntimeError(f"{script} {name}: {at.exception[0].value}")
+        results[name] = (elapsed, count_elements(at._tree), peak)
+    return results
+
+
+def worker(script, size, repeat):
+    """Measure one script against one dataset and print JSON to stdout."""
+    os.chdir(ROOT)
+    timings = {name: [] for name, _ in JOURNEY}
+    elements = {}
+    run_journey(script)  # warm-up: first-time imports and resource creation
+    for _ in range(repeat):
+        for name, result in run_journey(script).items():
+            if result is not None:
+                timings[name].append(result[0])
+                elements[name] = result[1]
+    memory = run_journey(script, trace_memory=True)
+    steps = {}
+    for name, _ in JOURNEY:
+        if not timings[name]:
+            continue
+        steps[name] = {
+            "ms": round(statistics.median(timings[name]), 2),
+            "elements": elements[name],
+            "peak_kb": round(memory[name][2], 1) if memory.get(name) else None,
+        }
+    json.dump(steps, sys.stdout)
+
+
+# ---------- DRIVER ----------
+def measure(script, size, repeat):
+    workdir = tempfile.mkdtemp(prefix="helpize-bench-")
+    database = os.path.join(workdir, "helpize.db")
+    shutil.copy(build_dataset(size), database)
+    env = dict(
+        os.environ,
+        HELPIZE_DB=database,
+        HELPIZE_BLOBS=os.path.join(workdir, "blobs"),
+        HELPIZE_EVENT_LOG=os.path.join(workdir, "events"),
+        HELPIZE_METRICS_PORT="0",
+    )
+    try:
+        output = subprocess.run(
+            [sys.executable, __file__, "--worker", script, str(size), "--repeat", str(repeat)],
+            env=env, capture_output=True, text=True,
+        )
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    if output.returncode != 0:
+        raise RuntimeError(f"{script} at {size} activities failed:\n{output.stderr}")
+    return json.loads(output.stdout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rerun-latency benchmarks")
+    parser.add_argument("--scripts", nargs="+", default=SCRIPTS)
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--worker", nargs=2, metavar=("SCRIPT", "SIZE"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker:
+        worker(args.worker[0], int(args.worker[1]), args.repeat)
+        return 0
+
+    baselines = {}
+    if os.path.exists(BASELINE_PATH):
+        with open(BASELINE_PATH) as f:
+            baselines = json.load(f)
+
+    regressions = []
+    for script in args.scripts:
+        for size in args.sizes:
+            steps = measure(script, size, args.repeat)
+            baseline = baselines.get(script, {}).get(str(size), {})
+            print(f"\n{script} — {size} activities")
+            print(f"  {'step':<30} {'ms':>9} {'base ms':>9} {'elements':>9} {'peak KB':>9}")
+            for name, result in steps.items():
+                base = baseline.get(name, {}).get("ms")
+                flag = ""
+                if base is not None and result["ms"] > base * (1 + args.threshold) \
+                        and result["ms"] - base > MIN_REGRESSION_MS:
+                    flag = "  REGRESSION"
+                    regressions.append((script, size, name, base, result["ms"]))
+                print(f"  {name:<30} {result['ms']:>9.1f} {base if base is not None else '-':>9} "
+                      f"{result['elements']:>9} {result['peak_kb'] if result['peak_kb'] is not None else '-':>9}{flag}")
+            if args.update_baseline:
+                baselines.setdefault(script, {})[str(size)] = steps
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nBaselines written to {os.path.relpath(BASELINE_PATH, ROOT)}")
+        return 0
+
+    if regressions:
+        print(f"\n{len(regressions)} step(s) slower than baseline by more than {args.threshold:.0%}:")
+        for script, size, name, base, ms in regressions:
+            print(f"  {script} @ {size}: {name} {base:.1f} -> {ms:.1f} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
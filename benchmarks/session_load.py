@@ -0,0 +1,497 @@
+"""Concurrent-session load test against a running Streamlit server.
+
+``rerun_bench.py`` drives one AppTest session at a time in-process. This
+script instead opens many websocket sessions to a real ``streamlit run``
+server and speaks the browser's protocol: every step sends the BackMsg a
+browser would (page changes, widget values, button triggers, a poster
+upload) and waits for the run to finish. Each session walks the journey
+below once, and all sessions of a level start together, the way volunteers
+arrive right after an announcement.
+
+Per concurrency level it reports throughput, latency percentiles per step,
+failures, the server's CPU and RSS, and the CPU and peak RSS of every
+load-generating worker process.
+
+Usage::
+
+    python benchmarks/session_load.py --start dash.py                      # 10, 50, 200 sessions
+    python benchmarks/session_load.py --start daw.py --levels 100 500 2000 --workers 8
+    python benchmarks/session_load.py --url http://localhost:8501 --server-pid 1234
+
+``--start`` runs the server on a copy of a synthetic dataset (see
+``rerun_bench.build_dataset``) so submitted activities don't accumulate.
+Server CPU and RSS are read from /proc, so they are only reported on Linux.
+Thousands of sessions need a matching ``ulimit -n`` on both sides. Needs
+aiohttp.
+"""
+import argparse
+import asyncio
+import os
+import resource
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from multiprocessing import Pool
+from urllib.parse import urlsplit
+
+import aiohttp
+from yarl import URL
+from streamlit.proto.Alert_pb2 import Alert
+from streamlit.proto.BackMsg_pb2 import BackMsg
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+
+LEVELS = [10, 50, 200]
+WORKERS = 4
+DATASET_SIZE = 1000
+PORT = 8599
+STEP_TIMEOUT = 120  # seconds before a step counts as failed
+XSRF_COOKIE = "_streamlit_xsrf"
+
+# Finished statuses that end a step (an early finish means another run follows)
+FINISHED = {ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY}
+EARLY = ForwardMsg.FINISHED_EARLY_FOR_RERUN
+
+# A 1x1 PNG for the poster upload
+POSTER = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000154a24f5d0000000049454e44ae426082"
+)
+
+
+# ---------- PROTOCOL ----------
+class StepFailed(Exception):
+    """The server reported an exception or the expected widget was missing."""
+
+
+class Skip(Exception):
+    """The step doesn't apply to this script (e.g. no Accept flow in event.py)."""
+
+
+class Session:
+    """One browser tab: a websocket plus the widgets of the last run."""
+
+    def __init__(self, http, base_url, number):
+        self.http = http
+        self.base_url = base_url
+        self.number = number
+        self.ws = None
+        self.session_id = None
+        self.query_string = ""
+        self.pages = {}  # url path -> page script hash
+        self.page_hash = ""
+        self.widgets = {}  # (element type, label) -> (widget id, fragment id)
+        self.errors = []
+        self.received = 0  # bytes
+
+    async def connect(self):
+        url = self.base_url.replace("http", "ws", 1) + "/_stcore/stream"
+        self.ws = await self.http.ws_connect(url, protocols=("streamlit",), max_msg_size=0)
+
+    async def close(self):
+        if self.ws is not None:
+            await self.ws.close()
+
+    async def rerun(self, page=None, widget_states=(), fragment_id=""):
+        """Send one rerun and read messages until the run (and any page switch) finishes."""
+        msg = BackMsg()
+        rerun = msg.rerun_script
+        rerun.query_string = self.query_string
+        rerun.page_script_hash = self.pages[page] if page is not None else self.page_hash
+        rerun.fragment_id = fragment_id
+        rerun.widget_states.widgets.extend(widget_states)
+        await self.ws.send_bytes(msg.SerializeToString())
+        if not fragment_id:
+            self.widgets = {}
+        self.errors = []
+        while True:
+            status = await self._receive()
+            if status in FINISHED:
+                break
+            if status != EARLY:
+                raise StepFailed(f"script finished with status {status}")
+        if self.errors:
+            raise StepFailed(self.errors[0])
+
+    async def _receive(self):
+        """Handle forward messages up to the next script_finished; returns its status."""
+        while True:
+            message = await self.ws.receive()
+            if message.type != aiohttp.WSMsgType.BINARY:
+                raise StepFailed(f"websocket closed ({message.type.name})")
+            self.received += len(message.data)
+            forward = ForwardMsg()
+            forward.ParseFromString(message.data)
+            kind = forward.WhichOneof("type")
+            if kind == "delta":
+                self._on_delta(forward.delta)
+            elif kind == "new_session":
+                self.session_id = self.session_id or forward.new_session.initialize.session_id
+                self.page_hash = forward.new_session.page_script_hash
+            elif kind == "navigation":
+                self.pages = {page.url_pathname: page.page_script_hash for page in forward.navigation.app_pages}
+                self.page_hash = forward.navigation.page_script_hash or self.page_hash
+            elif kind == "page_info_changed":
+                self.query_string = forward.page_info_changed.query_string
+            elif kind == "script_finished":
+                return forward.script_finished
+
+    def _on_delta(self, delta):
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "exception":
+            self.errors.append(f"{element.exception.type}: {element.exception.message}")
+            return
+        if kind == "alert" and element.alert.format == Alert.ERROR:
+            # st.error(), e.g. a rejected form or a denied Dashboard
+            self.errors.append(element.alert.body)
+            return
+        widget = getattr(element, kind)
+        widget_id = getattr(widget, "id", "")
+        if widget_id and hasattr(widget, "label"):
+            self.widgets.setdefault((kind, widget.label), (widget_id, delta.fragment_id))
+
+    def widget(self, kind, label):
+        try:
+            return self.widgets[(kind, label)]
+        except KeyError:
+            raise Skip(f"no {kind} {label!r}")
+
+    async def click(self, label):
+        widget_id, fragment_id = self.widget("button", label)
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = widget_id
+        state.trigger_value = True
+        await self.rerun(widget_states=[state], fragment_id=fragment_id)
+
+    async def upload(self, name, data):
+        """Upload a file the way st.file_uploader does; returns its UploadedFileInfo fields."""
+        msg = BackMsg()
+        request = msg.file_urls_request
+        request.request_id = f"upload-{self.number}"
+        request.file_names.append(name)
+        request.session_id = self.session_id
+        await self.ws.send_bytes(msg.SerializeToString())
+        while True:
+            message = await self.ws.receive()
+            if message.type != aiohttp.WSMsgType.BINARY:
+                raise StepFailed("websocket closed during upload")
+            forward = ForwardMsg()
+            forward.ParseFromString(message.data)
+            if forward.WhichOneof("type") == "file_urls_response":
+                break
+        response = forward.file_urls_response
+        if response.error_msg:
+            raise StepFailed(response.error_msg)
+        urls = response.file_urls[0]
+        form = aiohttp.FormData()
+        form.add_field("file", data, filename=name, content_type="image/png")
+        headers = {}
+        xsrf = self.http.cookie_jar.filter_cookies(URL(self.base_url)).get(XSRF_COOKIE)
+        if xsrf is not None:
+            headers["X-Xsrftoken"] = xsrf.value
+        async with self.http.put(self.base_url + urls.upload_url, data=form, headers=headers) as put:
+            if put.status != 204 and put.status != 200:
+                raise StepFailed(f"upload returned HTTP {put.status}")
+        return urls
+
+
+# ---------- JOURNEY ----------
+async def open_app(session):
+    await session.rerun()
+
+
+def navigate(page):
+    async def step(session):
+        if page not in session.pages:
+            raise Skip(f"no {page} page")
+        await session.rerun(page=page)
+    return step
+
+
+def click(label):
+    async def step(session):
+        await session.click(label)
+    return step
+
+
+async def submit_activity(session):
+    """Fill in and submit the Submit Activity form, poster included."""
+    fields = {
+        ("text_input", "Registration Link"): f"https://example.org/register/load-{session.number}",
+        ("text_input", "Place"): "City Hall",
+        ("text_area", "About the Event"): f"Load test relief drive #{session.number}",
+        ("selectbox", "Cause"): "Disaster Relief",
+    }
+    states = []
+    for key, value in fields.items():
+        state = BackMsg().rerun_script.widget_states.widgets.add()
+        state.id = session.widget(*key)[0]
+        state.string_value = value
+        states.append(state)
+    poster_id = session.widget("file_uploader", "Poster (Image Upload)")[0]
+    urls = await session.upload("poster.png", POSTER)
+    state = BackMsg().rerun_script.widget_states.widgets.add()
+    state.id = poster_id
+    info = state.file_uploader_state_value.uploaded_file_info.add()
+    info.name = "poster.png"
+    info.size = len(POSTER)
+    info.file_id = urls.file_id
+    info.file_urls.CopyFrom(urls)
+    states.append(state)
+    submit = BackMsg().rerun_script.widget_states.widgets.add()
+    submit.id = session.widget("button", "Submit Activity")[0]
+    submit.trigger_value = True
+    states.append(submit)
+    await session.rerun(widget_states=states)
+
+
+# Every step is one BackMsg (plus the upload for the submission). In daw.py
+# the Dashboard is only reachable after accepting a post, so the journey goes
+# through Profile first; the Accept step is skipped where it doesn't apply.
+JOURNEY = [
+    ("open app", open_app),
+    ("nav profile", navigate("profile")),
+    ("profile > my posts", click("My Posts")),
+    ("my posts > public", click("Public")),
+    ("public > accepted", click("Accepted")),
+    ("nav dashboard", navigate("dashboard")),
+    ("dashboard > submit activity", submit_activity),
+    ("dashboard > view activities", click("Next ➡️")),
+]
+
+
+async def run_session(http, base_url, number, start):
+    """Walk the journey once; returns ({step: seconds}, {step: error}, bytes)."""
+    session = Session(http, base_url, number)
+    timings, failures = {}, {}
+    await start.wait()
+    try:
+        await asyncio.wait_for(session.connect(), STEP_TIMEOUT)
+        for name, step in JOURNEY:
+            started = time.perf_counter()
+            try:
+                await asyncio.wait_for(step(session), STEP_TIMEOUT)
+            except Skip:
+                continue
+            except (StepFailed, aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                failures[name] = str(exc) or type(exc).__name__
+                break
+            timings[name] = time.perf_counter() - started
+    except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+        failures["connect"] = str(exc) or type(exc).__name__
+    finally:
+        await session.close()
+    return timings, failures, session.received
+
+
+async def run_sessions(base_url, numbers):
+    connector = aiohttp.TCPConnector(limit=0)
+    async with aiohttp.ClientSession(connector=connector, cookie_jar=aiohttp.CookieJar(unsafe=True)) as http:
+        # The health endpoint sets the XSRF cookie uploads are checked against
+        async with http.get(base_url + "/_stcore/health") as response:
+            response.raise_for_status()
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(run_session(http, base_url, number, start)) for number in numbers]
+        start.set()
+        return await asyncio.gather(*tasks)
+
+
+def worker(args):
+    """Run one process's share of the sessions; returns results plus this process's CPU and RSS."""
+    base_url, numbers = args
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu = usage.ru_utime + usage.ru_stime
+    results = asyncio.run(run_sessions(base_url, numbers))
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {
+        "pid": os.getpid(),
+        "results": results,
+        "cpu": usage.ru_utime + usage.ru_stime - cpu,
+        "max_rss_mb": usage.ru_maxrss / 1024,
+    }
+
+
+# ---------- SERVER ----------
+class ProcessSampler:
+    """CPU seconds and RSS of a process (and its children) from /proc."""
+
+    def __init__(self, pid):
+        self.pid = pid
+
+    def _pids(self):
+        pids = [self.pid]
+        children = f"/proc/{self.pid}/task/{self.pid}/children"
+        if os.path.exists(children):
+            with open(children) as f:
+                pids += [int(pid) for pid in f.read().split()]
+        return pids
+
+    def cpu_seconds(self):
+        ticks = os.sysconf("SC_CLK_TCK")
+        total = 0
+        for pid in self._pids():
+            try:
+                with open(f"/proc/{pid}/stat") as f:
+                    fields = f.read().rsplit(")", 1)[1].split()
+            except FileNotFoundError:
+                continue
+            total += int(fields[11]) + int(fields[12])  # utime, stime
+        return total / ticks
+
+    def rss_mb(self):
+        total = 0
+        for pid in self._pids():
+            try:
+                with open(f"/proc/{pid}/status") as f:
+                    total += next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+            except (FileNotFoundError, StopIteration):
+                continue
+        return total / 1024
+
+
+def start_server(script, port, size):
+    """``streamlit run`` on a throwaway copy of the synthetic dataset."""
+    sys.path.insert(0, BENCH_DIR)
+    from rerun_bench import build_dataset
+
+    workdir = tempfile.mkdtemp(prefix="helpize-load-")
+    database = os.path.join(workdir, "helpize.db")
+    shutil.copy(build_dataset(size), database)
+    env = dict(
+        os.environ,
+        HELPIZE_DB=database,
+        HELPIZE_BLOBS=os.path.join(workdir, "blobs"),
+        HELPIZE_METRICS_PORT="0",
+    )
+    server = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", script, "--server.headless", "true",
+         "--server.port", str(port), "--browser.gatherUsageStats", "false"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    return server, workdir
+
+
+def wait_until_healthy(base_url, timeout=60):
+    async def poll():
+        deadline = time.monotonic() + timeout
+        async with aiohttp.ClientSession() as http:
+            while time.monotonic() < deadline:
+                try:
+                    async with http.get(base_url + "/_stcore/health") as response:
+                        if response.status == 200:
+                            return
+                except aiohttp.ClientError:
+                    pass
+                await asyncio.sleep(0.5)
+        raise SystemExit(f"server at {base_url} did not become healthy in {timeout}s")
+    asyncio.run(poll())
+
+
+# ---------- DRIVER ----------
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run_level(base_url, sessions, workers, sampler, first_number):
+    numbers = list(range(first_number, first_number + sessions))
+    shares = [(base_url, numbers[i::workers]) for i in range(workers) if numbers[i::workers]]
+    server_cpu = sampler.cpu_seconds() if sampler else None
+    started = time.perf_counter()
+    with Pool(len(shares)) as pool:
+        reports = pool.map(worker, shares)
+    elapsed = time.perf_counter() - started
+
+    timings = {name: [] for name, _ in JOURNEY}
+    failures = {}
+    received = 0
+    completed = 0
+    for report in reports:
+        for session_timings, session_failures, session_bytes in report["results"]:
+            received += session_bytes
+            completed += not session_failures
+            for name, seconds in session_timings.items():
+                timings[name].append(seconds)
+            for name, error in session_failures.items():
+                failures.setdefault(name, {}).setdefault(error, 0)
+                failures[name][error] += 1
+    steps = sum(len(values) for values in timings.values())
+
+    print(f"\n{sessions} sessions on {len(shares)} workers: {elapsed:.1f}s, "
+          f"{steps / elapsed:.1f} steps/s, {completed}/{sessions} journeys completed, "
+          f"{received / 1024 / 1024:.1f} MB received")
+    print(f"  {'step':<32}{'n':>6}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    everything = []
+    for name, _ in JOURNEY:
+        values = timings[name]
+        if not values:
+            continue
+        everything += values
+        print(f"  {name:<32}{len(values):>6}" + "".join(
+            f"{percentile(values, pct) * 1000:>10.0f}" for pct in (50, 90, 99, 100)))
+    if everything:
+        print(f"  {'all steps':<32}{len(everything):>6}" + "".join(
+            f"{percentile(everything, pct) * 1000:>10.0f}" for pct in (50, 90, 99, 100)))
+    for name, errors in failures.items():
+        for error, count in errors.items():
+            print(f"  FAILED {name}: {count} x {error}")
+    if sampler:
+        cpu = sampler.cpu_seconds() - server_cpu
+        print(f"  server: {cpu / elapsed * 100:.0f}% CPU, {sampler.rss_mb():.0f} MB RSS")
+    for report in reports:
+        print(f"  worker {report['pid']}: {report['cpu'] / elapsed * 100:.0f}% CPU, "
+              f"{report['max_rss_mb']:.0f} MB peak RSS")
+    return not failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--start", metavar="SCRIPT", help="start `streamlit run SCRIPT` (e.g. dash.py)")
+    target.add_argument("--url", help="an already running server, e.g. http://localhost:8501")
+    parser.add_argument("--server-pid", type=int, help="pid of the --url server, for its CPU and RSS")
+    parser.add_argument("--levels", type=int, nargs="+", default=LEVELS, help="concurrent sessions per level")
+    parser.add_argument("--workers", type=int, default=WORKERS, help="load-generating processes")
+    parser.add_argument("--port", type=int, default=PORT, help="port for --start")
+    parser.add_argument("--size", type=int, default=DATASET_SIZE, help="synthetic activities for --start")
+    args = parser.parse_args()
+
+    server = workdir = None
+    if args.start:
+        server, workdir = start_server(args.start, args.port, args.size)
+        base_url = f"http://127.0.0.1:{args.port}"
+        pid = server.pid
+    else:
+        parts = urlsplit(args.url)
+        base_url = f"{parts.scheme}://{parts.netloc}"
+        pid = args.server_pid
+    sampler = ProcessSampler(pid) if pid and os.path.exists(f"/proc/{pid}") else None
+
+    ok = True
+    try:
+        wait_until_healthy(base_url)
+        number = 0
+        for sessions in args.levels:
+            ok &= run_level(base_url, sessions, args.workers, sampler, number)
+            number += sessions
+    finally:
+        if server is not None:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            shutil.rmtree(workdir, ignore_errors=True)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Helpize Community Volunteering App: shared core, storage and pages."""
@@ -0,0 +1,299 @@
+"""JSON API for the static dash.html client.
+
+Serves dash.html and the same activity store the Streamlit app uses::
+
+    python -m helpize.api --port 8080
+
+Endpoints:
+
+- ``GET /`` - dash.html
+- ``GET /activities?limit=&before_id=&after_id=&cause=`` - a page of
+  activities, newest first; ``after_id`` returns only newer ones, oldest first
+- ``POST /activities`` - JSON or multipart/form-data (with ``poster`` and
+  ``activity_file`` uploads)
+- ``GET /blobs/<digest>[/thumb|/medium]`` - uploaded files and poster variants
+
+Responses carry an ETag and honour If-None-Match, and are gzip-compressed
+when the client accepts it.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+
+try:
+    from aiohttp import web
+except ImportError:  # aiohttp is optional; the API needs it
+    web = None
+
+from helpize.blobstore import CHUNK_SIZE, VARIANT_SIZES, BlobStore
+from helpize.bulk import EXPORT_FIELDS, validate_activity
+from helpize.dedup import DuplicateDetector
+from helpize.eventlog import DEFAULT_LOG_DIR, SUBMIT, open_writer
+from helpize.extract import TextExtractor
+from helpize.feedcache import FeedCache
+from helpize.storage import CAUSES, ActivityStore
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+HOST = os.environ.get("HELPIZE_API_HOST", "127.0.0.1")
+PORT = int(os.environ.get("HELPIZE_API_PORT", "8080"))
+DASH_HTML = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "dash.html")
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+MAX_UPLOAD_BYTES = 20 * 1024 * 1024  # per uploaded file
+MAX_FIELD_BYTES = 64 * 1024  # per text field
+MIN_GZIP_BYTES = 1024  # smaller bodies aren't worth compressing
+
+# Activity fields sent to clients
+API_FIELDS = EXPORT_FIELDS + ("like_count", "registered_count")
+DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+class BadRequest(Exception):
+    """The request can't be served as sent; the message goes back to the client."""
+
+
+# ---------- RESPONSES ----------
+def conditional_response(request, body, content_type):
+    """200 with ETag (gzipped when accepted), or 304 if the client's copy matches."""
+    etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+    if etag in request.headers.get("If-None-Match", ""):
+        return web.Response(status=304, headers=headers)
+    response = web.Response(body=body, content_type=content_type, charset="utf-8", headers=headers)
+    if len(body) >= MIN_GZIP_BYTES and "gzip" in request.headers.get("Accept-Encoding", ""):
+        response.enable_compression(web.ContentCoding.gzip)
+    return response
+
+
+def json_response(request, payload, status=200):
+    body = json.dumps(payload, ensure_ascii=False, separators=(",", ":")).encode()
+    if status != 200:
+        return web.Response(body=body, status=status, content_type="application/json", charset="utf-8")
+    return conditional_response(request, body, "application/json")
+
+
+def public(activity):
+    return {field: activity.get(field) for field in API_FIELDS}
+
+
+def int_param(request, name, default=None, maximum=None):
+    value = request.query.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise BadRequest(f"{name} must be an integer")
+    if number < 0:
+        raise BadRequest(f"{name} must not be negative")
+    return min(number, maximum) if maximum else number
+
+
+# ---------- HANDLERS ----------
+async def index(request):
+    html = await asyncio.to_thread(request.app["dash_html"].read)
+    return conditional_response(request, html, "text/html")
+
+
+async def list_activities(request):
+    limit = int_param(request, "limit", PAGE_SIZE, MAX_PAGE_SIZE) or PAGE_SIZE
+    before_id = int_param(request, "before_id")
+    after_id = int_param(request, "after_id")
+    if before_id is not None and after_id is not None:
+        raise BadRequest("pass before_id or after_id, not both")
+    cause = request.query.get("cause") or None
+    if cause is not None and cause not in CAUSES:
+        raise BadRequest(f"unknown cause {cause!r}")
+
+    store = request.app["store"]
+    # Fetch one extra row to know whether another page exists
+    key = ("api", cause, before_id, after_id, limit)
+    activities = await asyncio.to_thread(
+        request.app["feed_cache"].get_or_build, key,
+        lambda: store.list_activities(cause=cause, limit=limit + 1, before_id=before_id, after_id=after_id),
+    )
+    has_more = len(activities) > limit
+    activities = activities[:limit]
+    return json_response(request, {
+        "activities": [public(activity) for activity in activities],
+        "has_more": has_more,
+        "next_before_id": activities[-1]["id"] if has_more and after_id is None else None,
+    })
+
+
+async def create_activity(request):
+    uploads = {}
+    try:
+        if request.content_type == "multipart/form-data":
+            record, uploads = await read_multipart(request)
+        elif request.content_type == "application/json":
+            try:
+                record = await request.json()
+            except ValueError:
+                raise BadRequest("invalid JSON")
+            if not isinstance(record, dict):
+                raise BadRequest("expected a JSON object")
+        else:
+            raise BadRequest("send application/json or multipart/form-data")
+
+        activity, reason = validate_activity(record)
+        if activity is None:
+            raise BadRequest(reason)
+        # Uploads only reach the blob store once the fields are known to be good
+        for name, writer in uploads.items():
+            activity[f"{name}_blob"] = writer.commit()
+    finally:
+        for writer in uploads.values():
+            writer.discard()
+    store = request.app["store"]
+    detector = request.app["duplicates"]
+    check = await asyncio.to_thread(detector.check, activity)
+    activity["duplicate_of"] = check.duplicate_of
+    activity_id = await asyncio.to_thread(store.add_activity, activity)
+    await asyncio.to_thread(detector.add, activity_id, check)
+    if request.app["events"] is not None:
+        request.app["events"].append(SUBMIT, id=activity_id, activity=activity)
+    request.app["feed_cache"].invalidate()
+    if activity.get("poster_blob"):
+        request.app["blobs"].submit_variants(activity["poster_blob"])
+    if request.app["extractor"] is not None:
+        request.app["extractor"].submit(activity.get("activity_file_blob"))
+    created = await asyncio.to_thread(store.get_activity, activity_id)
+    return json_response(request, public(created), status=201)
+
+
+async def read_multipart(request):
+    """Form fields plus uploads streamed to disk.
+
+    Uploads come back as uncommitted BlobWriters by field name; the caller
+    commits them once the request is known to be valid, or discards them.
+    """
+    record, uploads = {}, {}
+    reader = await request.multipart()
+    try:
+        async for part in reader:
+            if part.filename is None:
+                record[part.name] = await read_field(part)
+                continue
+            if part.name not in ("poster", "activity_file"):
+                raise BadRequest(f"unexpected upload {part.name!r}")
+            if part.name in uploads:
+                raise BadRequest(f"more than one {part.name}")
+            if not part.filename:
+                continue  # an empty optional file input
+            writer = uploads[part.name] = request.app["blobs"].writer()
+            while chunk := await part.read_chunk(CHUNK_SIZE):
+                writer.write(chunk)
+                if writer.size > MAX_UPLOAD_BYTES:
+                    raise BadRequest(f"{part.name} is larger than {MAX_UPLOAD_BYTES // (1024 * 1024)} MB")
+            record[part.name] = part.filename
+    except BaseException:
+        for writer in uploads.values():
+            writer.discard()
+        raise
+    return record, uploads
+
+
+async def read_field(part):
+    """A text form field, refused once it passes MAX_FIELD_BYTES."""
+    data = bytearray()
+    while chunk := await part.read_chunk(CHUNK_SIZE):
+        data += chunk
+        if len(data) > MAX_FIELD_BYTES:
+            raise BadRequest(f"{part.name} is longer than {MAX_FIELD_BYTES // 1024} KB")
+    try:
+        return data.decode(part.get_charset(default="utf-8"))
+    except UnicodeDecodeError:
+        raise BadRequest(f"{part.name} is not valid text")
+
+
+async def get_blob(request):
+    digest, variant = request.match_info["digest"], request.match_info.get("variant")
+    if not DIGEST.match(digest) or (variant and variant not in VARIANT_SIZES):
+        raise web.HTTPNotFound()
+    blobs = request.app["blobs"]
+    path = blobs.variant_path(digest, variant) if variant else blobs.path(digest)
+    if not os.path.exists(path):
+        raise web.HTTPNotFound()
+    # Content-addressed, so a digest's bytes never change
+    return web.FileResponse(path, headers={"Cache-Control": "public, max-age=31536000, immutable"})
+
+
+async def errors(request, handler):
+    """Middleware turning BadRequest into a JSON 400."""
+    try:
+        return await handler(request)
+    except BadRequest as exc:
+        return json_response(request, {"error": str(exc)}, status=400)
+
+
+# ---------- APPLICATION ----------
+class StaticFile:
+    """A file kept in memory and re-read only when it changes on disk."""
+
+    def __init__(self, path):
+        self.path = path
+        self._stamp = None
+        self._body = b""
+
+    def read(self):
+        stat = os.stat(self.path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        if stamp != self._stamp:
+            with open(self.path, "rb") as f:
+                self._body = f.read()
+            self._stamp = stamp
+        return self._body
+
+
+def create_app(store=None, blobs=None, dash_html=DASH_HTML, events=None, extract=False):
+    """The aiohttp application; pass a store/blob store to share them.
+
+    Submissions are appended to ``events`` when given an EventLog, and their
+    uploaded files have their text extracted when ``extract`` is set.
+    """
+    if web is None:
+        raise RuntimeError("the JSON API needs the aiohttp package")
+    app = web.Application(middlewares=[web.middleware(errors)])
+    app["store"] = store or ActivityStore()
+    app["blobs"] = blobs or BlobStore()
+    app["feed_cache"] = FeedCache(maxsize=256, ttl=5)
+    app["dash_html"] = StaticFile(dash_html)
+    app["events"] = events
+    app["duplicates"] = DuplicateDetector(app["store"]).start()
+    app["extractor"] = TextExtractor(app["store"], app["blobs"]).start() if extract else None
+    app.router.add_get("/", index)
+    app.router.add_get("/activities", list_activities)
+    app.router.add_post("/activities", create_activity)
+    app.router.add_get("/blobs/{digest}", get_blob)
+    app.router.add_get("/blobs/{digest}/{variant}", get_blob)
+    return app
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m helpize.api", description="JSON API serving dash.html")
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--db", help="database path (defaults to HELPIZE_DB or data/helpize.db)")
+    parser.add_argument("--events", default=DEFAULT_LOG_DIR,
+                        help="event log root for submissions; the API writes its own directory under it")
+    args = parser.parse_args(argv)
+    if web is None:
+        parser.error("install aiohttp to run the API")
+    logging.basicConfig(level=logging.INFO)
+    events = open_writer(args.events).start()
+    web.run_app(create_app(ActivityStore(args.db) if args.db else None, events=events, extract=True),
+                host=args.host, port=args.port)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+import time
+from pathlib import Path
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from helpize import metrics
+from helpize.core import (
+    apply_dark_mode,
+    get_metrics_server,
+    go_to_menu,
+    init_session_state,
+    save_session,
+    track_session,
+    variant,
+)
+
+PAGES_DIR = Path(__file__).parent / "pages"
+
+# menu value -> (page script, title, icon). Each page script is only
+# executed when it is the page being viewed.
+MENU_PAGES = {
+    None: ("home.py", "Home", "🏠"),
+    "Profile": ("profile.py", "Profile", "👤"),
+    "Posts": ("posts.py", "Posts", "📢"),
+    "Dashboard": ("dashboard.py", "Dashboard", "📊"),
+    "Settings": ("settings.py", "Settings", "⚙️"),
+    "Help": ("help.py", "Help", "❓"),
+}
+
+def build_pages(menus):
+    """One st.Page per menu entry, keyed by menu value."""
+    return {
+        menu: st.Page(
+            PAGES_DIR / script,
+            title=title,
+            icon=icon,
+            url_path=title.lower(),
+            default=menu is None,
+        )
+        for menu, (script, title, icon) in MENU_PAGES.items()
+        if menu in menus
+    }
+
+def run_page(page, variant_name):
+    """Run the page script, timing it and counting its elements when sampled."""
+    ctx = get_script_run_ctx()
+    if ctx is None or not metrics.sampled():
+        page.run()
+        return
+    # Count the deltas the page sends by wrapping the session's message queue
+    enqueue = ctx._enqueue
+    elements = 0
+    def counting_enqueue(msg):
+        nonlocal elements
+        if msg.HasField("delta"):
+            elements += 1
+        enqueue(msg)
+    ctx._enqueue = counting_enqueue
+    started = time.perf_counter()
+    try:
+        page.run()
+    finally:
+        # Also reached when the page switches or reruns the script
+        ctx._enqueue = enqueue
+        metrics.PAGE_SECONDS.observe(time.perf_counter() - started, variant_name, page.title)
+        metrics.PAGE_ELEMENTS.observe(elements, variant_name, page.title)
+
+def run(variant_name):
+    """Entrypoint shared by event.py, dash.py and daw.py."""
+    init_session_state(variant_name)
+    try:
+        render(variant_name)
+    finally:
+        # Also reached when a page switch or rerun ends the run early
+        save_session()
+        track_session()
+
+def render(variant_name):
+    """Page config, sidebar and the current page."""
+    get_metrics_server()
+    settings = variant()
+
+    # Set page configuration
+    if settings["wide"]:
+        st.set_page_config(
+            page_title="Community Volunteering App",
+            page_icon="🤝",
+            layout="wide",
+            initial_sidebar_state="expanded"
+        )
+    else:
+        st.set_page_config(page_title="Community Volunteering App")
+
+    pages = build_pages(settings["pages"])
+    page = st.navigation(list(pages.values()), position="hidden")
+
+    # A callback asked for another page (e.g. Accept opening the Dashboard)
+    switch_to = st.session_state.pop("switch_to", None)
+    if switch_to is not None:
+        st.session_state.menu = switch_to
+        st.switch_page(pages[switch_to])
+
+    # Arriving through a sidebar link or URL starts the page fresh
+    menu = next(menu for menu, candidate in pages.items() if candidate.url_path == page.url_path)
+    if st.session_state.menu != menu:
+        go_to_menu(menu)
+
+    # ---------- SIDEBAR (☰ MENU) ----------
+    with st.sidebar:
+        st.title("Menu")
+        for entry in settings["sidebar"]:
+            if entry == menu:
+                # Re-clicking the open section resets it without leaving the page
+                st.button(pages[entry].title, icon=pages[entry].icon, type="tertiary", on_click=go_to_menu, args=(entry,))
+            else:
+                st.page_link(pages[entry])
+
+    # ---------- MAIN LOGIC ----------
+    apply_dark_mode()  # Apply dark mode globally
+    run_page(page, variant_name)
+
+    # ---------- RESULT (Conditional Display) ----------
+    if st.session_state.permission == "Accepted" and settings["accepted_message"]:
+        st.success(settings["accepted_message"])
+    elif st.session_state.permission == "Denied":
+        st.error(settings["denied_message"])
+
+    # ---------- FOOTER ----------
+    if settings["styled"]:
+        st.markdown("---")
+        st.markdown("**© 2026 Helpize Community App. All rights reserved.**")
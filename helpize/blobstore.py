@@ -0,0 +1,153 @@
+import hashlib
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; without it posters get no variants
+    Image = None
+
+# ---------- CONFIGURATION ----------
+DEFAULT_BLOB_ROOT = os.environ.get(
+    "HELPIZE_BLOBS",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "blobs"),
+)
+
+CHUNK_SIZE = 64 * 1024
+
+# Longest side in pixels for each generated poster variant
+VARIANT_SIZES = {
+    "thumb": 256,
+    "medium": 1024,
+}
+
+
+# ---------- BLOB STORE ----------
+class BlobStore:
+    """Content-addressed file store for uploaded posters and documents.
+
+    Blobs are named by the SHA-256 of their bytes, so the same poster uploaded
+    by many organisers is kept on disk once. Poster variants are generated on
+    a small background pool so the submit rerun never waits for Pillow.
+    """
+
+    def __init__(self, root=DEFAULT_BLOB_ROOT, workers=2):
+        self.root = root
+        os.makedirs(os.path.join(root, "tmp"), exist_ok=True)
+        os.makedirs(os.path.join(root, "variants"), exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="blob-variants")
+
+    def path(self, digest):
+        """Location of a blob on disk."""
+        return os.path.join(self.root, digest[:2], digest)
+
+    def exists(self, digest):
+        return os.path.exists(self.path(digest))
+
+    def put_stream(self, fileobj):
+        """Stream a file-like object into the store and return its digest.
+
+        Bytes are hashed while they are copied to a temporary file in chunks,
+        so memory use stays constant regardless of upload size.
+        """
+        with self.writer() as writer:
+            for chunk in iter(lambda: fileobj.read(CHUNK_SIZE), b""):
+                writer.write(chunk)
+        return writer.digest
+
+    def writer(self):
+        """A BlobWriter for callers that receive bytes piece by piece."""
+        return BlobWriter(self)
+
+    def put_upload(self, uploaded_file):
+        """Store a Streamlit UploadedFile, or return None if there is none."""
+        if uploaded_file is None:
+            return None
+        uploaded_file.seek(0)
+        return self.put_stream(uploaded_file)
+
+    # ---------- POSTER VARIANTS ----------
+    def variant_path(self, digest, name):
+        return os.path.join(self.root, "variants", f"{digest}_{name}.jpg")
+
+    def submit_variants(self, digest):
+        """Queue thumbnail/size variants for a poster blob.
+
+        Returns a Future, or None when Pillow is unavailable.
+        """
+        if Image is None:
+            return None
+        return self._executor.submit(self.make_variants, digest)
+
+    def make_variants(self, digest):
+        """Generate every missing variant for a poster blob."""
+        missing = {name: size for name, size in VARIANT_SIZES.items()
+                   if not os.path.exists(self.variant_path(digest, name))}
+        if not missing:
+            return
+        with Image.open(self.path(digest)) as image:
+            image = image.convert("RGB")
+            for name, size in missing.items():
+                variant = image.copy()
+                variant.thumbnail((size, size))
+                # Write then rename so readers never see a half-written file
+                target = self.variant_path(digest, name)
+                variant.save(target + ".part", "JPEG", quality=85)
+                os.replace(target + ".part", target)
+
+
+class BlobWriter:
+    """Incremental upload into a BlobStore, used as a context manager.
+
+    The blob is committed under its digest when the block exits cleanly and
+    discarded if it raises; ``digest`` is set once committed. Callers that
+    decide later call ``commit()`` or ``discard()`` themselves.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.size = 0
+        self.digest = None
+        self._sha = hashlib.sha256()
+        fd, self._tmp_path = tempfile.mkstemp(dir=os.path.join(store.root, "tmp"))
+        self._file = os.fdopen(fd, "wb")
+
+    def write(self, chunk):
+        self._sha.update(chunk)
+        self._file.write(chunk)
+        self.size += len(chunk)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is not None:
+            self.discard()
+        else:
+            self.commit()
+        return False
+
+    def discard(self):
+        """Drop the bytes written so far unless they were committed."""
+        self._file.close()
+        if self.digest is None and os.path.exists(self._tmp_path):
+            os.remove(self._tmp_path)
+
+    def commit(self):
+        """Store the bytes under their digest and return it."""
+        self._file.close()
+        try:
+            digest = self._sha.hexdigest()
+            target = self.store.path(digest)
+            if os.path.exists(target):
+                os.remove(self._tmp_path)
+            else:
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                os.replace(self._tmp_path, target)
+        except BaseException:
+            if os.path.exists(self._tmp_path):
+                os.remove(self._tmp_path)
+            raise
+        self.digest = digest
+        return digest
@@ -0,0 +1,216 @@
+"""Streaming bulk import/export of activities as JSONL or CSV.
+
+Usage::
+
+    python -m helpize.bulk import partners.jsonl
+    python -m helpize.bulk export activities.csv
+"""
+import argparse
+import csv
+import io
+import json
+import sys
+import time
+from datetime import date as Date
+from urllib.parse import urlsplit
+from helpize.storage import ACTIVITY_FIELDS, CAUSES, VISIBILITIES, ActivityStore
+
+BATCH_SIZE = 500
+
+# Fields an imported row may carry; blob references are local to a deployment
+IMPORT_FIELDS = ("registration_link", "activity_file", "date", "place", "about_event", "cause", "poster", "visibility", "capacity")
+EXPORT_FIELDS = ("id",) + ACTIVITY_FIELDS + ("status", "created_at")
+
+# Registration links are rendered as clickable links, so only web URLs are kept
+LINK_SCHEMES = ("http", "https")
+
+# Keep the first few rejected rows for the report, count the rest
+MAX_REPORTED_ERRORS = 100
+
+
+# ---------- VALIDATION ----------
+def is_web_link(url):
+    """True for an absolute http(s) URL; rules out javascript:, data: and the like."""
+    parts = urlsplit(url.strip())
+    return parts.scheme.lower() in LINK_SCHEMES and bool(parts.netloc)
+
+
+def validate_activity(record):
+    """Check one imported record against the Submit Activity form rules.
+
+    Returns ``(activity, None)`` for a valid row or ``(None, reason)``.
+    """
+    activity = {field: (record.get(field) or None) for field in IMPORT_FIELDS}
+    for field in ("registration_link", "date", "place", "about_event", "poster"):
+        if not isinstance(activity[field], str) or not activity[field].strip():
+            return None, f"missing {field}"
+    activity["registration_link"] = activity["registration_link"].strip()
+    if not is_web_link(activity["registration_link"]):
+        return None, f"registration_link must be an http or https URL, not {activity['registration_link']!r}"
+    if activity["cause"] not in CAUSES:
+        return None, f"unknown cause {activity['cause']!r}"
+    activity["visibility"] = activity["visibility"] or "Public"
+    if activity["visibility"] not in VISIBILITIES:
+        return None, f"unknown visibility {activity['visibility']!r}"
+    try:
+        date = Date.fromisoformat(activity["date"].strip())
+    except ValueError:
+        return None, f"invalid date {activity['date']!r}"
+    # The form's date picker starts at today
+    if date < Date.today():
+        return None, f"date {activity['date']!r} is in the past"
+    activity["date"] = str(date)
+    if activity["capacity"] is not None:
+        try:
+            activity["capacity"] = int(activity["capacity"])
+        except (TypeError, ValueError):
+            return None, f"invalid capacity {activity['capacity']!r}"
+        if activity["capacity"] < 0:
+            return None, f"invalid capacity {activity['capacity']!r}"
+        activity["capacity"] = activity["capacity"] or None  # 0 means unlimited
+    return activity, None
+
+
+# ---------- READERS ----------
+def iter_jsonl(fileobj):
+    """Yield ``(line_number, record)`` pairs; unparsable lines give an error string."""
+    for line_number, line in enumerate(fileobj, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield line_number, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, "expected a JSON object"
+            continue
+        yield line_number, record
+
+
+def iter_csv(fileobj):
+    """Yield ``(line_number, record)`` pairs from a CSV with a header row."""
+    reader = csv.DictReader(fileobj)
+    for record in reader:
+        yield reader.line_num, record
+
+
+# ---------- IMPORT / EXPORT ----------
+def import_activities(store, records, batch_size=BATCH_SIZE, detector=None):
+    """Validate and insert ``(line_number, record)`` pairs in batches.
+
+    Only one batch is held in memory at a time. With a DuplicateDetector,
+    each row is checked and indexed like a form submission, so copies are
+    flagged for the moderators, including copies within the same file.
+    Returns a report dict with counts, the first rejected rows and throughput.
+    """
+    started = time.perf_counter()
+    imported = rejected = flagged = 0
+    errors = []
+    batch = []
+    for line_number, record in records:
+        if isinstance(record, str):
+            activity, reason = None, record
+        else:
+            activity, reason = validate_activity(record)
+        if activity is None:
+            rejected += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append((line_number, reason))
+            continue
+        batch.append(activity)
+        if len(batch) >= batch_size:
+            flagged += _store_batch(store, batch, detector)
+            imported += len(batch)
+            batch = []
+    if batch:
+        flagged += _store_batch(store, batch, detector)
+        imported += len(batch)
+    seconds = time.perf_counter() - started
+    return {
+        "imported": imported,
+        "rejected": rejected,
+        "flagged": flagged,
+        "errors": errors,
+        "seconds": seconds,
+        "rows_per_second": (imported + rejected) / seconds if seconds else 0.0,
+    }
+
+
+def _store_batch(store, batch, detector):
+    """Insert one batch; returns how many rows were flagged as duplicates."""
+    if detector is None:
+        store.add_activities(batch)
+        return 0
+    # Row by row: each check has to see the rows stored before it. The check
+    # costs far more than the extra commits.
+    flagged = 0
+    for activity in batch:
+        check = detector.check(activity)
+        activity["duplicate_of"] = check.duplicate_of
+        detector.add(store.add_activity(activity), check)
+        flagged += check.duplicate_of is not None
+    return flagged
+
+
+def export_jsonl(store, fileobj, batch_size=BATCH_SIZE):
+    """Write every activity as one JSON object per line; returns the row count."""
+    count = 0
+    for activity in store.iter_activities(batch_size):
+        record = {field: activity.get(field) for field in EXPORT_FIELDS}
+        fileobj.write(json.dumps(record, ensure_ascii=False) + "\n")
+        count += 1
+    return count
+
+
+def export_csv(store, fileobj, batch_size=BATCH_SIZE):
+    """Write every activity as CSV with a header row; returns the row count."""
+    writer = csv.DictWriter(fileobj, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    for activity in store.iter_activities(batch_size):
+        writer.writerow(activity)
+        count += 1
+    return count
+
+
+# ---------- COMMAND LINE ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m helpize.bulk", description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=["import", "export"])
+    parser.add_argument("path", help="a .jsonl or .csv file, or - for stdin/stdout")
+    parser.add_argument("--format", choices=["jsonl", "csv"], help="defaults to the file extension")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--db", help="database path (defaults to HELPIZE_DB or data/helpize.db)")
+    args = parser.parse_args(argv)
+
+    fmt = args.format or ("csv" if args.path.endswith(".csv") else "jsonl")
+    store = ActivityStore(args.db) if args.db else ActivityStore()
+
+    if args.action == "import":
+        from helpize.dedup import DuplicateDetector
+        fileobj = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+        with fileobj:
+            records = iter_csv(fileobj) if fmt == "csv" else iter_jsonl(fileobj)
+            report = import_activities(store, records, args.batch_size, DuplicateDetector(store))
+        print(f"Imported {report['imported']} activities ({report['flagged']} possible duplicates), "
+              f"rejected {report['rejected']} in {report['seconds']:.2f}s ({report['rows_per_second']:.0f} rows/s)")
+        for line_number, reason in report["errors"]:
+            print(f"  line {line_number}: {reason}", file=sys.stderr)
+        if report["rejected"] > len(report["errors"]):
+            print(f"  ... and {report['rejected'] - len(report['errors'])} more", file=sys.stderr)
+        return 1 if report["rejected"] else 0
+
+    fileobj = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", newline="") if args.path == "-" \
+        else open(args.path, "w", newline="", encoding="utf-8")
+    started = time.perf_counter()
+    with fileobj:
+        count = export_csv(store, fileobj, args.batch_size) if fmt == "csv" \
+            else export_jsonl(store, fileobj, args.batch_size)
+    seconds = time.perf_counter() - started
+    print(f"Exported {count} activities in {seconds:.2f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+import logging
+import os
+import uuid
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+from helpize import eventlog, metrics, sessions
+from helpize.bulk import is_web_link
+from helpize.feedcache import FeedCache
+from helpize.storage import REGISTERED, WAITLISTED, ActivityStore
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 20
+
+# ---------- APP VARIANTS ----------
+# event.py, dash.py and daw.py run the same pages; they only differ in the
+# settings and page texts below (None leaves a text out).
+VARIANTS = {
+    "event": {
+        "pages": [None, "Profile", "Posts", "Settings", "Help"],
+        "sidebar": ["Profile", "Posts", "Settings", "Help"],
+        "wide": False,
+        "styled": False,  # dark mode toggle and footer
+        "private_review": False,  # Visibility choice and a review queue for private posts
+        "gated_dashboard": False,  # Dashboard only reachable by accepting a post
+        "accepted_message": "✅ Permission Accepted",
+        "denied_message": "❌ Permission Denied",
+        "home_message": "Click ☰ (top-left) to open menu",
+        "profile_message": None,
+        "my_posts_message": None,
+        "settings_message": "Manage your account and notifications.",
+        "help_message": "Frequently Asked Questions and Support.",
+    },
+    "dash": {
+        "pages": [None, "Profile", "Posts", "Dashboard", "Settings", "Help"],
+        "sidebar": [None, "Profile", "Posts", "Dashboard", "Settings", "Help"],
+        "wide": True,
+        "styled": True,
+        "private_review": False,
+        "gated_dashboard": False,
+        "accepted_message": "✅ Permission Accepted - You can now access the Dashboard for more features!",
+        "denied_message": "❌ Permission Denied - Please review and resubmit.",
+        "home_message": "Welcome to the Helpize Community Volunteering App. Click ☰ (top-left) to open the menu and explore features like Profile, Posts, Dashboard, Settings, and Help.",
+        "profile_message": "Manage your personal volunteering activities and preferences.",
+        "my_posts_message": "View and manage your posted events.",
+        "settings_message": "Manage your account and notifications. (Placeholder for settings)",
+        "help_message": "Frequently Asked Questions and Support. (Placeholder for FAQ)",
+    },
+    "daw": {
+        "pages": [None, "Profile", "Posts", "Dashboard", "Settings", "Help"],
+        "sidebar": [None, "Profile", "Posts", "Settings", "Help"],
+        "wide": True,
+        "styled": True,
+        "private_review": True,
+        "gated_dashboard": True,
+        "accepted_message": None,
+        "denied_message": "❌ Permission Denied - Please review and resubmit.",
+        "home_message": "Welcome to the Helpize Community Volunteering App. Click ☰ (top-left) to open the menu and explore features like Profile, Posts, Settings, and Help.",
+        "profile_message": "Manage your personal volunteering activities and preferences.",
+        "my_posts_message": "View and manage your posted events.",
+        "settings_message": "Manage your account and notifications. (Placeholder for settings)",
+        "help_message": "Frequently Asked Questions and Support. (Placeholder for FAQ)",
+    },
+}
+
+def variant():
+    """Settings of the app variant this session is running."""
+    return VARIANTS[st.session_state.variant]
+
+# ---------- SESSION STATE ----------
+def init_session_state(variant_name):
+    """Create the session keys every page relies on."""
+    st.session_state.variant = variant_name
+    restore_session()
+
+    if "menu" not in st.session_state:
+        st.session_state.menu = None
+
+    if "profile_option" not in st.session_state:
+        st.session_state.profile_option = None
+
+    if "post_type" not in st.session_state:
+        st.session_state.post_type = None
+
+    if "permission" not in st.session_state:
+        st.session_state.permission = None
+
+    if "dark_mode" not in st.session_state:
+        st.session_state.dark_mode = False
+
+    # Identifies this session's claims in the moderation queue
+    if "moderator_id" not in st.session_state:
+        st.session_state.moderator_id = uuid.uuid4().hex
+
+    # Identifies this session's event registrations
+    if "user_id" not in st.session_state:
+        st.session_state.user_id = uuid.uuid4().hex
+
+    # View Activities position: page number and its keyset "before id"
+    if "view_page" not in st.session_state:
+        st.session_state.view_page = [1, None]
+
+def restore_session():
+    """Tie this tab to its shared session, loading the snapshot on the first run here.
+
+    A tab that reaches this process after a restart or from another replica
+    brings its session id in the URL and picks up where it left off. User and
+    moderator ids only come back for the browser that saved them; a URL
+    opened anywhere else restores navigation under a new session id.
+    """
+    if "session_id" not in st.session_state:
+        binding = sessions.browser_binding(st.context.cookies)
+        session_id = st.query_params.get(sessions.SESSION_PARAM)
+        data = None
+        if sessions.valid_session_id(session_id):
+            try:
+                data = get_session_store().load(session_id)
+            except Exception:
+                logger.exception("could not load session; starting a new one")
+        else:
+            session_id = sessions.new_session_id()
+        if data is not None:
+            restored, owned = sessions.restorable(sessions.loads(data), binding)
+            for key, value in restored.items():
+                st.session_state[key] = value
+            if not owned:
+                session_id, data = sessions.new_session_id(), None
+        st.session_state.session_id = session_id
+        st.session_state.session_binding = binding
+        st.session_state.session_saved = data
+    # Page changes drop query parameters, so put the id back on every run
+    if st.query_params.get(sessions.SESSION_PARAM) != st.session_state.session_id:
+        st.query_params[sessions.SESSION_PARAM] = st.session_state.session_id
+
+def save_session():
+    """Write the shared keys to the session store if they changed this run."""
+    if "session_id" not in st.session_state:
+        return
+    snapshot = {key: st.session_state[key] for key in sessions.SHARED_KEYS if key in st.session_state}
+    snapshot[sessions.BINDING_KEY] = st.session_state.session_binding
+    data = sessions.dumps(snapshot)
+    if data == st.session_state.session_saved:
+        return
+    try:
+        get_session_store().save(st.session_state.session_id, data)
+    except Exception:
+        # Keep serving from this replica; the next change tries again
+        logger.exception("could not save session")
+        return
+    st.session_state.session_saved = data
+
+def track_session():
+    """Report this run to the session governor, which drops idle sessions' state."""
+    ctx = get_script_run_ctx()
+    if ctx is not None:
+        get_session_governor().touch(ctx.session_id, st.session_state.to_dict())
+
+# ---------- SHARED RESOURCES ----------
+@st.cache_resource
+def get_session_governor():
+    """Bounds the state idle and oversized sessions keep in this process."""
+    governor = sessions.SessionGovernor()
+    metrics.register_collector(lambda: metrics.gauge_lines("helpize_sessions", governor.stats()))
+    return governor.start()
+
+@st.cache_resource
+def get_session_store():
+    """Where session snapshots are shared between replicas (HELPIZE_SESSION_STORE)."""
+    return sessions.open_session_store()
+
+@st.cache_resource
+def get_store():
+    """Activity store shared by every session of this server."""
+    return metrics.InstrumentedStore(ActivityStore())
+
+@st.cache_resource
+def get_blobs():
+    """Content-addressed store for uploaded posters and files."""
+    # Imported here so pages that never touch uploads don't load Pillow
+    from helpize.blobstore import BlobStore
+    return BlobStore()
+
+@st.cache_resource
+def get_link_checker():
+    """Background registration-link checker, or None without aiohttp."""
+    from helpize.linkcheck import LinkChecker, aiohttp
+    if aiohttp is None:
+        return None
+    return LinkChecker(get_store()).start()
+
+@st.cache_resource
+def get_text_extractor():
+    """Process pool pulling text and page counts out of uploaded activity files."""
+    from helpize.extract import TextExtractor
+    extractor = TextExtractor(get_store(), get_blobs())
+    metrics.register_collector(lambda: metrics.gauge_lines("helpize_extract", extractor.stats()))
+    return extractor.start()
+
+@st.cache_resource
+def get_duplicate_detector():
+    """Near-duplicate check for submissions over the shared MinHash/LSH index."""
+    from helpize.dedup import DuplicateDetector
+    detector = DuplicateDetector(get_store())
+    metrics.register_collector(lambda: metrics.gauge_lines("helpize_duplicates", detector.stats()))
+    return detector.start()
+
+@st.cache_resource
+def get_feed_cache():
+    """Feed query results shared by every session, keyed by filter."""
+    cache = FeedCache(maxsize=256, ttl=30)
+    metrics.register_collector(lambda: metrics.gauge_lines("helpize_feed_cache", cache.stats()))
+    return cache
+
+@st.cache_resource
+def get_like_counter():
+    """Likes and the in-memory trending list."""
+    from helpize.likes import LikeCounter
+    return LikeCounter(get_store()).start()
+
+@st.cache_resource
+def get_ranking_snapshot():
+    """Columnar snapshot of listed activities for the For You ranking, rebuilt in the background."""
+    from helpize.ranking import RankingSnapshot
+    snapshot = RankingSnapshot(get_store().ranking_rows)
+    metrics.register_collector(lambda: metrics.gauge_lines("helpize_ranking", snapshot.stats()))
+    return snapshot.start()
+
+def get_ranking_columns():
+    """The latest ranking snapshot; posts denied since it was built are dropped when ids are fetched."""
+    return get_ranking_snapshot().columns
+
+def invalidate_feed_cache():
+    """Drop cached feeds and queue a ranking rebuild; call after writes that change the feeds."""
+    get_feed_cache().invalidate()
+    get_ranking_snapshot().invalidate()
+
+@st.cache_resource
+def get_reminder_scheduler():
+    """Background reminder emails, or None when no SMTP server is configured."""
+    from helpize.notify import SMTP_HOST, ReminderScheduler, SMTPPool
+    if not SMTP_HOST:
+        return None
+    return ReminderScheduler(get_store(), SMTPPool()).start()
+
+@st.cache_resource
+def get_event_log():
+    """Append-only log of navigation, reviews and submissions.
+
+    Each process writes its own directory under HELPIZE_EVENT_LOG. If it
+    can't be opened the app keeps running without one and says so in the
+    server log, instead of failing every page.
+    """
+    try:
+        log = eventlog.open_writer()
+    except (OSError, eventlog.LogInUse):
+        logger.exception("could not open the event log; events will not be recorded")
+        log = eventlog.NullEventLog()
+    metrics.register_collector(lambda: metrics.gauge_lines("helpize_event_log", log.stats()))
+    return log.start()
+
+def log_event(kind, **data):
+    """Append an event for this session; the write happens in the background."""
+    get_event_log().append(kind, user=st.session_state.user_id, **data)
+
+@st.cache_resource
+def get_metrics_server():
+    """Local Prometheus endpoint (HELPIZE_METRICS_PORT, 0 disables it)."""
+    return metrics.serve_metrics()
+
+# ---------- UTILITY FUNCTIONS ----------
+def apply_dark_mode():
+    """Apply dark mode styles if enabled."""
+    if st.session_state.dark_mode:
+        st.markdown("""
+        <style>
+        .stApp {
+            background-color: #121212;
+            color: #ffffff;
+        }
+        .stSidebar {
+            background-color: #1e1e1e;
+        }
+        .stButton>button {
+            background-color: #310ce9;
+            color: white;
+        }
+        .stTextInput>div>div>input, .stTextArea>div>textarea, .stSelectbox>div>div>select {
+            background-color: #2e2e2e;
+            color: white;
+        }
+        </style>
+        """, unsafe_allow_html=True)
+
+LINK_BADGES = {
+    "ok": "✅",
+    "broken": "⚠️ broken link",
+    "unreachable": "⚠️ unreachable",
+}
+
+def render_activities(activities):
+    """Show a list of activities, looking up link statuses, seats and likes in one go each."""
+    get_link_checker()  # starts background checks on first use
+    store = get_store()
+    ids = [activity["id"] for activity in activities]
+    statuses = store.link_statuses(activity["registration_link"] for activity in activities)
+    seats = store.registration_summary(ids, st.session_state.user_id)
+    likes = like_summary(ids)
+    documents = store.document_previews(activity["activity_file_blob"] for activity in activities)
+    for activity in activities:
+        render_activity(activity, statuses.get(activity["registration_link"]), seats.get(activity["id"]), likes.get(activity["id"]),
+                        documents.get(activity["activity_file_blob"]))
+
+def like_summary(ids):
+    """Map each id to ``(like count, liked by this session)``."""
+    return get_store().like_summary(ids, st.session_state.user_id)
+
+def render_activity(activity, link_status=None, seats=None, likes=None, document=None):
+    """Show one activity as an expander."""
+    with st.expander(f"Activity {activity['id']}: {activity['about_event']}"):
+        st.write(f"**Date:** {activity['date']}")
+        st.write(f"**Place:** {activity['place']}")
+        st.write(f"**Cause:** {activity['cause']}")
+        badge = ""
+        if link_status:
+            badge = " " + LINK_BADGES[link_status["status"]]
+            if link_status["http_status"] and link_status["status"] != "ok":
+                badge += f" ({link_status['http_status']})"
+        link = activity['registration_link']
+        # Posts saved before links were validated may hold other schemes; show those as text
+        link = f"[{link}]({link})" if is_web_link(link) else f"`{link}`"
+        st.write(f"**Registration Link:** {link}{badge}")
+        st.write(f"**Poster:** {activity['poster']}")
+        if activity['poster_blob']:
+            thumb = get_blobs().variant_path(activity['poster_blob'], "thumb")
+            if os.path.exists(thumb):
+                st.image(thumb)
+        if activity['duplicate_of']:
+            st.write(f"**Possible duplicate of:** Activity {activity['duplicate_of']}")
+        if activity['activity_file']:
+            pages = f" ({document['pages']} page{'s' if document['pages'] != 1 else ''})" if document and document['pages'] else ""
+            st.write(f"**File:** {activity['activity_file']}{pages}")
+            if document and document['preview']:
+                st.caption(document['preview'])
+        if seats:
+            render_seats(activity['id'], seats)
+        if likes:
+            count, liked = likes
+            st.button(f"{'❤️ Liked' if liked else '🤍 Like'} · {count}", key=f"like_{activity['id']}",
+                      on_click=toggle_like, args=(activity['id'], liked))
+
+def render_seats(activity_id, seats):
+    """Seat counts and the Register / Join waitlist / Cancel button."""
+    taken = f"{seats['registered']}/{seats['capacity']}" if seats['capacity'] else str(seats['registered'])
+    line = f"**Registered:** {taken}"
+    if seats['waitlisted']:
+        line += f" · {seats['waitlisted']} on the waitlist"
+    st.write(line)
+    if seats['status'] == REGISTERED:
+        st.button("Cancel registration", key=f"cancel_{activity_id}", on_click=cancel_registration, args=(activity_id,))
+    elif seats['status'] == WAITLISTED:
+        st.button("Leave waitlist", key=f"cancel_{activity_id}", on_click=cancel_registration, args=(activity_id,))
+    else:
+        full = seats['capacity'] and seats['registered'] >= seats['capacity']
+        st.button("Join waitlist" if full else "Register", key=f"register_{activity_id}",
+                  on_click=register_for_activity, args=(activity_id,))
+
+# ---------- NAVIGATION CALLBACKS ----------
+# Buttons change state in on_click callbacks, which run before the rerun the
+# click triggers, so each click costs one script run instead of two.
+def go_to_menu(menu):
+    """Switch sidebar section and reset everything below it."""
+    st.session_state.menu = menu
+    st.session_state.profile_option = None
+    st.session_state.post_type = None
+    st.session_state.permission = None
+    log_event(eventlog.NAVIGATE, menu=menu)
+
+def go_to_profile_option(option):
+    """Open a Profile sub-page."""
+    st.session_state.profile_option = option
+    st.session_state.post_type = None
+    st.session_state.permission = None
+    log_event(eventlog.NAVIGATE, menu=st.session_state.menu, profile_option=option)
+
+def go_to_post_type(post_type):
+    """Open the Public/Private view of My Posts (None goes back)."""
+    st.session_state.post_type = post_type
+    st.session_state.permission = None
+    log_event(eventlog.NAVIGATE, menu=st.session_state.menu, profile_option=st.session_state.profile_option,
+              post_type=post_type)
+
+def review_post(permission):
+    """Record the moderation decision for the current post."""
+    st.session_state.permission = permission
+    if permission == "Accepted" and variant()["gated_dashboard"]:
+        # Callbacks can't switch pages; the entrypoint does it on this rerun
+        st.session_state.switch_to = "Dashboard"
+    invalidate_feed_cache()
+
+def register_for_activity(activity_id):
+    """Take a seat, or a waitlist spot once the activity is full."""
+    get_store().register(activity_id, st.session_state.user_id)
+
+def cancel_registration(activity_id):
+    """Give up a seat or waitlist spot."""
+    get_store().cancel_registration(activity_id, st.session_state.user_id)
+
+def toggle_like(activity_id, liked):
+    """Like the activity, or take the like back."""
+    counter = get_like_counter()
+    if liked:
+        counter.unlike(activity_id, st.session_state.user_id)
+    else:
+        counter.like(activity_id, st.session_state.user_id)
+
+def toggle_dark_mode():
+    """Switch between light and dark styles."""
+    st.session_state.dark_mode = not st.session_state.dark_mode
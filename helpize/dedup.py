@@ -0,0 +1,177 @@
+"""Near-duplicate detection for submitted activities.
+
+Each activity's description and place are cut into character shingles,
+word by word, and summarised by a MinHash signature: ``NUM_PERM`` minimum hash
+values whose agreement rate between two activities estimates the Jaccard
+similarity of their shingle sets. The signature is split into ``BANDS``
+bands; activities that agree on a whole band land in the same LSH bucket.
+
+Buckets live in SQLite next to the activities, so every process shares one
+index and adding an activity is a handful of inserts. A submission is
+checked by looking up its ``BANDS`` buckets (index seeks, whatever the
+table size) and comparing signatures with the few activities found there;
+the closest one at ``THRESHOLD`` or above, dated within
+``DATE_WINDOW_DAYS`` of the submission, is flagged as the original; the
+next date of a weekly event is not a copy.
+"""
+import logging
+import re
+import threading
+import zlib
+from collections import namedtuple
+from datetime import date as Date, timedelta
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+NUM_PERM = 64
+BANDS = 16  # of NUM_PERM // BANDS rows: pairs above ~0.5 similarity usually share a bucket
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5  # characters
+THRESHOLD = 0.7  # estimated similarity at which a submission is flagged
+MAX_CANDIDATES = 50  # activities compared per check, most shared buckets first
+BUCKET_SCAN = 200  # newest activities read per bucket, so common wording can't make a check slow
+BACKLOG_BATCH = 1000  # activities indexed per transaction when catching up
+DATE_WINDOW_DAYS = 1  # a copy's date may be off by this much (a typo, a time zone)
+INDEX_INTERVAL = 30  # seconds between scans for activities stored without a check
+
+# The hash family must be the same in every process and across restarts;
+# changing the seed or sizes means clearing the index so it is rebuilt.
+SEED = 20240601
+_rng = np.random.RandomState(SEED)
+# Multiply-add-shift hashing, h(x) = (a * x + b) mod 2**64 >> 32: universal for 32-bit x
+PERM_A = _rng.randint(0, 1 << 62, NUM_PERM).astype(np.uint64) << np.uint64(2) | np.uint64(1)
+PERM_B = _rng.randint(0, 1 << 62, NUM_PERM).astype(np.uint64) << np.uint64(2)
+BAND_MULTIPLIERS = (_rng.randint(1, 1 << 62, ROWS).astype(np.uint64) << np.uint64(1)) | np.uint64(1)
+
+NOT_WORD = re.compile(r"[\W_]+")
+
+DuplicateCheck = namedtuple("DuplicateCheck", "signature buckets duplicate_of similarity")
+
+
+def shingles(activity):
+    """Character shingles of the words in an activity's description and place.
+
+    Shingles don't cross word boundaries, so reordering the same words keeps
+    the set; small typos only change the shingles of one word.
+    """
+    result = set()
+    for word in NOT_WORD.sub(" ", f"{activity['about_event']} {activity['place']}".lower()).split():
+        padded = f" {word} "
+        result.update(padded[i:i + SHINGLE_SIZE] for i in range(max(1, len(padded) - SHINGLE_SIZE + 1)))
+    return result
+
+
+def signatures(activities):
+    """MinHash signatures of several activities, one row of ``NUM_PERM`` uint32 each."""
+    shingle_sets = [shingles(activity) for activity in activities]
+    sigs = np.full((len(shingle_sets), NUM_PERM), 0xFFFFFFFF, dtype=np.uint32)
+    rows = [row for row, shingle_set in enumerate(shingle_sets) if shingle_set]
+    if not rows:
+        return sigs
+    hashes = np.fromiter((zlib.crc32(shingle.encode()) for row in rows for shingle in shingle_sets[row]),
+                         dtype=np.uint64)
+    starts = np.cumsum([0] + [len(shingle_sets[row]) for row in rows[:-1]])
+    # numpy's uint64 arithmetic wraps, which is the mod 2**64
+    permuted = (hashes[:, None] * PERM_A[None, :] + PERM_B[None, :]) >> np.uint64(32)
+    sigs[rows] = np.minimum.reduceat(permuted, starts, axis=0)
+    return sigs
+
+
+def signature(activity):
+    return signatures([activity])[0]
+
+
+def buckets(sigs):
+    """One signed 64-bit bucket key per band, for one signature or a 2-D batch."""
+    bands = sigs.reshape(-1, BANDS, ROWS).astype(np.uint64)
+    # Wrapping multiply-add: any mix of the band's values will do, matches are re-checked
+    keys = (bands * BAND_MULTIPLIERS).sum(axis=2, dtype=np.uint64).view(np.int64)
+    return keys.tolist() if sigs.ndim > 1 else keys[0].tolist()
+
+
+def similarity(sig, other):
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.count_nonzero(sig == other)) / NUM_PERM
+
+
+# ---------- DETECTOR ----------
+class DuplicateDetector:
+    """Checks submissions against the LSH index and keeps it up to date.
+
+    ``check()`` before storing an activity, then ``add()`` once it has an id.
+    Activities stored another way (bulk import, another process, before
+    this existed) are indexed by ``start()``'s background thread, which
+    looks for them every ``index_interval`` seconds.
+    """
+
+    def __init__(self, store, threshold=THRESHOLD, index_interval=INDEX_INTERVAL):
+        self.store = store
+        self.threshold = threshold
+        self.index_interval = index_interval
+        self.checked = 0
+        self.flagged = 0
+        self._indexed_up_to = 0  # every activity up to this id has been seen by index_backlog
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Keep indexing unindexed activities in the background; safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="dedup-backlog", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        return {"checked": self.checked, "flagged": self.flagged}
+
+    def check(self, activity):
+        """A DuplicateCheck for ``activity``; ``duplicate_of`` is None when it looks new."""
+        sig = signature(activity)
+        keys = buckets(sig)
+        day = Date.fromisoformat(str(activity["date"]))
+        window = timedelta(days=DATE_WINDOW_DAYS)
+        best_id, best = None, 0.0
+        for activity_id, duplicate_of, stored in self.store.lsh_candidates(
+                keys, MAX_CANDIDATES, BUCKET_SCAN, day - window, day + window):
+            score = similarity(sig, np.frombuffer(stored, dtype=np.uint32))
+            if score > best:
+                # Point at the original, not at an earlier copy of it
+                best_id, best = duplicate_of or activity_id, score
+        self.checked += 1
+        if best < self.threshold:
+            return DuplicateCheck(sig, keys, None, best)
+        self.flagged += 1
+        return DuplicateCheck(sig, keys, best_id, best)
+
+    def add(self, activity_id, check):
+        """Index a stored activity using the signature from its check."""
+        self.store.save_signatures([(activity_id, check.signature.tobytes(), check.buckets)])
+
+    def index_backlog(self, batch_size=BACKLOG_BATCH):
+        """Index one batch of activities that have no signature; returns how many."""
+        activities = self.store.unsigned_activities(batch_size, self._indexed_up_to)
+        if not activities:
+            return 0
+        self._indexed_up_to = activities[-1]["id"]
+        sigs = signatures(activities)
+        self.store.save_signatures([
+            (activity["id"], sig.tobytes(), keys)
+            for activity, sig, keys in zip(activities, sigs, buckets(sigs))
+        ])
+        return len(activities)
+
+    def _run(self):
+        while True:
+            try:
+                while self.index_backlog():
+                    pass
+            except Exception:
+                logger.exception("indexing activities for duplicate detection failed")
+            if self._stop.wait(self.index_interval):
+                return
@@ -0,0 +1,397 @@
+"""Append-only log of the app's state transitions.
+
+Navigation, moderation decisions and submissions are appended as events and
+written by a background thread in blocks: everything appended during one
+``flush_interval`` is compressed together, written once and fsynced once
+(group commit), so ``append()`` itself only takes a lock and a list append.
+``flush()`` waits until every earlier event is on disk.
+
+On disk the log is a directory of segments named by their first sequence
+number, rotated once they pass ``segment_bytes``. Each block is::
+
+    <payload length u32> <crc32 u32> <first seq u64> zlib(JSON lines)
+
+with one ``[seq, time, kind, data]`` array per line. A block torn by a crash
+fails its CRC; replay stops there and the writer truncates it on open. Only
+one process may write a directory at a time, so ``open_writer()`` gives
+every process (replicas, the JSON API) its own ``<host>-<n>`` directory
+under the log root (HELPIZE_EVENT_LOG).
+
+``replay()`` yields the events of every writer under a root merged by time,
+and ``Views`` rebuilds the feed, counts and moderation state from them.
+From the command line::
+
+    python -m helpize.eventlog tail -n 20      # audit trail
+    python -m helpize.eventlog summary         # views rebuilt by replay
+"""
+import argparse
+import atexit
+import json
+import logging
+import heapq
+import os
+import socket
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import Counter, namedtuple
+
+try:
+    import fcntl
+except ImportError:  # not on Windows; the single-writer check is skipped there
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+DEFAULT_LOG_DIR = os.environ.get(
+    "HELPIZE_EVENT_LOG",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "events"),
+)
+FLUSH_INTERVAL = 0.05  # seconds of appends grouped into one write and fsync
+MAX_PENDING = 5000  # events that trigger an early flush
+SEGMENT_BYTES = 64 * 1024 * 1024
+WRITER_SLOTS = 64  # writer directories tried per host before giving up
+
+# Event kinds
+NAVIGATE = "navigate"
+REVIEW = "review"
+SUBMIT = "submit"
+
+BLOCK_HEADER = struct.Struct("<IIQ")
+SEGMENT_PREFIX = "events-"
+SEGMENT_SUFFIX = ".log"
+
+# ``source`` is the directory an event was read from; seqs are per source
+Event = namedtuple("Event", "seq time kind data source", defaults=(None,))
+
+
+class LogInUse(RuntimeError):
+    """Another process is writing the event log directory."""
+
+
+def segment_name(first_seq):
+    return f"{SEGMENT_PREFIX}{first_seq:012d}{SEGMENT_SUFFIX}"
+
+
+def segment_first_seq(path):
+    return int(os.path.basename(path)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+
+def list_segments(directory):
+    """Segment paths in sequence order."""
+    if not os.path.isdir(directory):
+        return []
+    names = sorted(name for name in os.listdir(directory)
+                   if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX))
+    return [os.path.join(directory, name) for name in names]
+
+
+def encode_block(first_seq, records):
+    payload = zlib.compress(
+        b"\n".join(json.dumps(record, separators=(",", ":"), default=str).encode() for record in records)
+    )
+    return BLOCK_HEADER.pack(len(payload), zlib.crc32(payload), first_seq) + payload
+
+
+def read_blocks(path):
+    """Yield ``(end offset, events)`` per intact block; stops at a torn or corrupt one."""
+    with open(path, "rb") as f:
+        offset = 0
+        while True:
+            header = f.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                return
+            length, crc, _ = BLOCK_HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            offset += BLOCK_HEADER.size + length
+            yield offset, [Event(*json.loads(line)) for line in zlib.decompress(payload).split(b"\n")]
+
+
+def log_directories(root):
+    """``root`` and its subdirectories that hold segments, i.e. every writer's log."""
+    if not os.path.isdir(root):
+        return []
+    candidates = [root] + sorted(entry.path for entry in os.scandir(root) if entry.is_dir())
+    return [directory for directory in candidates if list_segments(directory)]
+
+
+def replay_directory(directory, from_seq=0):
+    """Every intact event one writer logged with ``seq >= from_seq``, oldest first."""
+    segments = list_segments(directory)
+    for index, path in enumerate(segments):
+        # Skip segments that end before from_seq without reading them
+        if index + 1 < len(segments) and segment_first_seq(segments[index + 1]) <= from_seq:
+            continue
+        for _, events in read_blocks(path):
+            for event in events:
+                if event.seq >= from_seq:
+                    yield event._replace(source=directory)
+
+
+def replay(root=DEFAULT_LOG_DIR, from_seq=0):
+    """Every writer's events under ``root`` merged by time (``from_seq`` applies per writer)."""
+    return heapq.merge(*(replay_directory(directory, from_seq) for directory in log_directories(root)),
+                       key=lambda event: event.time)
+
+
+# ---------- WRITER ----------
+class EventLog:
+    """Appends events to segment files from a background thread."""
+
+    def __init__(self, directory=DEFAULT_LOG_DIR, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING,
+                 segment_bytes=SEGMENT_BYTES, fsync=True):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        self._pending = []
+        self._appended = 0
+        self._durable = 0
+        self._lock = threading.Lock()
+        self._written = threading.Condition()
+        self._write_lock = threading.Lock()  # one block write at a time
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self.blocks = 0
+        self.bytes_written = 0
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = open(os.path.join(directory, "LOCK"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                self._lock_file.close()
+                raise LogInUse(f"event log {directory} is in use by another process")
+        self._next_seq, self._file = self._open_tail()
+
+    def _open_tail(self):
+        """Open the last segment for appending, dropping a torn final block."""
+        segments = list_segments(self.directory)
+        if not segments:
+            return 1, open(os.path.join(self.directory, segment_name(1)), "ab")
+        path = segments[-1]
+        end, next_seq = 0, segment_first_seq(path)
+        for end, events in read_blocks(path):
+            next_seq = events[-1].seq + 1
+        if end < os.path.getsize(path):
+            logger.warning("truncating torn block at %s:%d", path, end)
+            with open(path, "r+b") as f:
+                f.truncate(end)
+        return next_seq, open(path, "ab")
+
+    def start(self):
+        """Start the writer thread; safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+            atexit.register(self.stop)
+        return self
+
+    def stop(self):
+        """Write what's left and stop the writer thread."""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.write_pending()
+        self._file.close()
+        self._lock_file.close()
+
+    def append(self, kind, **data):
+        """Queue an event; it reaches disk within ``flush_interval``."""
+        record = (time.time(), kind, data)
+        with self._lock:
+            self._pending.append(record)
+            self._appended += 1
+            if len(self._pending) >= self.max_pending:
+                self._wake.set()
+
+    def flush(self, timeout=None):
+        """Block until every event appended so far is on disk; False on timeout."""
+        with self._lock:
+            target = self._appended
+        self._wake.set()
+        if self._thread is None:
+            self.write_pending()
+        with self._written:
+            return self._written.wait_for(lambda: self._durable >= target, timeout)
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {"appended": self._appended, "pending": pending, "blocks": self.blocks,
+                "bytes_written": self.bytes_written}
+
+    def write_pending(self):
+        """Write queued events as one block; returns how many were written."""
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            first_seq = self._next_seq
+            records = [(first_seq + offset, *record) for offset, record in enumerate(batch)]
+            block = encode_block(first_seq, records)
+            try:
+                self._file.write(block)
+                self._file.flush()
+                if self.fsync:
+                    os.fsync(self._file.fileno())
+            except Exception:
+                # Put the batch back so the next write retries it
+                with self._lock:
+                    self._pending[:0] = batch
+                raise
+            self._next_seq += len(batch)
+            self.blocks += 1
+            self.bytes_written += len(block)
+            if self._file.tell() >= self.segment_bytes:
+                self._file.close()
+                self._file = open(os.path.join(self.directory, segment_name(self._next_seq)), "ab")
+        with self._written:
+            self._durable += len(batch)
+            self._written.notify_all()
+        return len(batch)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.write_pending()
+            except Exception:
+                logger.exception("event log write failed")
+
+
+class NullEventLog:
+    """Stands in for an EventLog that could not be opened; events are dropped."""
+
+    def start(self):
+        return self
+
+    def stop(self):
+        pass
+
+    def append(self, kind, **data):
+        pass
+
+    def flush(self, timeout=None):
+        return True
+
+    def stats(self):
+        return {"appended": 0, "pending": 0, "blocks": 0, "bytes_written": 0}
+
+
+def open_writer(root=DEFAULT_LOG_DIR, **kwargs):
+    """An EventLog in the first ``<host>-<n>`` directory under ``root`` no other process writes.
+
+    Raises LogInUse when every slot is taken rather than writing nowhere.
+    """
+    host = socket.gethostname()
+    if fcntl is None:
+        # No lock to find a free slot with; one directory per process instead
+        return EventLog(os.path.join(root, f"{host}-{os.getpid()}"), **kwargs)
+    for slot in range(WRITER_SLOTS):
+        try:
+            return EventLog(os.path.join(root, f"{host}-{slot}"), **kwargs)
+        except LogInUse:
+            continue
+    raise LogInUse(f"all {WRITER_SLOTS} event log directories under {root} are in use")
+
+
+# ---------- VIEWS ----------
+class Views:
+    """Feed, counts and moderation state rebuilt by replaying the log."""
+
+    def __init__(self):
+        self.activities = {}  # id -> submitted fields plus moderation status
+        self.cause_counts = Counter()
+        self.status_counts = Counter()
+        self.navigation = Counter()  # "Profile > My Posts" -> visits
+        self.reviews = Counter()  # (moderator, decision) -> posts
+        self.positions = {}  # source directory -> last seq applied
+        self.events = 0
+
+    @classmethod
+    def rebuild(cls, events):
+        views = cls()
+        for event in events:
+            views.apply(event)
+        return views
+
+    def apply(self, event):
+        handler = getattr(self, f"_apply_{event.kind}", None)
+        if handler is not None:
+            handler(event.data)
+        self.positions[event.source] = event.seq
+        self.events += 1
+
+    def _apply_submit(self, data):
+        activity = dict(data["activity"], id=data["id"], status="pending")
+        self.activities[data["id"]] = activity
+        self.cause_counts[activity["cause"]] += 1
+        self.status_counts["pending"] += 1
+
+    def _apply_review(self, data):
+        for activity_id in data["ids"]:
+            activity = self.activities.get(activity_id)
+            if activity is not None:
+                self.status_counts[activity["status"]] -= 1
+                activity["status"] = data["decision"]
+                self.status_counts[data["decision"]] += 1
+        self.reviews[(data["moderator"], data["decision"])] += len(data["ids"])
+
+    def _apply_navigate(self, data):
+        path = [data.get(key) for key in ("menu", "profile_option", "post_type")]
+        self.navigation[" > ".join(part for part in path if part) or "Home"] += 1
+
+    def feed(self, limit=20):
+        """Newest listed (public, not denied) activities, like the Posts feed."""
+        listed = (activity for activity_id, activity in sorted(self.activities.items(), reverse=True)
+                  if activity["status"] != "denied" and activity.get("visibility") != "Private")
+        return [activity for _, activity in zip(range(limit), listed)]
+
+
+# ---------- COMMAND LINE ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m helpize.eventlog", description="Read the event log")
+    parser.add_argument("--dir", default=DEFAULT_LOG_DIR,
+                        help="log root or one writer's directory (defaults to HELPIZE_EVENT_LOG)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    tail = commands.add_parser("tail", help="print the latest events")
+    tail.add_argument("-n", type=int, default=20)
+    commands.add_parser("summary", help="replay the log and print the rebuilt views")
+    args = parser.parse_args(argv)
+
+    if args.command == "tail":
+        latest = []
+        for event in replay(args.dir):
+            latest.append(event)
+            del latest[:-args.n]
+        for event in latest:
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event.time))
+            source = os.path.relpath(event.source, args.dir)
+            print(f"{source:<12} {event.seq:>8} {stamp} {event.kind:<9} {json.dumps(event.data, ensure_ascii=False)}")
+        return 0
+
+    views = Views.rebuild(replay(args.dir))
+    print(f"Replayed {views.events} events from {len(views.positions)} log{'s' if len(views.positions) != 1 else ''}")
+    print(f"Activities: {len(views.activities)} ({', '.join(f'{status} {count}' for status, count in sorted(views.status_counts.items()))})")
+    for cause, count in views.cause_counts.most_common():
+        print(f"  {cause}: {count}")
+    print("Page visits: " + ", ".join(f"{menu} {count}" for menu, count in views.navigation.most_common()))
+    for (moderator, decision), count in sorted(views.reviews.items()):
+        print(f"  moderator {moderator[:8]} {decision} {count}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+"""Text and page counts pulled from uploaded activity files.
+
+Each document is parsed in its own short-lived ``python -m helpize.extract``
+process, at most ``workers`` at a time, so a large or hostile upload never
+holds the Streamlit server's GIL. The process runs at lower CPU priority and
+under an address-space limit, and is killed when it passes the per-file
+timeout; whatever happens to it only fails that one file. (A multiprocessing
+pool is not used: its spawned workers re-import ``__main__``, which under
+Streamlit is the app script itself.)
+
+Results are stored per blob digest, so a document uploaded by several
+organisers is read once, and indexed for full-text search.
+
+- PDF needs the optional ``pypdf`` package
+- DOCX is read with the standard library
+- legacy DOC is best effort: text runs are recovered, page counts are not
+"""
+import argparse
+import json
+import logging
+import os
+import re
+import subprocess
+import sys
+import threading
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from xml.etree import ElementTree
+
+try:
+    import resource
+except ImportError:  # not on Windows; workers run without a memory limit there
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+WORKERS = int(os.environ.get("HELPIZE_EXTRACT_WORKERS", "2"))  # files parsed at once
+TIMEOUT = int(os.environ.get("HELPIZE_EXTRACT_TIMEOUT", "30"))  # seconds per file
+MEMORY_MB = int(os.environ.get("HELPIZE_EXTRACT_MEMORY_MB", "1024"))  # address space per worker
+NICENESS = 10  # workers yield the CPU to the server's script threads
+MAX_FILE_BYTES = 50 * 1024 * 1024
+MAX_TEXT_CHARS = 200_000  # stored per document
+BACKLOG_BATCH = 100  # unextracted files queued on start
+
+# Result statuses
+OK = "ok"
+FAILED = "failed"
+TIMEOUT_STATUS = "timeout"
+UNSUPPORTED = "unsupported"
+RETRY_STATUSES = (FAILED, TIMEOUT_STATUS)  # worth another try when the blob is submitted again
+
+PDF_MAGIC = b"%PDF-"
+ZIP_MAGIC = b"PK\x03\x04"
+OLE_MAGIC = b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1"
+
+WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+APP_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/extended-properties}"
+
+
+# ---------- PARSERS (run in worker processes) ----------
+def extract_pdf(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        return UNSUPPORTED, None, None, "PDF extraction needs the pypdf package"
+    reader = PdfReader(path)
+    parts, size = [], 0
+    for page in reader.pages:
+        if size >= MAX_TEXT_CHARS:
+            break
+        text = page.extract_text() or ""
+        parts.append(text)
+        size += len(text)
+    return OK, len(reader.pages), "\n".join(parts), None
+
+
+def extract_docx(path):
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("word/document.xml")
+        if info.file_size > MAX_FILE_BYTES:
+            return FAILED, None, None, "document.xml is too large"
+        root = ElementTree.fromstring(archive.read(info))
+        pages = None
+        if "docProps/app.xml" in archive.namelist():
+            # Word saves its last page count here; other editors may not
+            found = ElementTree.fromstring(archive.read("docProps/app.xml")).findtext(f"{APP_NS}Pages")
+            pages = int(found) if found and found.isdigit() else None
+    paragraphs = []
+    for paragraph in root.iter(f"{WORD_NS}p"):
+        pieces = []
+        for node in paragraph.iter():
+            if node.tag == f"{WORD_NS}t":
+                pieces.append(node.text or "")
+            elif node.tag == f"{WORD_NS}tab":
+                pieces.append("\t")
+            elif node.tag in (f"{WORD_NS}br", f"{WORD_NS}cr"):
+                pieces.append("\n")
+        paragraphs.append("".join(pieces))
+    return OK, pages, "\n".join(paragraphs), None
+
+
+# Printable runs in Word 97-2003 files, stored either as UTF-16LE or as 8-bit text
+UTF16_RUN = re.compile(rb"(?:[\x20-\x7e\xa0-\xff\r\t]\x00){4,}")
+BYTE_RUN = re.compile(rb"[\x20-\x7e\r\t]{20,}")
+
+
+def extract_doc(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    runs = [run.decode("utf-16-le") for run in UTF16_RUN.findall(data)]
+    if not runs:
+        runs = [run.decode("latin-1") for run in BYTE_RUN.findall(data)]
+    return OK, None, "\n".join(run.replace("\r", "\n") for run in runs), None
+
+
+def extract_document(path):
+    """``(status, pages, text, error)`` for one file, parsed in this process."""
+    if os.path.getsize(path) > MAX_FILE_BYTES:
+        return FAILED, None, None, f"larger than {MAX_FILE_BYTES // (1024 * 1024)} MB"
+    with open(path, "rb") as f:
+        magic = f.read(8)
+    if magic.startswith(PDF_MAGIC):
+        parser = extract_pdf
+    elif magic.startswith(ZIP_MAGIC):
+        parser = extract_docx
+    elif magic.startswith(OLE_MAGIC):
+        parser = extract_doc
+    else:
+        return UNSUPPORTED, None, None, "not a PDF, DOC or DOCX file"
+    try:
+        status, pages, text, error = parser(path)
+    except MemoryError:
+        return FAILED, None, None, "ran out of memory"
+    except Exception as exc:
+        return FAILED, None, None, f"{type(exc).__name__}: {exc}"[:500]
+    if text is not None:
+        text = re.sub(r"[ \t]+\n", "\n", text).strip()[:MAX_TEXT_CHARS]
+    return status, pages, text, error
+
+
+def limit_process(memory_bytes, niceness):
+    """Cap this process's memory and lower its CPU priority."""
+    if resource is not None and memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    if niceness and hasattr(os, "nice"):
+        os.nice(niceness)
+
+
+def run_worker(path, timeout=TIMEOUT, memory_mb=MEMORY_MB):
+    """Parse ``path`` in a child process; ``(status, pages, text, error)``."""
+    command = [sys.executable, "-m", "helpize.extract", "--memory-mb", str(memory_mb), path]
+    # The child must import helpize from wherever this process did
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    try:
+        result = subprocess.run(command, capture_output=True, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        return TIMEOUT_STATUS, None, None, f"took longer than {timeout} s"
+    if result.returncode != 0:
+        detail = result.stderr.decode(errors="replace").strip().splitlines()[-1:] or [f"exit code {result.returncode}"]
+        return FAILED, None, None, f"worker failed: {detail[0]}"[:500]
+    return tuple(json.loads(result.stdout))
+
+
+# ---------- EXTRACTOR ----------
+class TextExtractor:
+    """Queues uploaded documents for extraction and stores the results.
+
+    ``submit()`` returns at once; a pool thread runs the worker process and
+    writes the result to the activity store. Files stored before extraction
+    existed, or whose extraction was cut short by a restart, are queued by
+    ``start()``.
+    """
+
+    def __init__(self, store, blobs, workers=WORKERS, timeout=TIMEOUT, memory_mb=MEMORY_MB):
+        self.store = store
+        self.blobs = blobs
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self._pending = set()  # digests queued or in flight
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="text-extract")
+        self.counts = {OK: 0, FAILED: 0, TIMEOUT_STATUS: 0, UNSUPPORTED: 0}
+
+    def start(self):
+        """Queue stored files that have no extraction result yet."""
+        for digest in self.store.unextracted_documents(BACKLOG_BATCH):
+            self.submit(digest)
+        return self
+
+    def stop(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def submit(self, digest):
+        """Queue the blob ``digest``; False if skipped.
+
+        Blobs already queued, or already extracted by an earlier upload of the
+        same file, are skipped; a previous attempt that failed or timed out
+        is retried.
+        """
+        if not digest:
+            return False
+        # A result is saved before its digest leaves _pending, so one of the two checks sees it
+        status = self.store.document_status(digest)
+        if status is not None and status not in RETRY_STATUSES:
+            return False
+        with self._lock:
+            if digest in self._pending:
+                return False
+            self._pending.add(digest)
+        self._executor.submit(self._extract, digest)
+        return True
+
+    def stats(self):
+        with self._lock:
+            pending = len(self._pending)
+        return {"pending": pending, **{f"files_{status}": count for status, count in self.counts.items()}}
+
+    def _extract(self, digest):
+        try:
+            status, pages, text, error = run_worker(self.blobs.path(digest), self.timeout, self.memory_mb)
+            self.store.save_document_text(digest, status, pages, text, error)
+            self.counts[status] += 1
+            if status != OK:
+                logger.warning("text extraction %s for blob %s: %s", status, digest, error)
+        except Exception:
+            logger.exception("text extraction failed for blob %s", digest)
+        finally:
+            with self._lock:
+                self._pending.discard(digest)
+
+    def wait_idle(self, timeout=None, poll=0.05):
+        """Block until nothing is queued (used by scripts); False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._pending:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(poll)
+        return True
+
+
+# ---------- WORKER PROCESS ----------
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m helpize.extract",
+                                     description="Print a document's extraction result as JSON")
+    parser.add_argument("path")
+    parser.add_argument("--memory-mb", type=int, default=MEMORY_MB, help="address space limit, 0 for none")
+    args = parser.parse_args(argv)
+    limit_process(args.memory_mb * 1024 * 1024, NICENESS)
+    json.dump(extract_document(args.path), sys.stdout)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
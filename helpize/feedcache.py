@@ -0,0 +1,76 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- FEED CACHE ----------
+class FeedCache:
+    """Bounded LRU cache for feed query results, shared by every session.
+
+    Entries expire after ``ttl`` seconds and the whole cache is dropped with
+    ``invalidate()`` whenever activities change, so a rerun only hits SQLite
+    when the feed is actually stale. Cached values are shared between
+    sessions and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize=256, ttl=30.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.builds = 0
+        self.build_seconds = 0.0
+
+    def get_or_build(self, key, build):
+        """Return the cached value for ``key``, calling ``build()`` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            generation = self._generation
+
+        # Build outside the lock so slow queries don't serialise other sessions
+        started = time.perf_counter()
+        value = build()
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.builds += 1
+            self.build_seconds += elapsed
+            # Skip storing if the data changed while we were building
+            if generation == self._generation:
+                self._entries[key] = (now + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        logger.debug("feed cache build %r took %.1f ms", key, elapsed * 1000)
+        return value
+
+    def invalidate(self):
+        """Drop every entry; call after any write that changes the feed."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        """Snapshot of hit ratio and build time for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "builds": self.builds,
+                "avg_build_ms": self.build_seconds / self.builds * 1000 if self.builds else 0.0,
+            }
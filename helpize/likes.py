@@ -0,0 +1,158 @@
+import heapq
+import logging
+import math
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+TRENDING_SIZE = 10
+HALF_LIFE = 6 * 3600  # seconds for a like's weight to halve
+SEED_WINDOW = 7 * 24 * 3600  # likes older than this barely count; skip them on startup
+
+# Rescale scores before exp() gets anywhere near float overflow
+MAX_EXPONENT = 50.0
+
+
+# ---------- TRENDING ----------
+class Trending:
+    """Incrementally maintained top-N activities by time-decayed like score.
+
+    Uses forward decay: a like at time ``t`` adds ``exp((t - landmark) / tau)``,
+    so older scores never have to be decayed and comparing two scores is the
+    same as comparing their decayed values now. The top N are kept in a
+    min-heap; a like only touches that heap in O(log N) and nothing is sorted
+    on a rerun. Not thread-safe on its own; LikeCounter serialises access.
+    """
+
+    def __init__(self, size=TRENDING_SIZE, half_life=HALF_LIFE, now=None):
+        self.size = size
+        self.tau = half_life / math.log(2)
+        self.landmark = time.time() if now is None else now
+        self.scores = {}
+        self._heap = []  # (score, activity_id), smallest of the top N first
+        self._top = set()
+
+    def add(self, activity_id, weight=1.0, at=None):
+        """Count ``weight`` likes (negative to undo) made at time ``at``."""
+        at = time.time() if at is None else at
+        exponent = (at - self.landmark) / self.tau
+        if exponent > MAX_EXPONENT:
+            self._rescale(at)
+            exponent = 0.0
+        score = self.scores.get(activity_id, 0.0) + weight * math.exp(exponent)
+        if score <= 1e-9:
+            self.scores.pop(activity_id, None)
+        else:
+            self.scores[activity_id] = score
+        if activity_id in self._top:
+            if weight < 0:
+                # A top entry fell; something outside the heap may now beat it
+                self._rebuild()
+            else:
+                # The old (score, id) pair goes stale and is skipped until compacted
+                heapq.heappush(self._heap, (score, activity_id))
+                self._compact_if_stale()
+        elif weight > 0:
+            self._offer(activity_id, score)
+
+    def top(self, n=None):
+        """Up to ``n`` activity ids, hottest first."""
+        live = [(score, activity_id) for activity_id, score in self._current()]
+        return [activity_id for _, activity_id in sorted(live, reverse=True)[:n or self.size]]
+
+    def _offer(self, activity_id, score):
+        self._prune()
+        if len(self._top) < self.size:
+            heapq.heappush(self._heap, (score, activity_id))
+            self._top.add(activity_id)
+        elif score > self._heap[0][0]:
+            _, evicted = heapq.heapreplace(self._heap, (score, activity_id))
+            self._top.discard(evicted)
+            self._top.add(activity_id)
+
+    def _prune(self):
+        """Drop heap entries whose score has since changed."""
+        while self._heap and self.scores.get(self._heap[0][1]) != self._heap[0][0]:
+            _, activity_id = heapq.heappop(self._heap)
+            if activity_id not in self.scores:
+                self._top.discard(activity_id)
+        self._compact_if_stale()
+
+    def _compact_if_stale(self):
+        """Rebuild the heap from the current top N once stale pairs outnumber it."""
+        if len(self._heap) > 4 * self.size:
+            self._heap = [(self.scores[activity_id], activity_id) for activity_id in self._top
+                          if activity_id in self.scores]
+            heapq.heapify(self._heap)
+
+    def _current(self):
+        return [(activity_id, self.scores[activity_id]) for activity_id in self._top if activity_id in self.scores]
+
+    def _rebuild(self):
+        best = heapq.nlargest(self.size, self.scores.items(), key=lambda item: item[1])
+        self._heap = [(score, activity_id) for activity_id, score in best]
+        heapq.heapify(self._heap)
+        self._top = {activity_id for activity_id, _ in best}
+
+    def _rescale(self, now):
+        factor = math.exp(-(now - self.landmark) / self.tau)
+        self.landmark = now
+        self.scores = {activity_id: score * factor for activity_id, score in self.scores.items() if score * factor > 1e-9}
+        self._rebuild()
+
+
+# ---------- LIKE COUNTER ----------
+class LikeCounter:
+    """Likes and a live trending list.
+
+    Each like or unlike writes its row and ``activities.like_count`` in one
+    transaction, so the count can't drift from the likes table. SQLite
+    serialises every write through one lock, so deferring only the counter
+    would not spare a busy post any contention. What is kept in memory is
+    the trending top-N, which would otherwise need a query over recent likes
+    on every rerun.
+    """
+
+    def __init__(self, store, trending_size=TRENDING_SIZE, half_life=HALF_LIFE):
+        self.store = store
+        self.trending = Trending(trending_size, half_life)
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self):
+        """Repair stored like counts and seed trending from recent likes."""
+        if not self._started:
+            fixed = self.store.recount_likes()
+            if fixed:
+                logger.warning("corrected the like count of %d activities", fixed)
+            now = time.time()
+            with self._lock:
+                for activity_id, liked_at in self.store.recent_likes(now - SEED_WINDOW):
+                    self.trending.add(activity_id, at=liked_at)
+            self._started = True
+        return self
+
+    def like(self, activity_id, user_id):
+        """Like an activity; returns False if it was already liked."""
+        if not self.store.add_like(activity_id, user_id):
+            return False
+        self._record(activity_id, 1)
+        return True
+
+    def unlike(self, activity_id, user_id):
+        """Take a like back; returns False if there was none."""
+        if not self.store.remove_like(activity_id, user_id):
+            return False
+        self._record(activity_id, -1)
+        return True
+
+    def top(self, n=None):
+        """Trending activity ids, hottest first."""
+        with self._lock:
+            return self.trending.top(n)
+
+    def _record(self, activity_id, delta):
+        with self._lock:
+            self.trending.add(activity_id, delta)
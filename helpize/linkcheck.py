@@ -0,0 +1,209 @@
+import asyncio
+import ipaddress
+import logging
+import socket
+import threading
+import time
+from urllib.parse import urljoin, urlsplit
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp is optional; without it links are never checked
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+CONCURRENCY = 20  # links checked at once
+PER_HOST = 4  # open connections to any single host
+TIMEOUT = 10  # seconds per request
+RESULT_TTL = 6 * 3600  # seconds before a link is checked again
+SWEEP_INTERVAL = 600  # seconds between re-check sweeps
+
+MAX_REDIRECTS = 5
+
+# Some servers refuse HEAD; retry these with GET
+HEAD_UNSUPPORTED = {403, 405, 501}
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+
+# ---------- ADDRESS POLICY ----------
+# Links are user input, so the checker must never become a way to probe the
+# server's own network: only globally routable addresses are contacted, on
+# the first request and after every redirect.
+class BlockedAddress(Exception):
+    """A link (or a redirect) points at a loopback, private or link-local address."""
+
+
+def is_public_address(address):
+    """Whether a link check may connect to ``address`` (an ipaddress object)."""
+    if address.version == 6 and address.ipv4_mapped is not None:
+        address = address.ipv4_mapped
+    return address.is_global and not address.is_multicast
+
+
+class PublicResolver:
+    """aiohttp resolver that drops every non-public address a host resolves to.
+
+    Connections only go to the addresses returned here, so a hostname can't
+    be pointed at an internal address between a check and the connect.
+    """
+
+    def __init__(self, allowed=is_public_address):
+        self.allowed = allowed
+        self._resolver = aiohttp.ThreadedResolver()
+
+    async def resolve(self, host, port=0, family=socket.AF_INET):
+        results = await self._resolver.resolve(host, port, family)
+        public = [result for result in results if self.allowed(ipaddress.ip_address(result["host"]))]
+        if not public:
+            raise OSError(f"{host} does not resolve to a public address")
+        return public
+
+    async def close(self):
+        await self._resolver.close()
+
+
+# ---------- LINK CHECKER ----------
+class LinkChecker:
+    """Background registration-link health checker.
+
+    Runs an asyncio loop on its own daemon thread with one pooled aiohttp
+    session, so ``enqueue()`` returns immediately and the Streamlit script
+    thread never waits on the network. Results are cached in memory and
+    written to the activity store for every session to read.
+    """
+
+    def __init__(self, store, concurrency=CONCURRENCY, per_host=PER_HOST, timeout=TIMEOUT,
+                 ttl=RESULT_TTL, sweep_interval=SWEEP_INTERVAL, allowed=is_public_address):
+        if aiohttp is None:
+            raise RuntimeError("LinkChecker needs the aiohttp package")
+        self.store = store
+        self.allowed = allowed  # address policy; tests against a local stand-in loosen it
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.ttl = ttl
+        self.sweep_interval = sweep_interval
+        self._checked = {}  # url -> time the cached result expires
+        self._pending = set()  # queued or in flight
+        self._loop = None
+        self._queue = None
+        self._thread = None
+        self._ready = threading.Event()
+
+    def start(self):
+        """Start the event loop thread; safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="link-checker", daemon=True)
+            self._thread.start()
+            self._ready.wait()
+        return self
+
+    def stop(self):
+        """Stop the loop and close the HTTP session."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stopping.set)
+            self._thread.join(timeout=self.timeout + 5)
+            self._thread = self._loop = None
+            self._ready.clear()
+
+    def enqueue(self, url):
+        """Schedule ``url`` for checking unless it has a fresh result."""
+        if not url or not url.startswith(("http://", "https://")):
+            return False
+        if self._checked.get(url, 0) > time.time() or url in self._pending:
+            return False
+        self._pending.add(url)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, url)
+        return True
+
+    def wait_idle(self, timeout=None):
+        """Block until every queued link has been checked (used by scripts)."""
+        future = asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop)
+        future.result(timeout)
+
+    # ---------- EVENT LOOP ----------
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._loop.run_until_complete(self._main())
+        self._loop.close()
+
+    async def _main(self):
+        self._queue = asyncio.Queue()
+        self._stopping = asyncio.Event()
+        connector = aiohttp.TCPConnector(limit=self.concurrency, limit_per_host=self.per_host, ttl_dns_cache=300,
+                                         resolver=PublicResolver(self.allowed))
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout,
+                                         headers={"User-Agent": "Helpize link checker"}) as session:
+            workers = [asyncio.create_task(self._worker(session)) for _ in range(self.concurrency)]
+            sweeper = asyncio.create_task(self._sweep())
+            self._ready.set()
+            await self._stopping.wait()
+            for task in workers + [sweeper]:
+                task.cancel()
+            await asyncio.gather(*workers, sweeper, return_exceptions=True)
+
+    async def _worker(self, session):
+        while True:
+            url = await self._queue.get()
+            try:
+                status, http_status = await self._check(session, url)
+                await asyncio.to_thread(self.store.save_link_status, url, status, http_status)
+                self._checked[url] = time.time() + self.ttl
+            except Exception:
+                logger.exception("link check failed for %s", url)
+            finally:
+                self._pending.discard(url)
+                self._queue.task_done()
+
+    async def _check(self, session, url):
+        """Return ``(status, http_status)`` where status is ok/broken/unreachable.
+
+        Blocked addresses are reported as unreachable, like closed ports, so
+        the status says nothing about the server's own network.
+        """
+        try:
+            http_status = await self._request(session, "HEAD", url)
+            if http_status in HEAD_UNSUPPORTED:
+                http_status = await self._request(session, "GET", url)
+        except (aiohttp.ClientError, asyncio.TimeoutError, BlockedAddress) as exc:
+            logger.debug("link %s unreachable: %s", url, exc)
+            return "unreachable", None
+        return ("ok" if http_status < 400 else "broken"), http_status
+
+    async def _request(self, session, method, url):
+        """Final HTTP status for ``url``, following redirects one hop at a time."""
+        for _ in range(MAX_REDIRECTS + 1):
+            self._check_target(url)
+            async with session.request(method, url, allow_redirects=False) as response:
+                location = response.headers.get("Location")
+                if response.status not in REDIRECT_STATUSES or not location:
+                    return response.status
+                request_info = response.request_info
+            url = urljoin(url, location)
+        raise aiohttp.TooManyRedirects(request_info, (), message=f"more than {MAX_REDIRECTS} redirects")
+
+    def _check_target(self, url):
+        """Refuse non-http(s) URLs and literal non-public IPs; hostnames go through PublicResolver."""
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise BlockedAddress(url)
+        try:
+            address = ipaddress.ip_address(parts.hostname)
+        except ValueError:
+            return
+        if not self.allowed(address):
+            raise BlockedAddress(url)
+
+    async def _sweep(self):
+        """Periodically re-queue links whose stored result has gone stale."""
+        while True:
+            stale = await asyncio.to_thread(self.store.stale_links, self.ttl, 500)
+            for url in stale:
+                if url not in self._pending:
+                    self._pending.add(url)
+                    self._queue.put_nowait(url)
+            await asyncio.sleep(self.sweep_interval)
@@ -0,0 +1,230 @@
+import functools
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+# Fraction of observations recorded; lower it if even cheap timing matters
+SAMPLE_RATE = float(os.environ.get("HELPIZE_METRICS_SAMPLE", "1.0"))
+METRICS_HOST = os.environ.get("HELPIZE_METRICS_HOST", "127.0.0.1")
+METRICS_PORT = int(os.environ.get("HELPIZE_METRICS_PORT", "9464"))  # 0 disables the endpoint
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+ELEMENT_BUCKETS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+# Fold shards of finished threads once this many have piled up
+MAX_SHARDS = 256
+
+
+def sampled():
+    """Whether to record this observation."""
+    return SAMPLE_RATE >= 1.0 or random.random() < SAMPLE_RATE
+
+
+# ---------- HISTOGRAM ----------
+class Histogram:
+    """Prometheus-style histogram with per-thread shards.
+
+    Each thread writes only to its own shard, so ``observe()`` takes no lock.
+    Shards are merged when the metrics are collected; shards of threads that
+    have exited are folded into a single total so memory stays bounded even
+    though Streamlit starts a new script thread for many reruns.
+    """
+
+    def __init__(self, name, documentation, buckets=SECONDS_BUCKETS, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._local = threading.local()
+        self._shards = []  # (thread, {labels: [bucket counts..., sum]})
+        self._retired = {}
+        self._lock = threading.Lock()  # only for shard registration and collection
+        REGISTRY.append(self)
+
+    def observe(self, value, *labels):
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._new_shard()
+        series = shard.get(labels)
+        if series is None:
+            series = shard[labels] = [0] * (len(self.buckets) + 2)
+        series[bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def time(self, *labels):
+        """Context manager timing a block into this histogram."""
+        return _Timer(self, labels)
+
+    def _new_shard(self):
+        shard = {}
+        with self._lock:
+            if len(self._shards) >= MAX_SHARDS:
+                self._fold_finished()
+            self._shards.append((threading.current_thread(), shard))
+        self._local.shard = shard
+        return shard
+
+    def _fold_finished(self):
+        live = []
+        for thread, shard in self._shards:
+            if thread.is_alive():
+                live.append((thread, shard))
+            else:
+                _merge(self._retired, shard)
+        self._shards = live
+
+    def collect(self):
+        """Merged ``{labels: [bucket counts..., sum]}`` across every shard."""
+        with self._lock:
+            self._fold_finished()
+            merged = {}
+            _merge(merged, self._retired)
+            for _, shard in self._shards:
+                _merge(merged, dict(shard))
+        return merged
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.collect().items()):
+            pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labels)]
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), series[:-1]):
+                cumulative += count
+                bucket_labels = ",".join(pairs + [f'le="{bound}"'])
+                lines.append(f"{self.name}_bucket{{{bucket_labels}}} {cumulative}")
+            label_text = "{" + ",".join(pairs) + "}" if pairs else ""
+            lines.append(f"{self.name}_sum{label_text} {series[-1]}")
+            lines.append(f"{self.name}_count{label_text} {cumulative}")
+        return "\n".join(lines)
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter() if sampled() else None
+        return self
+
+    def __exit__(self, *exc):
+        if self.started is not None:
+            self.histogram.observe(time.perf_counter() - self.started, *self.labels)
+        return False
+
+
+def _merge(target, shard):
+    for labels, series in list(shard.items()):
+        total = target.get(labels)
+        if total is None:
+            target[labels] = list(series)
+        else:
+            for i, value in enumerate(series):
+                total[i] += value
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def timed(histogram, *labels):
+    """Decorator timing every call of a function into ``histogram``."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(*labels):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# ---------- REGISTRY ----------
+REGISTRY = []
+COLLECTORS = []  # callables returning extra exposition lines
+
+
+def register_collector(collector):
+    """Add a callable whose returned lines are appended to every scrape."""
+    COLLECTORS.append(collector)
+
+
+def gauge_lines(prefix, values):
+    """Exposition lines for a dict of numbers, one gauge per key."""
+    lines = []
+    for key, value in values.items():
+        lines.append(f"# TYPE {prefix}_{key} gauge")
+        lines.append(f"{prefix}_{key} {value}")
+    return lines
+
+
+def render_prometheus():
+    """Every metric in the Prometheus text exposition format."""
+    parts = [metric.render() for metric in REGISTRY]
+    for collector in COLLECTORS:
+        parts.append("\n".join(collector()))
+    return "\n".join(part for part in parts if part) + "\n"
+
+
+PAGE_SECONDS = Histogram(
+    "helpize_page_render_seconds", "Time to run one page of the app.", labelnames=("variant", "page"))
+PAGE_ELEMENTS = Histogram(
+    "helpize_page_elements", "Elements sent to the browser by one rerun.", ELEMENT_BUCKETS, ("variant", "page"))
+SECTION_SECONDS = Histogram(
+    "helpize_section_seconds", "Time spent in instrumented sections of a page.", labelnames=("section",))
+QUERY_SECONDS = Histogram(
+    "helpize_storage_query_seconds", "Time spent in ActivityStore calls.", labelnames=("method",))
+
+
+# ---------- INSTRUMENTED STORE ----------
+class InstrumentedStore:
+    """Proxy timing every ActivityStore method call into QUERY_SECONDS."""
+
+    def __init__(self, store):
+        self._store = store
+
+    def __getattr__(self, name):
+        attribute = getattr(self._store, name)
+        if name.startswith("_") or not callable(attribute):
+            return attribute
+        wrapper = timed(QUERY_SECONDS, name)(attribute)
+        setattr(self, name, wrapper)  # cache so the wrapper is built once per method
+        return wrapper
+
+
+# ---------- HTTP ENDPOINT ----------
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_metrics(host=METRICS_HOST, port=METRICS_PORT):
+    """Serve /metrics on a daemon thread; returns the server or None."""
+    if not port:
+        return None
+    try:
+        server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as exc:
+        # Another app process on this host already owns the port
+        logger.warning("metrics endpoint not started on %s:%s: %s", host, port, exc)
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
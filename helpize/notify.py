@@ -0,0 +1,351 @@
+"""Reminder emails for upcoming registered events.
+
+A background scheduler keeps a heap of reminders keyed by the time they are
+due (``remind_days`` before the event date). Every due reminder for one user
+goes out in a single email through a small pool of SMTP connections, which
+retries transient failures and is rate limited.
+
+Every process with HELPIZE_SMTP_HOST set runs a scheduler; reminders are
+claimed in the shared database before sending, so each goes out once.
+
+Try it against a local SMTP stand-in::
+
+    python -m aiosmtpd -n -l localhost:8025
+    HELPIZE_SMTP_HOST=localhost HELPIZE_SMTP_PORT=8025 python -m helpize.notify --once
+"""
+import argparse
+import heapq
+import logging
+import os
+import queue
+import smtplib
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date as Date, datetime, time as Time, timedelta
+from email.message import EmailMessage
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+SMTP_HOST = os.environ.get("HELPIZE_SMTP_HOST")  # reminders are off when unset
+SMTP_PORT = int(os.environ.get("HELPIZE_SMTP_PORT", "25"))
+SMTP_USER = os.environ.get("HELPIZE_SMTP_USER")
+SMTP_PASSWORD = os.environ.get("HELPIZE_SMTP_PASSWORD")
+SMTP_STARTTLS = os.environ.get("HELPIZE_SMTP_STARTTLS", "") == "1"
+SMTP_FROM = os.environ.get("HELPIZE_SMTP_FROM", "Helpize <reminders@helpize.local>")
+SMTP_RATE = float(os.environ.get("HELPIZE_SMTP_RATE", "5"))  # messages per second
+
+POOL_SIZE = 2  # open SMTP connections
+SEND_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0  # seconds, doubled after each failed attempt
+TIMEOUT = 30  # seconds per SMTP command
+
+REMIND_DAYS = [1, 2, 3, 7]  # choices offered on Settings
+REMINDER_TIME = Time(9, 0)  # local time reminders go out on their day
+RELOAD_INTERVAL = 300  # seconds between scans for new registrations and opt-ins
+HORIZON_DAYS = max(REMIND_DAYS) + 1  # how far ahead a scan looks
+RETRY_DELAY = 600  # seconds before a batch that failed every attempt is tried again
+MAX_BATCH = 200  # reminders sent per wake-up
+
+
+# ---------- RATE LIMITER ----------
+class RateLimiter:
+    """Token bucket: ``rate`` messages per second with bursts of ``burst``."""
+
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.capacity = burst or max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a message may be sent."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+# ---------- SMTP POOL ----------
+class SMTPPool:
+    """A few reusable SMTP connections with retry and rate limiting."""
+
+    def __init__(self, host=SMTP_HOST, port=SMTP_PORT, user=SMTP_USER, password=SMTP_PASSWORD,
+                 starttls=SMTP_STARTTLS, size=POOL_SIZE, rate=SMTP_RATE,
+                 attempts=SEND_ATTEMPTS, backoff=RETRY_BACKOFF, timeout=TIMEOUT):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.starttls = starttls
+        self.attempts = attempts
+        self.backoff = backoff
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def send(self, message):
+        """Send one EmailMessage; raises the last error once every attempt failed.
+
+        Connection drops, timeouts and 4xx replies are retried with backoff
+        on a fresh connection. Permanent 5xx rejections are raised at once.
+        """
+        delay = self.backoff
+        for attempt in range(1, self.attempts + 1):
+            self.limiter.acquire()
+            with self._slots:
+                conn = self._checkout()
+                try:
+                    conn.send_message(message)
+                except smtplib.SMTPResponseException as exc:
+                    self._discard(conn)
+                    if exc.smtp_code >= 500 or attempt == self.attempts:
+                        raise
+                    error = exc
+                except smtplib.SMTPRecipientsRefused:
+                    self._checkin(conn)
+                    raise
+                except (smtplib.SMTPException, OSError) as exc:
+                    self._discard(conn)
+                    if attempt == self.attempts:
+                        raise
+                    error = exc
+                else:
+                    self._checkin(conn)
+                    return
+            logger.warning("SMTP send attempt %d failed: %s; retrying in %.1fs", attempt, error, delay)
+            time.sleep(delay)
+            delay *= 2
+
+    def close(self):
+        """Quit every idle connection."""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def _checkout(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+        try:
+            conn.noop()
+            return conn
+        except (smtplib.SMTPException, OSError):
+            self._discard(conn)
+            return self._connect()
+
+    def _connect(self):
+        conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        if self.starttls:
+            conn.starttls()
+        if self.user:
+            conn.login(self.user, self.password)
+        return conn
+
+    def _checkin(self, conn):
+        self._idle.put(conn)
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.quit()
+        except (smtplib.SMTPException, OSError):
+            conn.close()
+
+
+# ---------- REMINDER SCHEDULER ----------
+def remind_at(event_date, remind_days):
+    """Epoch seconds when the reminder for an event on ``event_date`` is due."""
+    day = Date.fromisoformat(event_date) - timedelta(days=remind_days)
+    return datetime.combine(day, REMINDER_TIME).timestamp()
+
+
+def one_line(text):
+    """Collapse a multi-line description; headers can't hold newlines."""
+    return " ".join(text.split())
+
+
+def reminder_message(email, activities, sender=SMTP_FROM):
+    """One email listing every upcoming event in ``activities``."""
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = email
+    if len(activities) == 1:
+        message["Subject"] = f"Reminder: {one_line(activities[0]['about_event'])} on {activities[0]['date']}"
+    else:
+        message["Subject"] = f"Reminder: {len(activities)} upcoming events you registered for"
+    lines = ["You registered for these volunteering events:", ""]
+    for activity in sorted(activities, key=lambda activity: activity["date"]):
+        lines.append(f"- {activity['date']}: {one_line(activity['about_event'])} at {activity['place']}")
+        lines.append(f"  {activity['registration_link']}")
+    lines += ["", "Thank you for helping out!", "Change or turn off reminders on the Settings page."]
+    message.set_content("\n".join(lines))
+    return message
+
+
+class ReminderScheduler:
+    """Background thread sending reminder emails when they fall due.
+
+    Reminders are loaded from the store every ``reload_interval`` seconds
+    (or right away after ``wake()``) into a heap ordered by due time, so the
+    thread only sleeps until the next one. Due reminders are claimed in the
+    store before sending, so every replica (and ``python -m helpize.notify``)
+    can run a scheduler without anyone getting the same email twice.
+    Details are re-read after the claim, so cancelled registrations and
+    opt-outs are respected.
+    """
+
+    def __init__(self, store, mailer, reload_interval=RELOAD_INTERVAL,
+                 retry_delay=RETRY_DELAY, max_batch=MAX_BATCH):
+        self.store = store
+        self.mailer = mailer
+        self.reload_interval = reload_interval
+        self.retry_delay = retry_delay
+        self.max_batch = max_batch
+        self._heap = []  # (due, activity_id, user_id)
+        self._queued = set()
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+        self._next_reload = 0.0
+
+    def start(self):
+        """Start the scheduler thread; safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="reminders", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the thread and close the SMTP connections."""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout=10)
+            self._thread = None
+        self.mailer.close()
+
+    def wake(self):
+        """Rescan the store now, e.g. after a user opts in or registers."""
+        self._next_reload = 0.0
+        self._wake.set()
+
+    def run_once(self, now=None):
+        """Load new reminders and send every due one; returns emails sent."""
+        now = time.time() if now is None else now
+        self.load(now)
+        return self.send_due(now)
+
+    def load(self, now):
+        """Queue unsent reminders for events within the horizon."""
+        today = datetime.fromtimestamp(now).date()
+        for activity_id, user_id, event_date, remind_days in self.store.reminder_candidates(
+                today, today + timedelta(days=HORIZON_DAYS)):
+            if (activity_id, user_id) not in self._queued:
+                self._queued.add((activity_id, user_id))
+                heapq.heappush(self._heap, (remind_at(event_date, remind_days), activity_id, user_id))
+        self._next_reload = now + self.reload_interval
+
+    def send_due(self, now):
+        """Send every reminder due by ``now``, one email per user."""
+        keys = []
+        while self._heap and self._heap[0][0] <= now and len(keys) < self.max_batch:
+            _, activity_id, user_id = heapq.heappop(self._heap)
+            keys.append((activity_id, user_id))
+        if not keys:
+            return 0
+        # Keys another process claimed first are theirs to send
+        claimed = self.store.claim_reminders(keys)
+        by_user = defaultdict(list)
+        for activity in self.store.reminder_details(claimed):
+            by_user[activity["user_id"]].append(activity)
+        wanted = {(activity["id"], activity["user_id"]) for activities in by_user.values() for activity in activities}
+        self.store.release_reminders([key for key in claimed if key not in wanted])
+        sent = 0
+        for user_activities in by_user.values():
+            user_keys = [(activity["id"], activity["user_id"]) for activity in user_activities]
+            try:
+                self.mailer.send(reminder_message(user_activities[0]["email"], user_activities))
+            except smtplib.SMTPResponseException as exc:
+                if exc.smtp_code < 500:
+                    self._retry_later(user_keys, now)
+                    continue
+                logger.error("reminder to %s rejected: %s", user_activities[0]["email"], exc)
+                self.store.mark_reminders(user_keys, "failed")
+            except smtplib.SMTPRecipientsRefused as exc:
+                logger.error("reminder to %s refused: %s", user_activities[0]["email"], exc)
+                self.store.mark_reminders(user_keys, "failed")
+            except (smtplib.SMTPException, OSError) as exc:
+                logger.warning("reminder to %s failed: %s", user_activities[0]["email"], exc)
+                self._retry_later(user_keys, now)
+            else:
+                self.store.mark_reminders(user_keys)
+                sent += 1
+        # Anything not retried is done (sent, failed or no longer wanted)
+        retried = {(activity_id, user_id) for _, activity_id, user_id in self._heap}
+        self._queued.difference_update(key for key in keys if key not in retried)
+        return sent
+
+    def _retry_later(self, keys, now):
+        self.store.release_reminders(keys)
+        for activity_id, user_id in keys:
+            heapq.heappush(self._heap, (now + self.retry_delay, activity_id, user_id))
+
+    def _run(self):
+        while not self._stopping:
+            now = time.time()
+            try:
+                if now >= self._next_reload:
+                    self.load(now)
+                self.send_due(now)
+            except Exception:
+                logger.exception("reminder run failed")
+                self._next_reload = now + self.reload_interval
+            next_due = self._heap[0][0] if self._heap else float("inf")
+            self._wake.wait(max(0.0, min(next_due, self._next_reload) - time.time()))
+            self._wake.clear()
+
+
+# ---------- COMMAND LINE ----------
+def main(argv=None):
+    from helpize.storage import ActivityStore
+
+    parser = argparse.ArgumentParser(prog="python -m helpize.notify", description="Send due reminder emails")
+    parser.add_argument("--once", action="store_true", help="send what is due now and exit")
+    parser.add_argument("--db", help="database path (defaults to HELPIZE_DB or data/helpize.db)")
+    args = parser.parse_args(argv)
+    if not SMTP_HOST:
+        parser.error("set HELPIZE_SMTP_HOST (and HELPIZE_SMTP_PORT) to send reminders")
+
+    logging.basicConfig(level=logging.INFO)
+    store = ActivityStore(args.db) if args.db else ActivityStore()
+    scheduler = ReminderScheduler(store, SMTPPool())
+    if args.once:
+        sent = scheduler.run_once()
+        scheduler.mailer.close()
+        print(f"Sent {sent} reminder email{'s' if sent != 1 else ''}")
+        return 0
+    scheduler.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        scheduler.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,265 @@
+import calendar
+import streamlit as st
+from datetime import date as Date, datetime, timedelta
+from pathlib import Path
+from helpize import eventlog
+from helpize.bulk import is_web_link
+from helpize.metrics import SECTION_SECONDS, timed
+from helpize.core import (
+    PAGE_SIZE,
+    get_blobs,
+    get_duplicate_detector,
+    get_feed_cache,
+    get_link_checker,
+    get_store,
+    get_text_extractor,
+    invalidate_feed_cache,
+    log_event,
+    render_activities,
+    save_session,
+    toggle_dark_mode,
+    variant,
+)
+from helpize.storage import CAUSES, PUBLIC, VISIBILITIES
+
+# ---------- DASHBOARD FUNCTIONS ----------
+def dashboard_page():
+    """Volunteer Dashboard page."""
+    st.header("📊 Volunteer Dashboard")
+    st.write("Manage your activities and events here.")
+
+    # Dark mode toggle
+    st.button("Toggle Dark Mode 🌙/☀️", on_click=toggle_dark_mode)
+
+    # Tabs for navigation
+    # Tab switches rerun the page so the charts are only built while Analytics is open
+    tab1, tab2, tab3, tab4 = st.tabs(["Submit Activity", "View Activities", "Calendar", "Analytics"],
+                                     key="dashboard_tab", on_change="rerun")
+
+    with tab1:
+        submit_activity()
+
+    with tab2:
+        view_activities()
+
+    with tab3:
+        calendar_view()
+
+    with tab4:
+        if tab4.open:
+            analytics_view()
+
+@timed(SECTION_SECONDS, "submit_activity")
+def submit_activity():
+    """Submit Activity form."""
+    st.subheader("Submit Activity")
+    with st.form("activity_form", clear_on_submit=True):
+        st.markdown("### Activity Details")
+        registration_link = st.text_input("Registration Link", placeholder="https://example.com", help="Provide a link for registration.")
+        activity_file = st.file_uploader("Upload Activity File (Optional)", type=["pdf", "doc", "docx"], help="Upload supporting documents.")
+        date = st.date_input("Date", min_value=datetime.today(), help="Select the event date.")
+        place = st.text_input("Place", placeholder="e.g., City Hall", help="Location of the event.")
+        about_event = st.text_area("About the Event", placeholder="Describe the event...", height=100, help="Detailed description.")
+        cause = st.selectbox("Cause", ["Select Cause"] + CAUSES, help="Choose the cause category.")
+        poster = st.file_uploader("Poster (Image Upload)", type=["jpg", "png", "jpeg"], help="Upload an event poster.")
+        capacity = st.number_input("Capacity", min_value=0, value=0, step=1, help="Maximum number of volunteers; 0 means unlimited.")
+        # Only offered where moderators can review private posts
+        visibility = PUBLIC
+        if variant()["private_review"]:
+            visibility = st.radio("Visibility", VISIBILITIES, horizontal=True,
+                                  help="Private events are reviewed separately and left out of the public feeds and search.")
+
+        submitted = st.form_submit_button("Submit Activity", use_container_width=True)
+        if submitted:
+            if not (registration_link and date and place and about_event and cause != "Select Cause" and poster):
+                st.error("Please fill all required fields marked with *.")
+            elif not is_web_link(registration_link):
+                st.error("The registration link must start with http:// or https://.")
+            else:
+                blobs = get_blobs()
+                poster_blob = blobs.put_upload(poster)
+                blobs.submit_variants(poster_blob)
+                activity = {
+                    "registration_link": registration_link.strip(),
+                    "activity_file": activity_file.name if activity_file else None,
+                    "date": str(date),
+                    "place": place,
+                    "about_event": about_event,
+                    "cause": cause,
+                    "poster": poster.name if poster else "No file",
+                    "poster_blob": poster_blob,
+                    "activity_file_blob": blobs.put_upload(activity_file),
+                    "visibility": visibility,
+                    "capacity": int(capacity) or None,
+                }
+                detector = get_duplicate_detector()
+                check = detector.check(activity)
+                activity["duplicate_of"] = check.duplicate_of
+                activity_id = get_store().add_activity(activity)
+                detector.add(activity_id, check)
+                log_event(eventlog.SUBMIT, id=activity_id, activity=activity)
+                get_text_extractor().submit(activity["activity_file_blob"])
+                checker = get_link_checker()
+                if checker is not None:
+                    checker.enqueue(activity["registration_link"])
+                invalidate_feed_cache()
+                reset_view_page()
+                if check.duplicate_of:
+                    st.warning(f"Activity submitted, but it looks like a copy of Activity {check.duplicate_of} "
+                               f"({check.similarity:.0%} similar). Moderators will review it.")
+                else:
+                    st.success("Activity submitted successfully!")
+
+def reset_view_page():
+    """Go back to the first page of View Activities."""
+    st.session_state.view_page = [1, None]
+
+def next_view_page(last_id):
+    number, _ = st.session_state.view_page
+    st.session_state.view_page = [number + 1, last_id]
+
+def previous_view_page(first_id, cause):
+    """Step back a page; only the current position is kept, so look up where the page above starts."""
+    number, _ = st.session_state.view_page
+    if number <= 2:
+        reset_view_page()
+        return
+    newer = get_store().list_activities(cause=cause, limit=PAGE_SIZE, after_id=first_id)
+    # The page above ends just before first_id; it starts at the newest of those
+    st.session_state.view_page = [number - 1, newer[-1]["id"] + 1 if newer else None]
+
+@st.fragment
+@timed(SECTION_SECONDS, "view_activities")
+def view_activities():
+    """View Activities list, one page at a time."""
+    st.subheader("Recent Activities")
+    cause_filter = st.selectbox("Filter by Cause", ["All Causes"] + CAUSES, key="view_cause", on_change=reset_view_page)
+    number, before_id = st.session_state.view_page
+    # Fetch one extra row to know whether a next page exists
+    cause = None if cause_filter == "All Causes" else cause_filter
+    activities = get_feed_cache().get_or_build(
+        ("view", cause, before_id),
+        lambda: get_store().list_activities(cause=cause, limit=PAGE_SIZE + 1, before_id=before_id),
+    )
+    has_next = len(activities) > PAGE_SIZE
+    activities = activities[:PAGE_SIZE]
+    if not activities:
+        st.info("No activities yet. Submit one on the Submit Activity tab to get started!")
+    else:
+        render_activities(activities)
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.button("⬅️ Previous", disabled=number == 1, use_container_width=True, on_click=previous_view_page,
+                  args=(activities[0]["id"] if activities else before_id, cause))
+    with col2:
+        st.write(f"Page {number}")
+    with col3:
+        st.button("Next ➡️", disabled=not has_next, use_container_width=True, on_click=next_view_page, args=(activities[-1]["id"] if activities else None,))
+    # Paging reruns only this fragment, so keep the shared snapshot current here
+    save_session()
+
+# ---------- CALENDAR ----------
+UPCOMING_COUNT = 5
+
+def shift_calendar_month(months):
+    """Move the calendar view back or forward by whole months."""
+    # The session governor may have dropped the month from an idle session
+    month = st.session_state.get("calendar_month") or datetime.today().date().replace(day=1)
+    index = month.year * 12 + month.month - 1 + months
+    st.session_state.calendar_month = Date(index // 12, index % 12 + 1, 1)
+
+@st.fragment
+def calendar_view():
+    """Upcoming events and a month grid, both read through the date index."""
+    if "calendar_month" not in st.session_state:
+        st.session_state.calendar_month = datetime.today().date().replace(day=1)
+    month = st.session_state.calendar_month
+    today = datetime.today().date()
+
+    st.subheader("Upcoming Events")
+    upcoming = get_feed_cache().get_or_build(
+        ("upcoming", str(today)),
+        lambda: get_store().upcoming_activities(limit=UPCOMING_COUNT, from_date=today),
+    )
+    if not upcoming:
+        st.info("No upcoming events.")
+    for activity in upcoming:
+        st.write(f"**{activity['date']}** · {activity['about_event']} ({activity['place']})")
+
+    st.subheader("Calendar")
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.button("⬅️ Previous Month", use_container_width=True, on_click=shift_calendar_month, args=(-1,))
+    with col2:
+        st.write(f"**{month.strftime('%B %Y')}**")
+    with col3:
+        st.button("Next Month ➡️", use_container_width=True, on_click=shift_calendar_month, args=(1,))
+
+    # Per-day counts come from the rollups, not from the month's activities
+    last_day = calendar.monthrange(month.year, month.month)[1]
+    by_day = dict(get_store().rollup("day", month, month.replace(day=last_day)))
+
+    # One markdown table for the whole month keeps the element count fixed
+    rows = ["| " + " | ".join(calendar.day_abbr) + " |", "|" + " --- |" * 7]
+    for week in calendar.Calendar().monthdatescalendar(month.year, month.month):
+        cells = []
+        for day in week:
+            if day.month != month.month:
+                cells.append(" ")
+                continue
+            events = by_day.get(str(day), 0)
+            cell = f"**{day.day}**" if events else str(day.day)
+            if events:
+                cell += f"<br>{events} event{'s' if events != 1 else ''}"
+            cells.append(cell)
+        rows.append("| " + " | ".join(cells) + " |")
+    st.markdown("\n".join(rows), unsafe_allow_html=True)
+
+# ---------- ANALYTICS ----------
+TOP_PLACES = 10
+SUBMISSION_DAYS = 90
+
+@st.fragment
+def analytics_view():
+    """Charts drawn from the incrementally maintained rollups."""
+    store = get_store()
+    today = datetime.today().date()
+    causes = store.rollup("cause")
+    submitted = dict(store.rollup("submitted", today - timedelta(days=SUBMISSION_DAYS - 1), today))
+
+    st.subheader("Analytics")
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Activities", sum(count for _, count in causes))
+    col2.metric("Submitted in the last 7 days",
+                sum(count for day, count in submitted.items() if day > str(today - timedelta(days=7))))
+    col3.metric("Upcoming this month", sum(count for _, count in store.rollup("day", today, today.replace(
+        day=calendar.monthrange(today.year, today.month)[1]))))
+
+    if not causes:
+        st.info("No activities yet. Charts appear once activities are submitted.")
+        return
+    st.markdown("**Activities per cause**")
+    st.bar_chart({"Cause": [cause for cause, _ in causes], "Activities": [count for _, count in causes]},
+                 x="Cause", y="Activities")
+    months = store.rollup("month")
+    st.markdown("**Activities per month**")
+    st.bar_chart({"Month": [month for month, _ in months], "Activities": [count for _, count in months]},
+                 x="Month", y="Activities")
+    places = store.rollup("place", limit=TOP_PLACES, by_count=True)
+    st.markdown(f"**Top {TOP_PLACES} places**")
+    st.bar_chart({"Place": [place for place, _ in places], "Activities": [count for _, count in places]},
+                 x="Place", y="Activities", horizontal=True)
+    # Fill in days without submissions so the rate line drops to zero
+    days = [today - timedelta(days=offset) for offset in range(SUBMISSION_DAYS - 1, -1, -1)]
+    st.markdown(f"**Submissions per day (last {SUBMISSION_DAYS} days)**")
+    st.line_chart({"Day": [str(day) for day in days], "Submissions": [submitted.get(str(day), 0) for day in days]},
+                  x="Day", y="Submissions")
+
+# ---------- DASHBOARD ACCESS ----------
+if variant()["gated_dashboard"] and st.session_state.permission != "Accepted":
+    st.error("Access denied. Please follow the proper flow to access the Dashboard.")
+    st.session_state.menu = None
+    st.switch_page(Path(__file__).with_name("home.py"))
+else:
+    dashboard_page()
@@ -0,0 +1,9 @@
+import streamlit as st
+from helpize.core import variant
+
+# ---------- PAGE FUNCTIONS ----------
+def help_page():
+    st.header("❓ Help")
+    st.write(variant()["help_message"])
+
+help_page()
@@ -0,0 +1,15 @@
+import streamlit as st
+from helpize.core import variant
+
+# ---------- PAGE FUNCTIONS ----------
+def main_screen():
+    """Main landing page."""
+    st.title("🤝 Community Volunteering App")
+    st.write(variant()["home_message"])
+    if variant()["styled"]:
+        st.markdown("""
+        ---
+        **2026 Helpize Community App.**
+        """)
+
+main_screen()
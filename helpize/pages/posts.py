@@ -0,0 +1,58 @@
+import streamlit as st
+from helpize.core import (
+    PAGE_SIZE,
+    get_feed_cache,
+    get_like_counter,
+    get_ranking_columns,
+    get_store,
+    like_summary,
+    render_activities,
+)
+from helpize.ranking import LIKE_WEIGHT, REGISTRATION_WEIGHT, UserProfile, rank
+
+TRENDING_COUNT = 5
+
+# ---------- PAGE FUNCTIONS ----------
+def trending():
+    """Most-liked activities right now, read from the in-memory top-N."""
+    ids = get_like_counter().top(TRENDING_COUNT)
+    activities = get_store().get_activities(ids)
+    if not activities:
+        return
+    st.subheader("🔥 Trending")
+    likes = like_summary(ids)
+    for activity in activities:
+        count = likes.get(activity["id"], (0, False))[0]
+        st.write(f"**{activity['about_event']}** · {activity['date']} ({activity['place']}) · ❤️ {count}")
+
+def recommended(limit):
+    """Best activities for this session's likes and registrations."""
+    store = get_store()
+    profile = UserProfile(store.user_interactions(st.session_state.user_id, LIKE_WEIGHT, REGISTRATION_WEIGHT))
+    # Over-fetch a little: posts denied since the snapshot was built drop out here
+    ids = rank(get_ranking_columns(), profile, k=limit + limit // 2)
+    return store.get_activities(ids)[:limit]
+
+@st.fragment
+def posts_page():
+    """Personalised feed with full-text search."""
+    st.header("📢 Posts Page")
+    st.write("Global feed of all volunteer opportunities.")
+    query = st.text_input("Search", placeholder="Search by description, place or cause", key="posts_query")
+    if query.strip():
+        activities = get_feed_cache().get_or_build(
+            ("search", query.strip().lower()),
+            lambda: get_store().search_activities(query, limit=PAGE_SIZE),
+        )
+        if not activities:
+            st.info(f"No activities match \"{query}\".")
+    else:
+        trending()
+        activities = recommended(PAGE_SIZE)
+        if activities:
+            st.subheader("✨ For You")
+        else:
+            st.info("No activities yet.")
+    render_activities(activities)
+
+posts_page()
@@ -0,0 +1,146 @@
+import streamlit as st
+from helpize import eventlog
+from helpize.core import cancel_registration, get_store, go_to_post_type, go_to_profile_option, log_event, review_post, toggle_like, variant
+from helpize.storage import ACCEPTED, DENIED, REGISTERED
+
+REVIEW_BATCH_SIZE = 10
+
+# ---------- PAGE FUNCTIONS ----------
+def profile_page():
+    """Profile page with options."""
+    st.header("👤 Profile")
+    if variant()["profile_message"]:
+        st.write(variant()["profile_message"])
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.button("My Posts", use_container_width=True, on_click=go_to_profile_option, args=("My Posts",))
+    with col2:
+        st.button("Registered Events", use_container_width=True, on_click=go_to_profile_option, args=("Registered Events",))
+    with col3:
+        st.button("Liked Posts", use_container_width=True, on_click=go_to_profile_option, args=("Liked Posts",))
+
+def my_posts_page():
+    """My Posts sub-page."""
+    st.subheader("📌 My Posts")
+    if variant()["my_posts_message"]:
+        st.write(variant()["my_posts_message"])
+    col1, col2 = st.columns(2)
+    with col1:
+        st.button("Public", use_container_width=True, on_click=go_to_post_type, args=("Public",))
+    with col2:
+        st.button("Private", use_container_width=True, on_click=go_to_post_type, args=("Private",))
+
+# ---------- MODERATION QUEUE ----------
+def claim_batch(visibility):
+    """Lease the next batch of pending posts to this session."""
+    get_store().claim_pending(st.session_state.moderator_id, REVIEW_BATCH_SIZE, visibility)
+
+def release_batch():
+    """Give this session's claimed posts back to the queue."""
+    get_store().release_claims(st.session_state.moderator_id)
+
+def review_batch(permission, ids):
+    """Apply one Accept/Deny decision to every ticked post in the batch."""
+    picked = [post_id for post_id in ids if st.session_state.get(f"review_pick_{post_id}")]
+    decision = ACCEPTED if permission == "Accepted" else DENIED
+    reviewed = get_store().review_posts(picked, st.session_state.moderator_id, decision)
+    st.session_state.review_count = len(reviewed)
+    # Nothing ticked, or every lease ran out: no decision was made
+    if reviewed:
+        log_event(eventlog.REVIEW, moderator=st.session_state.moderator_id, decision=decision, ids=reviewed)
+        review_post(permission)
+
+def review_queue(visibility):
+    """Claimed posts with bulk Accepted/Denied buttons."""
+    store = get_store()
+    claimed = store.claimed_posts(st.session_state.moderator_id, visibility)
+    st.caption(f"{store.pending_count(visibility)} {visibility.lower()} posts waiting for review.")
+    reviewed = st.session_state.pop("review_count", None)
+    if reviewed is not None:
+        st.write(f"Reviewed {reviewed} post{'s' if reviewed != 1 else ''}.")
+    if not claimed:
+        # No Accepted/Denied buttons until there is something to decide on
+        st.button(f"Claim next {REVIEW_BATCH_SIZE} posts", on_click=claim_batch, args=(visibility,))
+        return
+
+    ids = [post["id"] for post in claimed]
+    with st.form(f"review_{visibility}"):
+        for post in claimed:
+            duplicate = f" · ⚠️ possible duplicate of #{post['duplicate_of']}" if post['duplicate_of'] else ""
+            st.checkbox(
+                f"#{post['id']} · {post['date']} · {post['about_event']} ({post['place']}, {post['cause']}){duplicate}",
+                value=True,
+                key=f"review_pick_{post['id']}",
+            )
+        col1, col2 = st.columns(2)
+        with col1:
+            st.form_submit_button("Accepted", use_container_width=True, on_click=review_batch, args=("Accepted", ids))
+        with col2:
+            st.form_submit_button("Denied", use_container_width=True, on_click=review_batch, args=("Denied", ids))
+    st.button("Release batch", on_click=release_batch)
+
+def public_page():
+    """Public event page."""
+    st.subheader("🌍 Public Event")
+    st.write("Review these public event posts for community guidelines compliance.")
+    review_queue("Public")
+
+def private_page():
+    """Private event page."""
+    st.subheader("🔒 Private Event")
+    if variant()["private_review"]:
+        st.write("Review these private event posts for community guidelines compliance.")
+        review_queue("Private")
+    else:
+        st.info("This is a private event. Content is restricted to members only.")
+        st.session_state.permission = None  # Ensure no Accepted/Denied message shows here
+        st.button("Back to My Posts", on_click=go_to_post_type, args=(None,))
+
+def registered_events_page():
+    """Events this session signed up for, with waitlist positions."""
+    st.subheader("📝 Registered Events")
+    registrations = get_store().user_registrations(st.session_state.user_id)
+    if not registrations:
+        st.info("You haven't registered for any events yet. Open one on the Posts page to sign up.")
+        return
+    st.write("Here is a list of events you have joined.")
+    for activity in registrations:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            status = "✅ Registered" if activity["registration_status"] == REGISTERED \
+                else f"⏳ Waitlist #{activity['waitlist_position']}"
+            st.write(f"**{activity['date']}** · {activity['about_event']} ({activity['place']}) · {status}")
+        with col2:
+            st.button("Cancel", key=f"cancel_{activity['id']}", use_container_width=True,
+                      on_click=cancel_registration, args=(activity["id"],))
+
+def liked_posts_page():
+    """Activities this session liked, most recent first."""
+    st.subheader("❤️ Liked Posts")
+    liked = get_store().user_likes(st.session_state.user_id)
+    if not liked:
+        st.info("You haven't liked any posts yet. Tap 🤍 Like on the Posts page.")
+        return
+    st.write("Posts you have favorited.")
+    for activity in liked:
+        col1, col2 = st.columns([4, 1])
+        with col1:
+            st.write(f"**{activity['date']}** · {activity['about_event']} ({activity['place']})")
+        with col2:
+            st.button("Unlike", key=f"unlike_{activity['id']}", use_container_width=True,
+                      on_click=toggle_like, args=(activity["id"], True))
+
+# ---------- PROFILE ROUTER ----------
+if st.session_state.profile_option is None:
+    profile_page()
+elif st.session_state.profile_option == "My Posts":
+    if st.session_state.post_type is None:
+        my_posts_page()
+    elif st.session_state.post_type == "Public":
+        public_page()
+    elif st.session_state.post_type == "Private":
+        private_page()
+elif st.session_state.profile_option == "Registered Events":
+    registered_events_page()
+elif st.session_state.profile_option == "Liked Posts":
+    liked_posts_page()
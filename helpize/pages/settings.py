@@ -0,0 +1,39 @@
+import streamlit as st
+from helpize.core import get_reminder_scheduler, get_store, variant
+from helpize.notify import REMIND_DAYS
+
+# ---------- PAGE FUNCTIONS ----------
+def save_notifications():
+    """Store the reminder form and have the scheduler pick it up."""
+    email = st.session_state.notify_email.strip()
+    enabled = st.session_state.notify_enabled
+    if enabled and "@" not in email:
+        st.session_state.notify_result = ("error", "Please enter a valid email address.")
+        return
+    get_store().save_notification_prefs(st.session_state.user_id, email, st.session_state.notify_days, enabled)
+    scheduler = get_reminder_scheduler()
+    if scheduler is not None:
+        scheduler.wake()
+    st.session_state.notify_result = ("success", "Notification settings saved.")
+
+def settings_page():
+    """Account and notification settings."""
+    st.header("⚙️ Settings")
+    st.write(variant()["settings_message"])
+
+    st.subheader("🔔 Event Reminders")
+    prefs = get_store().notification_prefs(st.session_state.user_id) or {}
+    with st.form("notifications"):
+        st.checkbox("Email me before events I registered for", value=bool(prefs.get("enabled")), key="notify_enabled")
+        st.text_input("Email", value=prefs.get("email", ""), placeholder="you@example.com", key="notify_email")
+        days = prefs.get("remind_days", 1)
+        st.selectbox("Remind me", REMIND_DAYS, index=REMIND_DAYS.index(days) if days in REMIND_DAYS else 0,
+                     format_func=lambda days: f"{days} day{'s' if days != 1 else ''} before", key="notify_days")
+        st.form_submit_button("Save", on_click=save_notifications)
+    result = st.session_state.pop("notify_result", None)
+    if result:
+        getattr(st, result[0])(result[1])
+    if get_reminder_scheduler() is None:
+        st.caption("Reminder emails are not being sent on this server (no SMTP server configured).")
+
+settings_page()
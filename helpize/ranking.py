@@ -0,0 +1,152 @@
+import logging
+import threading
+import time
+from datetime import date as Date
+import numpy as np
+from helpize.storage import CAUSES
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+# How much each signal contributes to an activity's score
+WEIGHTS = {
+    "cause": 3.0,  # share of the user's likes/registrations in this cause
+    "place": 1.5,  # same, for the place (the closest thing to proximity we store)
+    "recency": 2.0,  # events happening soon
+    "popularity": 0.5,  # log of the like count
+}
+RECENCY_DAYS = 14  # an event this many days out gets about a third of the recency score
+PAST_PENALTY = 100.0  # past events sink below every upcoming one
+REFRESH_INTERVAL = 120  # seconds between rebuilds that pick up like counts and other processes' writes
+
+# What one interaction says about a user's interests
+LIKE_WEIGHT = 1.0
+REGISTRATION_WEIGHT = 2.0
+
+
+# ---------- COLUMNS ----------
+class ActivityColumns:
+    """Columnar snapshot of every listed activity for vectorized scoring.
+
+    Causes and places are stored as small integer codes so a user's
+    affinities can be applied with one fancy-indexing lookup per column.
+    Build it once and share it (RankingSnapshot does); scoring never
+    touches SQLite.
+    """
+
+    def __init__(self, rows):
+        count = len(rows)
+        ids, causes, dates, places, likes = zip(*rows) if rows else ((), (), (), (), ())
+        cause_codes = {cause: code for code, cause in enumerate(CAUSES)}
+        other = cause_codes["Other"]
+        self.ids = np.fromiter(ids, dtype=np.int64, count=count)
+        self.causes = np.fromiter((cause_codes.get(cause, other) for cause in causes), dtype=np.int16, count=count)
+        self.days = np.array(dates, dtype="datetime64[D]").astype(np.int64)
+        self.place_names, self.places = np.unique(np.array(places, dtype=str), return_inverse=True)
+        self.place_codes = {name: code for code, name in enumerate(self.place_names.tolist())}
+        self.popularity = np.log1p(np.fromiter(likes, dtype=np.float64, count=count))
+
+    def __len__(self):
+        return len(self.ids)
+
+
+class RankingSnapshot:
+    """The current ActivityColumns, rebuilt by a background thread.
+
+    ``columns`` is always a complete snapshot, so a rerun never waits for a
+    rebuild. ``invalidate()`` after a submission or review wakes the thread;
+    invalidations that arrive during a rebuild cost one more rebuild, not
+    one each. Like counts change without invalidating, so the snapshot is
+    also rebuilt every ``refresh_interval`` seconds.
+    """
+
+    def __init__(self, load_rows, refresh_interval=REFRESH_INTERVAL):
+        self.load_rows = load_rows
+        self.refresh_interval = refresh_interval
+        self.builds = 0
+        self.build_seconds = 0.0
+        self.columns = self._build()
+        self._stale = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the rebuild thread; safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="ranking-columns", daemon=True)
+            self._thread.start()
+        return self
+
+    def invalidate(self):
+        """Rebuild soon; call after any write that changes the listed activities."""
+        self._stale.set()
+
+    def stats(self):
+        return {"activities": len(self.columns), "builds": self.builds,
+                "avg_build_ms": self.build_seconds / self.builds * 1000 if self.builds else 0.0}
+
+    def _build(self):
+        started = time.perf_counter()
+        columns = ActivityColumns(self.load_rows())
+        self.builds += 1
+        self.build_seconds += time.perf_counter() - started
+        return columns
+
+    def _run(self):
+        while True:
+            self._stale.wait(self.refresh_interval)
+            # Cleared before reading, so a write during the build triggers another one
+            self._stale.clear()
+            try:
+                self.columns = self._build()
+            except Exception:
+                logger.exception("rebuilding the ranking columns failed")
+
+
+# ---------- USER PROFILE ----------
+class UserProfile:
+    """A user's interest in each cause and place, each summing to 1."""
+
+    def __init__(self, interactions):
+        causes, places = {}, {}
+        for cause, place, weight in interactions:
+            causes[cause] = causes.get(cause, 0.0) + weight
+            places[place] = places.get(place, 0.0) + weight
+        total = sum(causes.values()) or 1.0
+        self.causes = np.array([causes.get(cause, 0.0) / total for cause in CAUSES])
+        self.places = {place: weight / total for place, weight in places.items()}
+
+    def place_weights(self, columns):
+        """The place affinities as an array aligned with ``columns.place_names``."""
+        weights = np.zeros(len(columns.place_names))
+        for place, weight in self.places.items():
+            code = columns.place_codes.get(place)
+            if code is not None:
+                weights[code] = weight
+        return weights
+
+
+# ---------- RANKING ----------
+def score(columns, profile, today=None):
+    """Score every activity for ``profile`` in one vectorized pass."""
+    today = np.datetime64(today or Date.today(), "D").astype(np.int64)
+    ahead = columns.days - today
+    scores = WEIGHTS["cause"] * profile.causes[columns.causes]
+    scores += WEIGHTS["place"] * profile.place_weights(columns)[columns.places]
+    scores += WEIGHTS["recency"] * np.exp(-np.maximum(ahead, 0) / RECENCY_DAYS)
+    scores += WEIGHTS["popularity"] * columns.popularity
+    scores[ahead < 0] -= PAST_PENALTY
+    return scores
+
+
+def rank(columns, profile, k=20, today=None):
+    """Ids of the ``k`` best activities for ``profile``, best first.
+
+    ``argpartition`` finds the top k in O(n); only those k are sorted.
+    """
+    if not len(columns):
+        return []
+    scores = score(columns, profile, today)
+    k = min(k, len(scores))
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return columns.ids[top].tolist()
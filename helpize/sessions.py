@@ -0,0 +1,366 @@
+"""Session state shared between app replicas.
+
+Streamlit keeps ``st.session_state`` in the process serving the browser tab,
+so a second replica behind a load balancer (or a restarted one) would start
+every user over. The keys in ``SHARED_KEYS`` are therefore also written to a
+session store under an id carried in the page URL (``?sid=``); when a tab
+reaches a process that has never seen it, the snapshot is loaded on that
+first run and the session carries on.
+
+A URL can be shared, leaked or planted, so the identities in
+``IDENTITY_KEYS`` are only restored for the browser that saved them: each
+snapshot records a hash of the browser's ``BINDING_COOKIE`` and a tab whose
+cookie doesn't match gets the navigation state under a new session id and
+fresh identities.
+
+Pick the store with HELPIZE_SESSION_STORE:
+
+- ``memory`` (default) - this process only, the behaviour of a single replica
+- ``sqlite`` or ``sqlite:///path/to/sessions.db`` - replicas on one host or
+  on a shared volume
+- ``redis://host:6379/0`` - any Redis-compatible server (needs ``redis``)
+"""
+import binascii
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+try:
+    import redis
+except ImportError:  # redis is optional; only the redis:// store needs it
+    redis = None
+
+from helpize.storage import DEFAULT_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# ---------- CONFIGURATION ----------
+SESSION_STORE = os.environ.get("HELPIZE_SESSION_STORE", "memory")
+SESSION_TTL = int(os.environ.get("HELPIZE_SESSION_TTL", str(7 * 24 * 3600)))  # seconds since last change
+SESSION_PARAM = "sid"  # query parameter holding the session id
+MAX_MEMORY_SESSIONS = int(os.environ.get("HELPIZE_SESSION_MAX", "100000"))  # memory store only
+# Per-browser cookie identities are bound to; Streamlit's XSRF cookie by default
+BINDING_COOKIE = os.environ.get("HELPIZE_SESSION_COOKIE", "_streamlit_xsrf")
+
+# Session memory governor
+IDLE_SECONDS = int(os.environ.get("HELPIZE_SESSION_IDLE", "1800"))  # drop state after this long unused
+MAX_SESSION_BYTES = int(os.environ.get("HELPIZE_SESSION_MAX_BYTES", str(256 * 1024)))
+SWEEP_INTERVAL = 60  # seconds
+
+# Navigation, preferences and identities; widget values stay with the replica
+SHARED_KEYS = (
+    "menu",
+    "profile_option",
+    "post_type",
+    "permission",
+    "dark_mode",
+    "moderator_id",
+    "user_id",
+    "view_page",
+)
+
+# Restored only for the browser that saved them (see browser_binding)
+IDENTITY_KEYS = ("moderator_id", "user_id")
+BINDING_KEY = "browser"  # snapshot entry holding the browser binding
+
+# Kept when the governor trims a session: fragments and callbacks rely on them
+KEEP_KEYS = set(SHARED_KEYS) | {"variant", "session_id", "session_binding", "session_saved"}
+
+SESSION_ID = re.compile(r"^[A-Za-z0-9_-]{16,64}$")
+PURGE_INTERVAL = 600  # seconds between sweeps of expired SQLite sessions
+
+SESSION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_id TEXT PRIMARY KEY,
+    data BLOB NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def new_session_id():
+    return secrets.token_urlsafe(24)
+
+
+def valid_session_id(session_id):
+    return bool(session_id) and SESSION_ID.match(session_id) is not None
+
+
+def browser_binding(cookies):
+    """Hash of the browser's binding cookie, or None when it sent none.
+
+    Streamlit re-masks its XSRF cookie on every page load, so a version 2
+    value (``2|mask|masked token|timestamp``) is unmasked first; the token
+    underneath stays the same for the browser.
+    """
+    value = cookies.get(BINDING_COOKIE)
+    if not isinstance(value, str) or not value:
+        return None
+    parts = value.split("|")
+    if len(parts) == 4 and parts[0] == "2":
+        try:
+            mask, masked = binascii.a2b_hex(parts[1]), binascii.a2b_hex(parts[2])
+        except (binascii.Error, ValueError):
+            return None
+        if not mask:
+            return None
+        value = bytes(byte ^ mask[index % len(mask)] for index, byte in enumerate(masked)).hex()
+    return hashlib.sha256(value.encode()).hexdigest()
+
+
+def restorable(snapshot, binding):
+    """The shared keys to load from ``snapshot`` and whether the session id may be kept.
+
+    Identities come back only when the snapshot was saved by this browser;
+    otherwise the caller should start a new session id so the two tabs
+    don't overwrite each other's snapshot.
+    """
+    owned = binding is not None and snapshot.get(BINDING_KEY) == binding
+    keys = [key for key in SHARED_KEYS if key in snapshot and (owned or key not in IDENTITY_KEYS)]
+    return {key: snapshot[key] for key in keys}, owned
+
+
+def dumps(snapshot):
+    """Serialize a snapshot; sorted keys so unchanged state gives equal bytes."""
+    return json.dumps(snapshot, sort_keys=True, separators=(",", ":")).encode()
+
+
+def loads(data):
+    return json.loads(data)
+
+
+# ---------- STORES ----------
+# Every store maps a session id to serialized bytes with load/save/delete.
+class MemorySessionStore:
+    """Snapshots kept in this process, least recently saved dropped first."""
+
+    def __init__(self, ttl=SESSION_TTL, max_sessions=MAX_MEMORY_SESSIONS):
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self._sessions = OrderedDict()  # oldest save first, so expiry order too
+        self._lock = threading.Lock()
+
+    def load(self, session_id):
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or entry[0] <= time.time():
+                self._sessions.pop(session_id, None)
+                return None
+            return entry[1]
+
+    def save(self, session_id, data):
+        now = time.time()
+        with self._lock:
+            self._sessions[session_id] = (now + self.ttl, data)
+            self._sessions.move_to_end(session_id)
+            while self._sessions:
+                expires, _ = next(iter(self._sessions.values()))
+                if expires > now and len(self._sessions) <= self.max_sessions:
+                    break
+                self._sessions.popitem(last=False)
+
+    def delete(self, session_id):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteSessionStore:
+    """Snapshots in a SQLite table, shared by processes using the same file."""
+
+    def __init__(self, path=DEFAULT_DB_PATH, ttl=SESSION_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._local = threading.local()
+        self._next_purge = 0.0
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with self._connect() as conn:
+            conn.executescript(SESSION_SCHEMA)
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def load(self, session_id):
+        row = self._connect().execute(
+            "SELECT data FROM sessions WHERE session_id = ? AND expires_at > ?", (session_id, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    def save(self, session_id, data):
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO sessions (session_id, data, expires_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (session_id) DO UPDATE SET data = excluded.data, expires_at = excluded.expires_at",
+                (session_id, data, now + self.ttl),
+            )
+            if now >= self._next_purge:
+                self._next_purge = now + PURGE_INTERVAL
+                conn.execute("DELETE FROM sessions WHERE expires_at <= ?", (now,))
+
+    def delete(self, session_id):
+        conn = self._connect()
+        with conn:
+            conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+
+class RedisSessionStore:
+    """Snapshots in a Redis-compatible server; the server expires them."""
+
+    def __init__(self, url, ttl=SESSION_TTL, prefix="helpize:session:"):
+        if redis is None:
+            raise RuntimeError("the redis:// session store needs the redis package")
+        self.ttl = ttl
+        self.prefix = prefix
+        # redis-py pools its connections and is safe to share between threads
+        self._client = redis.Redis.from_url(url, socket_timeout=5, socket_connect_timeout=5)
+
+    def load(self, session_id):
+        return self._client.get(self.prefix + session_id)
+
+    def save(self, session_id, data):
+        self._client.set(self.prefix + session_id, data, ex=self.ttl)
+
+    def delete(self, session_id):
+        self._client.delete(self.prefix + session_id)
+
+
+def open_session_store(spec=SESSION_STORE):
+    """The store named by ``spec`` (see the module docstring)."""
+    if spec == "memory":
+        return MemorySessionStore()
+    if spec == "sqlite":
+        return SQLiteSessionStore()
+    if spec.startswith("sqlite:///"):
+        return SQLiteSessionStore(spec[len("sqlite:///"):])
+    if spec.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(spec)
+    raise ValueError(f"unknown session store {spec!r}")
+
+
+# ---------- SESSION GOVERNOR ----------
+def state_size(value, _seen=None):
+    """Rough deep size in bytes of a session state value."""
+    seen = _seen if _seen is not None else set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(state_size(key, seen) + state_size(item, seen) for key, item in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(state_size(item, seen) for item in value)
+    return size
+
+
+class SessionGovernor:
+    """Keeps per-session memory bounded over a long-running server.
+
+    Streamlit holds a tab's session state for as long as the tab stays
+    connected, however long ago it was used. Every run reports its session
+    with ``touch()``; every ``sweep_interval`` seconds sessions idle for
+    ``idle_seconds``, or holding more than ``max_bytes``, are trimmed to
+    ``KEEP_KEYS``. Those are small and already saved to the session store;
+    everything else (widget values, calendar position, results of the last
+    action) is rebuilt or re-sent by the browser on the next run.
+    """
+
+    def __init__(self, idle_seconds=IDLE_SECONDS, max_bytes=MAX_SESSION_BYTES, sweep_interval=SWEEP_INTERVAL):
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self.sweep_interval = sweep_interval
+        self.evicted = 0
+        self._sessions = {}  # Streamlit session id -> (last run, state bytes)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the sweep thread; safe to call more than once."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="session-governor", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def touch(self, session_id, state):
+        """Record a finished run of ``session_id`` and the size of its state."""
+        size = state_size(state)
+        with self._lock:
+            self._sessions[session_id] = (time.monotonic(), size)
+        if size > self.max_bytes:
+            logger.warning("session state is %d bytes (cap %d); dropping it at the next sweep", size, self.max_bytes)
+
+    def stats(self):
+        with self._lock:
+            sizes = [size for _, size in self._sessions.values()]
+        return {"tracked": len(sizes), "state_bytes": sum(sizes), "evicted": self.evicted}
+
+    def sweep(self, now=None):
+        """Session ids whose state should be trimmed; forgets them."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            doomed = [
+                session_id for session_id, (last_run, size) in self._sessions.items()
+                if now - last_run >= self.idle_seconds or size > self.max_bytes
+            ]
+            for session_id in doomed:
+                del self._sessions[session_id]
+        return doomed
+
+    def _run(self):
+        while not self._stop.wait(self.sweep_interval):
+            doomed = self.sweep()
+            if doomed:
+                try:
+                    evict_sessions(doomed, self)
+                except Exception:
+                    logger.exception("session eviction failed")
+
+
+def evict_sessions(session_ids, governor):
+    """Trim the state of the given Streamlit sessions to ``KEEP_KEYS``.
+
+    Runs on the server's event loop: that is where reruns are started, so no
+    run can begin while a session is being trimmed, and sessions that are
+    mid-run are left alone. This reaches into Streamlit's runtime, which has
+    no public API for other sessions' state.
+    """
+    from streamlit.runtime import Runtime
+
+    if not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+
+    def evict():
+        for session_id in session_ids:
+            info = runtime._session_mgr.get_active_session_info(session_id)
+            if info is None:
+                continue  # closed already; Streamlit frees it
+            if info.session._scriptrunner is not None:
+                continue  # running; it reports itself again when done
+            state = info.session.session_state
+            for key in list(state.filtered_state):
+                if key not in KEEP_KEYS:
+                    del state[key]
+            governor.evicted += 1
+
+    runtime._get_async_objs().eventloop.call_soon_threadsafe(evict)
@@ -0,0 +1,1194 @@
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections.abc import Mapping
+from datetime import datetime
+
+# ---------- CONFIGURATION ----------
+DEFAULT_DB_PATH = os.environ.get(
+    "HELPIZE_DB",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "helpize.db"),
+)
+
+CAUSES = [
+    "Disaster Relief",
+    "Community Help",
+    "Environmental",
+    "Health",
+    "Education",
+    "Other",
+]
+
+VISIBILITIES = ["Public", "Private"]
+PUBLIC, PRIVATE = VISIBILITIES
+
+# Moderation states; denied posts drop out of every feed
+PENDING, ACCEPTED, DENIED = "pending", "accepted", "denied"
+
+# How long a moderator holds claimed posts before they return to the queue
+CLAIM_SECONDS = 300
+
+# Registration states; waitlisted users move up in sign-up order
+REGISTERED, WAITLISTED = "registered", "waitlisted"
+
+# A reminder being sent; other processes leave it alone until the claim is
+# this old, so a sender that died mid-send doesn't lose it for good
+SENDING = "sending"
+REMINDER_CLAIM_SECONDS = 900
+
+ACTIVITY_FIELDS = (
+    "registration_link",
+    "activity_file",
+    "date",
+    "place",
+    "about_event",
+    "cause",
+    "poster",
+    "poster_blob",
+    "activity_file_blob",
+    "visibility",
+    "capacity",
+    "duplicate_of",
+)
+
+INSERT_SQL = (
+    f"INSERT INTO activities ({', '.join(ACTIVITY_FIELDS)}, created_at) "
+    f"VALUES ({', '.join('?' for _ in ACTIVITY_FIELDS)}, ?)"
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS activities (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    registration_link TEXT NOT NULL,
+    activity_file TEXT,
+    date TEXT NOT NULL,
+    place TEXT NOT NULL,
+    about_event TEXT NOT NULL,
+    cause TEXT NOT NULL,
+    poster TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    poster_blob TEXT,
+    activity_file_blob TEXT,
+    visibility TEXT NOT NULL DEFAULT 'Public',
+    status TEXT NOT NULL DEFAULT 'pending',
+    claimed_by TEXT,
+    claim_expires REAL,
+    reviewed_by TEXT,
+    reviewed_at TEXT,
+    capacity INTEGER,
+    registered_count INTEGER NOT NULL DEFAULT 0,
+    like_count INTEGER NOT NULL DEFAULT 0,
+    duplicate_of INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_activities_date ON activities (date);
+CREATE INDEX IF NOT EXISTS idx_activities_cause ON activities (cause);
+CREATE INDEX IF NOT EXISTS idx_activities_place ON activities (place);
+"""
+
+# Full-text index over the searchable columns, kept in sync by triggers
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS activities_fts USING fts5(
+    about_event, place, cause,
+    content='activities', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS activities_fts_insert AFTER INSERT ON activities BEGIN
+    INSERT INTO activities_fts (rowid, about_event, place, cause)
+    VALUES (new.id, new.about_event, new.place, new.cause);
+END;
+CREATE TRIGGER IF NOT EXISTS activities_fts_delete AFTER DELETE ON activities BEGIN
+    INSERT INTO activities_fts (activities_fts, rowid, about_event, place, cause)
+    VALUES ('delete', old.id, old.about_event, old.place, old.cause);
+END;
+CREATE TRIGGER IF NOT EXISTS activities_fts_update AFTER UPDATE OF about_event, place, cause ON activities BEGIN
+    INSERT INTO activities_fts (activities_fts, rowid, about_event, place, cause)
+    VALUES ('delete', old.id, old.about_event, old.place, old.cause);
+    INSERT INTO activities_fts (rowid, about_event, place, cause)
+    VALUES (new.id, new.about_event, new.place, new.cause);
+END;
+"""
+
+# Queue index, created after migrations so older databases have the columns
+MODERATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_activities_queue ON activities (status, visibility, id);
+"""
+
+# Latest health check result per registration link
+LINK_SCHEMA = """
+CREATE TABLE IF NOT EXISTS link_status (
+    url TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    http_status INTEGER,
+    checked_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_link_status_checked ON link_status (checked_at);
+"""
+
+# One row per user per activity; id orders the waitlist
+REGISTRATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS registrations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    activity_id INTEGER NOT NULL REFERENCES activities (id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    UNIQUE (activity_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_registrations_user ON registrations (user_id, id);
+CREATE INDEX IF NOT EXISTS idx_registrations_waitlist ON registrations (activity_id, status, id);
+"""
+
+# Who liked what; activities.like_count is kept in step in the same transaction
+LIKE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS likes (
+    activity_id INTEGER NOT NULL REFERENCES activities (id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    liked_at REAL NOT NULL,
+    PRIMARY KEY (activity_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS idx_likes_user ON likes (user_id, liked_at);
+CREATE INDEX IF NOT EXISTS idx_likes_time ON likes (liked_at);
+"""
+
+# Reminder opt-ins per user, and which reminders already went out (or are
+# being sent: status 'sending', claimed at sent_at)
+NOTIFICATION_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notification_prefs (
+    user_id TEXT PRIMARY KEY,
+    email TEXT NOT NULL,
+    remind_days INTEGER NOT NULL DEFAULT 1,
+    enabled INTEGER NOT NULL DEFAULT 1
+);
+CREATE TABLE IF NOT EXISTS reminders_sent (
+    activity_id INTEGER NOT NULL REFERENCES activities (id) ON DELETE CASCADE,
+    user_id TEXT NOT NULL,
+    sent_at REAL NOT NULL,
+    status TEXT NOT NULL,
+    PRIMARY KEY (activity_id, user_id)
+);
+"""
+
+# Text extracted from uploaded activity files, one row per blob digest, with
+# a full-text index kept in sync by triggers. Created after migrations so
+# older databases have activity_file_blob to index.
+DOCUMENT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS document_text (
+    blob TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    pages INTEGER,
+    text TEXT,
+    error TEXT,
+    extracted_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_activities_file_blob ON activities (activity_file_blob);
+CREATE VIRTUAL TABLE IF NOT EXISTS documents_fts USING fts5(
+    text, content='document_text', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS documents_fts_insert AFTER INSERT ON document_text BEGIN
+    INSERT INTO documents_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_fts_delete AFTER DELETE ON document_text BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS documents_fts_update AFTER UPDATE OF text ON document_text BEGIN
+    INSERT INTO documents_fts (documents_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO documents_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+# MinHash signatures and their LSH band buckets, for near-duplicate checks
+DEDUP_SCHEMA = """
+CREATE TABLE IF NOT EXISTS activity_signatures (
+    activity_id INTEGER PRIMARY KEY REFERENCES activities (id) ON DELETE CASCADE,
+    signature BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS activity_lsh (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    activity_id INTEGER NOT NULL REFERENCES activities (id) ON DELETE CASCADE,
+    PRIMARY KEY (band, bucket, activity_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_activity_lsh_activity ON activity_lsh (activity_id);
+"""
+
+# Rollup dimension -> bucket expression over an activities row ({row} is
+# new or old). Counts cover listed public activities only.
+ROLLUP_DIMENSIONS = {
+    "cause": "{row}.cause",
+    "place": "{row}.place",
+    "month": "substr({row}.date, 1, 7)",  # event month
+    "day": "{row}.date",  # event day, for the calendar
+    "submitted": "substr({row}.created_at, 1, 10)",  # submission day
+}
+
+
+def _rollup_upserts(row, delta):
+    return "\n".join(
+        f"    INSERT INTO activity_rollups (dimension, bucket, count) "
+        f"VALUES ('{dimension}', {expression.format(row=row)}, {delta}) "
+        f"ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count;"
+        for dimension, expression in ROLLUP_DIMENSIONS.items()
+    )
+
+
+def _rollup_counted(row):
+    return f"{row}.status != '{DENIED}' AND {row}.visibility = '{PUBLIC}'"
+
+
+# Per-dimension counters kept current by triggers, so analytics never scan
+# the activities table
+ROLLUP_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS activity_rollups (
+    dimension TEXT NOT NULL,
+    bucket TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, bucket)
+);
+CREATE TRIGGER IF NOT EXISTS activity_rollups_insert AFTER INSERT ON activities
+WHEN {_rollup_counted("new")} BEGIN
+{_rollup_upserts("new", 1)}
+END;
+CREATE TRIGGER IF NOT EXISTS activity_rollups_delete AFTER DELETE ON activities
+WHEN {_rollup_counted("old")} BEGIN
+{_rollup_upserts("old", -1)}
+END;
+CREATE TRIGGER IF NOT EXISTS activity_rollups_update_old
+AFTER UPDATE OF status, visibility, date, place, cause ON activities
+WHEN {_rollup_counted("old")} BEGIN
+{_rollup_upserts("old", -1)}
+END;
+CREATE TRIGGER IF NOT EXISTS activity_rollups_update_new
+AFTER UPDATE OF status, visibility, date, place, cause ON activities
+WHEN {_rollup_counted("new")} BEGIN
+{_rollup_upserts("new", 1)}
+END;
+"""
+ROLLUP_TRIGGERS = ("activity_rollups_insert", "activity_rollups_delete",
+                   "activity_rollups_update_old", "activity_rollups_update_new")
+
+# bm25 column weights: a match in the description counts most, then place
+FTS_WEIGHTS = (10.0, 5.0, 2.0)
+# A match only in the attached document ranks below any of those
+DOCUMENT_FTS_WEIGHT = 1.0
+
+# Columns added after the table was first created; older databases get them
+# when the store opens
+MIGRATIONS = {
+    "poster_blob": "ALTER TABLE activities ADD COLUMN poster_blob TEXT",
+    "activity_file_blob": "ALTER TABLE activities ADD COLUMN activity_file_blob TEXT",
+    "visibility": "ALTER TABLE activities ADD COLUMN visibility TEXT NOT NULL DEFAULT 'Public'",
+    "status": "ALTER TABLE activities ADD COLUMN status TEXT NOT NULL DEFAULT 'pending'",
+    "claimed_by": "ALTER TABLE activities ADD COLUMN claimed_by TEXT",
+    "claim_expires": "ALTER TABLE activities ADD COLUMN claim_expires REAL",
+    "reviewed_by": "ALTER TABLE activities ADD COLUMN reviewed_by TEXT",
+    "reviewed_at": "ALTER TABLE activities ADD COLUMN reviewed_at TEXT",
+    "capacity": "ALTER TABLE activities ADD COLUMN capacity INTEGER",
+    "registered_count": "ALTER TABLE activities ADD COLUMN registered_count INTEGER NOT NULL DEFAULT 0",
+    "like_count": "ALTER TABLE activities ADD COLUMN like_count INTEGER NOT NULL DEFAULT 0",
+    "duplicate_of": "ALTER TABLE activities ADD COLUMN duplicate_of INTEGER",
+}
+
+# Condition every feed query adds so denied posts are never listed
+LISTED = f"status != '{DENIED}'"
+# Condition public listings (feeds, search, ranking, the JSON API) add as well;
+# private posts are only seen in the moderation queue
+PUBLISHED = f"visibility = '{PUBLIC}'"
+
+
+# ---------- ACTIVITY RECORDS ----------
+ACTIVITY_COLUMNS = (
+    "id", "registration_link", "activity_file", "date", "place", "about_event", "cause", "poster", "created_at",
+) + tuple(MIGRATIONS)
+
+# Columns with few distinct values; every row shares one string per value
+INTERNED_COLUMNS = {"date", "place", "cause", "poster", "visibility", "status", "claimed_by", "reviewed_by"}
+
+
+class Activity(Mapping):
+    """One activities row, read like a read-only dict.
+
+    Feed caches hold thousands of these, so rows are stored in slots rather
+    than a per-row dict (about a third of the memory) and repeated strings
+    such as causes, places and dates are interned.
+    """
+
+    __slots__ = ACTIVITY_COLUMNS
+    _columns = frozenset(ACTIVITY_COLUMNS)
+
+    def __getitem__(self, key):
+        # Only columns are keys; methods and dunders aren't row data
+        if key not in self._columns:
+            raise KeyError(key)
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __iter__(self):
+        return (column for column in ACTIVITY_COLUMNS if hasattr(self, column))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"Activity({dict(self)!r})"
+
+    @classmethod
+    def from_cursor(cls, cursor):
+        """Build records from a ``SELECT activities.*`` cursor."""
+        setters = []
+        for column in cursor.description:
+            setter = getattr(cls, column[0]).__set__
+            if column[0] in INTERNED_COLUMNS:
+                setter = cls._interning(setter)
+            setters.append(setter)
+        new = cls.__new__
+        records = []
+        for row in cursor:
+            record = new(cls)
+            for setter, value in zip(setters, row):
+                setter(record, value)
+            records.append(record)
+        return records
+
+    @staticmethod
+    def _interning(setter):
+        def set_interned(record, value):
+            setter(record, sys.intern(value) if isinstance(value, str) else value)
+        return set_interned
+
+
+# ---------- ACTIVITY STORE ----------
+class ActivityStore:
+    """SQLite-backed activity store shared by every session.
+
+    The database runs in WAL mode so readers never block the writer, and each
+    thread (Streamlit runs one script thread per session) gets its own
+    connection.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = path
+        self._local = threading.local()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        conn = self._connect()
+        with conn:
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(activities)")}
+            for column, statement in MIGRATIONS.items():
+                if column not in columns:
+                    conn.execute(statement)
+            conn.executescript(MODERATION_SCHEMA)
+            conn.executescript(LINK_SCHEMA)
+            conn.executescript(REGISTRATION_SCHEMA)
+            conn.executescript(LIKE_SCHEMA)
+            conn.executescript(NOTIFICATION_SCHEMA)
+            conn.executescript(DOCUMENT_SCHEMA)
+            conn.executescript(DEDUP_SCHEMA)
+            has_rollups = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'activity_rollups'"
+            ).fetchone()
+            # Older triggers counted private posts too; replace them and recount
+            stale_rollups = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'trigger' AND name = 'activity_rollups_insert' "
+                "AND sql NOT LIKE '%visibility%'"
+            ).fetchone()
+            if stale_rollups:
+                for trigger in ROLLUP_TRIGGERS:
+                    conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.executescript(ROLLUP_SCHEMA)
+            if not has_rollups or stale_rollups:
+                # Count activities stored before the rollups (or these triggers) existed
+                self._rebuild_rollups(conn)
+            has_fts = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE name = 'activities_fts'"
+            ).fetchone()
+            conn.executescript(FTS_SCHEMA)
+            if not has_fts:
+                # Index activities stored before full-text search existed
+                conn.execute("INSERT INTO activities_fts (activities_fts) VALUES ('rebuild')")
+
+    def _connect(self):
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def _activities(self, sql, params=()):
+        """Run a ``SELECT activities.*`` query and return compact Activity records."""
+        cursor = self._connect().cursor()
+        cursor.row_factory = None  # Activity reads plain tuples
+        return Activity.from_cursor(cursor.execute(sql, params))
+
+    def add_activity(self, activity):
+        """Insert one activity dict and return its new id."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(INSERT_SQL, self._row_values(activity))
+        return cursor.lastrowid
+
+    def add_activities(self, activities):
+        """Insert a batch of activity dicts in a single transaction."""
+        conn = self._connect()
+        with conn:
+            conn.executemany(INSERT_SQL, [self._row_values(activity) for activity in activities])
+
+    @staticmethod
+    def _row_values(activity):
+        values = [activity.get(field) for field in ACTIVITY_FIELDS]
+        values[ACTIVITY_FIELDS.index("visibility")] = activity.get("visibility") or "Public"
+        return values + [datetime.now().isoformat(timespec="seconds")]
+
+    def iter_activities(self, batch_size=1000):
+        """Yield every activity in id order, fetching ``batch_size`` rows at a time.
+
+        Uses keyset paging, so memory stays flat and no read transaction is
+        held open between batches.
+        """
+        last_id = 0
+        while True:
+            rows = self._connect().execute(
+                "SELECT * FROM activities WHERE id > ? ORDER BY id LIMIT ?",
+                (last_id, batch_size),
+            ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield dict(row)
+            last_id = rows[-1]["id"]
+
+    def get_activity(self, activity_id):
+        """Fetch a single activity by id, or None."""
+        rows = self._activities("SELECT * FROM activities WHERE id = ?", (activity_id,))
+        return rows[0] if rows else None
+
+    def get_activities(self, ids):
+        """Listed public activities with the given ids, in the order of ``ids``."""
+        ids = list(ids)
+        if not ids:
+            return []
+        rows = self._activities(
+            f"SELECT * FROM activities WHERE {LISTED} AND {PUBLISHED} AND id IN ({', '.join('?' for _ in ids)})",
+            ids,
+        )
+        by_id = {row["id"]: row for row in rows}
+        return [by_id[activity_id] for activity_id in ids if activity_id in by_id]
+
+    def list_activities(self, cause=None, place=None, start_date=None, end_date=None, limit=None,
+                        before_id=None, after_id=None, visibility=PUBLIC):
+        """Return activities matching the filters, newest submissions first.
+
+        Every filter maps onto an indexed column, so SQLite never has to scan
+        the whole table to answer the query. Pass the last id of the previous
+        page as ``before_id`` to fetch the next page (keyset pagination), which
+        costs the same no matter how deep the page is. ``after_id`` instead
+        returns only activities submitted after that id, oldest first, so a
+        client can fetch just what is new. Only public activities are listed
+        unless ``visibility`` says otherwise (None for all).
+        """
+        where, params = self._filters(cause, place, start_date, end_date, visibility)
+        if before_id is not None:
+            where += " AND id < ?"
+            params.append(before_id)
+        if after_id is not None:
+            where += " AND id > ?"
+            params.append(after_id)
+        sql = f"SELECT * FROM activities{where} ORDER BY id {'ASC' if after_id is not None else 'DESC'}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._activities(sql, params)
+
+    def count_activities(self, cause=None, place=None, start_date=None, end_date=None, visibility=PUBLIC):
+        """Count activities matching the filters."""
+        where, params = self._filters(cause, place, start_date, end_date, visibility)
+        return self._connect().execute(
+            f"SELECT COUNT(*) FROM activities{where}", params
+        ).fetchone()[0]
+
+    def upcoming_activities(self, limit=10, from_date=None):
+        """Next ``limit`` activities dated on or after ``from_date`` (today by default)."""
+        from_date = from_date or datetime.now().date()
+        return self.activities_between(from_date, None, limit=limit)
+
+    def activities_between(self, start_date, end_date, limit=None):
+        """Activities dated within [start_date, end_date], soonest first.
+
+        Dates are stored as ISO strings, so they sort chronologically and the
+        date index answers this with one range scan: O(log n + k).
+        """
+        clauses, params = [LISTED, PUBLISHED, "date >= ?"], [str(start_date)]
+        if end_date is not None:
+            clauses.append("date <= ?")
+            params.append(str(end_date))
+        sql = f"SELECT * FROM activities WHERE {' AND '.join(clauses)} ORDER BY date, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return self._activities(sql, params)
+
+    def search_activities(self, query, limit=20):
+        """Full-text search of public activities' description, place, cause and attached documents, best match first.
+
+        Each word in ``query`` is matched as a prefix, so results update as
+        the user types.
+        """
+        match = self._match_expression(query)
+        if not match:
+            return []
+        weights = ", ".join(str(weight) for weight in FTS_WEIGHTS)
+        return self._activities(
+            f"""
+            SELECT activities.* FROM (
+                SELECT * FROM (
+                    SELECT activities.id, bm25(activities_fts, {weights}) AS rank FROM activities_fts
+                    JOIN activities ON activities.id = activities_fts.rowid
+                    WHERE activities_fts MATCH ? AND activities.{LISTED} AND activities.{PUBLISHED}
+                    ORDER BY rank LIMIT ?
+                )
+                UNION ALL
+                SELECT * FROM (
+                    SELECT activities.id, bm25(documents_fts, {DOCUMENT_FTS_WEIGHT}) AS rank FROM documents_fts
+                    JOIN document_text ON document_text.rowid = documents_fts.rowid
+                    JOIN activities ON activities.activity_file_blob = document_text.blob
+                    WHERE documents_fts MATCH ? AND activities.{LISTED} AND activities.{PUBLISHED}
+                    ORDER BY rank LIMIT ?
+                )
+            ) AS matches
+            JOIN activities ON activities.id = matches.id
+            GROUP BY activities.id
+            ORDER BY MIN(matches.rank)
+            LIMIT ?
+            """,
+            (match, limit, match, limit, limit),
+        )
+
+    @staticmethod
+    def _match_expression(query):
+        """Turn free text into a safe FTS5 prefix query."""
+        terms = ["".join(ch for ch in word if ch.isalnum()) for word in query.split()]
+        return " ".join(f'"{term}"*' for term in terms if term)
+
+    @staticmethod
+    def _filters(cause, place, start_date, end_date, visibility=PUBLIC):
+        """Build the WHERE clause shared by the list and count queries."""
+        clauses, params = [LISTED], []
+        if visibility:
+            clauses.append("visibility = ?")
+            params.append(visibility)
+        if cause:
+            clauses.append("cause = ?")
+            params.append(cause)
+        if place:
+            clauses.append("place = ?")
+            params.append(place)
+        if start_date:
+            clauses.append("date >= ?")
+            params.append(str(start_date))
+        if end_date:
+            clauses.append("date <= ?")
+            params.append(str(end_date))
+        return f" WHERE {' AND '.join(clauses)}", params
+
+    # ---------- MODERATION QUEUE ----------
+    def claim_pending(self, moderator, limit=10, visibility=None, lease_seconds=CLAIM_SECONDS):
+        """Lease up to ``limit`` unclaimed pending posts to ``moderator``.
+
+        The select and the claim happen in one UPDATE statement, so two
+        moderators can never be handed the same post. Claims whose lease has
+        run out are up for grabs again.
+        """
+        now = time.time()
+        visibility_clause = "AND visibility = ?" if visibility else ""
+        params = [moderator, now + lease_seconds, PENDING]
+        if visibility:
+            params.append(visibility)
+        params += [now, limit]
+        conn = self._connect()
+        with conn:
+            rows = conn.execute(
+                f"""
+                UPDATE activities SET claimed_by = ?, claim_expires = ?
+                WHERE id IN (
+                    SELECT id FROM activities
+                    WHERE status = ? {visibility_clause}
+                    AND (claim_expires IS NULL OR claim_expires < ?)
+                    ORDER BY id LIMIT ?
+                )
+                RETURNING *
+                """,
+                params,
+            ).fetchall()
+        return sorted((dict(row) for row in rows), key=lambda row: row["id"])
+
+    def claimed_posts(self, moderator, visibility=None):
+        """Pending posts ``moderator`` currently holds a live lease on."""
+        sql = "SELECT * FROM activities WHERE status = ? AND claimed_by = ? AND claim_expires >= ?"
+        params = [PENDING, moderator, time.time()]
+        if visibility:
+            sql += " AND visibility = ?"
+            params.append(visibility)
+        return self._activities(sql + " ORDER BY id", params)
+
+    def review_posts(self, ids, moderator, decision):
+        """Accept or deny claimed posts in one statement; returns the ids that changed.
+
+        Posts whose lease expired or that someone else now holds are skipped.
+        Accepting a post flagged as a near-duplicate clears the flag.
+        """
+        if not ids:
+            return []
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                f"""
+                UPDATE activities
+                SET status = ?, reviewed_by = ?, reviewed_at = ?, claimed_by = NULL, claim_expires = NULL,
+                    duplicate_of = CASE WHEN ? = '{ACCEPTED}' THEN NULL ELSE duplicate_of END
+                WHERE id IN ({', '.join('?' for _ in ids)})
+                AND status = ? AND claimed_by = ? AND claim_expires >= ?
+                RETURNING id
+                """,
+                [decision, moderator, datetime.now().isoformat(timespec="seconds"), decision, *ids,
+                 PENDING, moderator, time.time()],
+            )
+            reviewed = [row[0] for row in cursor]
+        return reviewed
+
+    def release_claims(self, moderator):
+        """Hand every post ``moderator`` holds back to the queue."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "UPDATE activities SET claimed_by = NULL, claim_expires = NULL WHERE claimed_by = ? AND status = ?",
+                (moderator, PENDING),
+            )
+
+    def pending_count(self, visibility=None):
+        """Number of posts still waiting for review."""
+        sql, params = "SELECT COUNT(*) FROM activities WHERE status = ?", [PENDING]
+        if visibility:
+            sql += " AND visibility = ?"
+            params.append(visibility)
+        return self._connect().execute(sql, params).fetchone()[0]
+
+    # ---------- LINK HEALTH ----------
+    def save_link_status(self, url, status, http_status=None):
+        """Record the latest check result for a registration link."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO link_status (url, status, http_status, checked_at) VALUES (?, ?, ?, ?)",
+                (url, status, http_status, time.time()),
+            )
+
+    def link_statuses(self, urls):
+        """Map each checked url in ``urls`` to its status row."""
+        urls = list(set(urls))
+        if not urls:
+            return {}
+        rows = self._connect().execute(
+            f"SELECT * FROM link_status WHERE url IN ({', '.join('?' for _ in urls)})", urls
+        )
+        return {row["url"]: dict(row) for row in rows}
+
+    def stale_links(self, max_age, limit=500):
+        """Listed registration links never checked or checked over ``max_age`` seconds ago."""
+        rows = self._connect().execute(
+            f"""
+            SELECT DISTINCT activities.registration_link FROM activities
+            LEFT JOIN link_status ON link_status.url = activities.registration_link
+            WHERE activities.{LISTED} AND (link_status.checked_at IS NULL OR link_status.checked_at < ?)
+            LIMIT ?
+            """,
+            (time.time() - max_age, limit),
+        )
+        return [row[0] for row in rows]
+
+    # ---------- DOCUMENT TEXT ----------
+    def save_document_text(self, blob, status, pages=None, text=None, error=None):
+        """Record the extraction result for an uploaded file's blob."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO document_text (blob, status, pages, text, error, extracted_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (blob) DO UPDATE SET status = excluded.status, pages = excluded.pages,
+                    text = excluded.text, error = excluded.error, extracted_at = excluded.extracted_at
+                """,
+                (blob, status, pages, text, error, time.time()),
+            )
+
+    def document_previews(self, blobs, chars=300):
+        """Map each extracted blob in ``blobs`` to its status, page count and first ``chars`` characters."""
+        blobs = list({blob for blob in blobs if blob})
+        if not blobs:
+            return {}
+        rows = self._connect().execute(
+            f"""
+            SELECT blob, status, pages, substr(text, 1, ?) AS preview FROM document_text
+            WHERE blob IN ({', '.join('?' for _ in blobs)})
+            """,
+            [chars, *blobs],
+        )
+        return {row["blob"]: dict(row) for row in rows}
+
+    def document_status(self, blob):
+        """Status of the stored extraction result for ``blob``, or None if there is none."""
+        row = self._connect().execute("SELECT status FROM document_text WHERE blob = ?", (blob,)).fetchone()
+        return row[0] if row else None
+
+    def unextracted_documents(self, limit=100):
+        """Blobs of uploaded activity files with no extraction result yet."""
+        rows = self._connect().execute(
+            """
+            SELECT DISTINCT activities.activity_file_blob FROM activities
+            LEFT JOIN document_text ON document_text.blob = activities.activity_file_blob
+            WHERE activities.activity_file_blob IS NOT NULL AND document_text.blob IS NULL
+            LIMIT ?
+            """,
+            (limit,),
+        )
+        return [row[0] for row in rows]
+
+    # ---------- NEAR-DUPLICATES ----------
+    def save_signatures(self, rows):
+        """Index ``(activity id, signature bytes, band buckets)`` rows in one transaction."""
+        if not rows:
+            return
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO activity_signatures (activity_id, signature) VALUES (?, ?)",
+                [(activity_id, signature) for activity_id, signature, _ in rows],
+            )
+            # Sorted like the primary key so the batch lands in neighbouring pages
+            conn.executemany(
+                "INSERT OR IGNORE INTO activity_lsh (band, bucket, activity_id) VALUES (?, ?, ?)",
+                sorted((band, bucket, activity_id) for activity_id, _, buckets in rows
+                       for band, bucket in enumerate(buckets)),
+            )
+
+    def lsh_candidates(self, buckets, limit=50, per_bucket=200, from_date=None, to_date=None):
+        """``(id, duplicate_of, signature)`` of listed activities sharing a bucket, most shared first.
+
+        Only the newest ``per_bucket`` activities of each bucket are read.
+        With ``from_date``/``to_date``, only activities dated in that range
+        count, before ``limit`` is applied, so other dates of a recurring
+        event can't crowd out a real copy.
+        """
+        dated = "AND activities.date BETWEEN ? AND ?" if from_date is not None else ""
+        date_params = [str(from_date), str(to_date)] if from_date is not None else []
+        lookups = " UNION ALL ".join(
+            "SELECT * FROM (SELECT activity_id FROM activity_lsh WHERE band = ? AND bucket = ? "
+            "ORDER BY activity_id DESC LIMIT ?)" for _ in buckets
+        )
+        rows = self._connect().execute(
+            f"""
+            SELECT activities.id, activities.duplicate_of, activity_signatures.signature FROM (
+                SELECT activity_id, COUNT(*) AS shared FROM ({lookups})
+                GROUP BY activity_id
+            ) AS candidates
+            JOIN activities ON activities.id = candidates.activity_id
+            JOIN activity_signatures ON activity_signatures.activity_id = candidates.activity_id
+            WHERE activities.{LISTED} {dated}
+            ORDER BY candidates.shared DESC LIMIT ?
+            """,
+            [value for band, bucket in enumerate(buckets) for value in (band, bucket, per_bucket)]
+            + date_params + [limit],
+        )
+        return rows.fetchall()
+
+    def unsigned_activities(self, limit=1000, after_id=0):
+        """Id, description and place of activities after ``after_id`` not yet in the duplicate index."""
+        rows = self._connect().execute(
+            """
+            SELECT id, about_event, place FROM activities
+            WHERE id > ? AND id NOT IN (SELECT activity_id FROM activity_signatures)
+            ORDER BY id LIMIT ?
+            """,
+            (after_id, limit),
+        )
+        return [dict(row) for row in rows]
+
+    # ---------- REGISTRATIONS ----------
+    def register(self, activity_id, user_id):
+        """Sign ``user_id`` up for an activity; returns REGISTERED, WAITLISTED or None.
+
+        The seat is taken by a conditional UPDATE on the activity's counter,
+        so concurrent sign-ups can never overbook it and nothing is read and
+        written back. Users past capacity join the waitlist. Registering twice
+        returns the existing status; None means the activity doesn't exist.
+        """
+        now = datetime.now().isoformat(timespec="seconds")
+        conn = self._connect()
+        with conn:
+            # Writing first makes this transaction take the write lock up front
+            inserted = conn.execute(
+                """
+                INSERT INTO registrations (activity_id, user_id, status, created_at)
+                SELECT id, ?, ?, ? FROM activities WHERE id = ?
+                ON CONFLICT (activity_id, user_id) DO NOTHING
+                """,
+                (user_id, WAITLISTED, now, activity_id),
+            ).rowcount
+            if not inserted:
+                row = conn.execute(
+                    "SELECT status FROM registrations WHERE activity_id = ? AND user_id = ?",
+                    (activity_id, user_id),
+                ).fetchone()
+                return row["status"] if row else None
+            seated = conn.execute(
+                """
+                UPDATE activities SET registered_count = registered_count + 1
+                WHERE id = ? AND (capacity IS NULL OR registered_count < capacity)
+                """,
+                (activity_id,),
+            ).rowcount
+            if not seated:
+                return WAITLISTED
+            conn.execute(
+                "UPDATE registrations SET status = ? WHERE activity_id = ? AND user_id = ?",
+                (REGISTERED, activity_id, user_id),
+            )
+        return REGISTERED
+
+    def cancel_registration(self, activity_id, user_id):
+        """Drop a registration; a freed seat goes to the first waitlisted user.
+
+        Returns the promoted user's id, or None.
+        """
+        conn = self._connect()
+        with conn:
+            row = conn.execute(
+                "DELETE FROM registrations WHERE activity_id = ? AND user_id = ? RETURNING status",
+                (activity_id, user_id),
+            ).fetchone()
+            if row is None or row["status"] != REGISTERED:
+                return None
+            promoted = conn.execute(
+                """
+                UPDATE registrations SET status = ?
+                WHERE id = (
+                    SELECT id FROM registrations
+                    WHERE activity_id = ? AND status = ? ORDER BY id LIMIT 1
+                )
+                RETURNING user_id
+                """,
+                (REGISTERED, activity_id, WAITLISTED),
+            ).fetchone()
+            if promoted is not None:
+                return promoted["user_id"]
+            conn.execute(
+                "UPDATE activities SET registered_count = registered_count - 1 WHERE id = ?",
+                (activity_id,),
+            )
+        return None
+
+    def registration_summary(self, activity_ids, user_id=None):
+        """Live seat counts per activity, plus ``user_id``'s own status.
+
+        Maps id to ``{capacity, registered, waitlisted, status}``; read on
+        every rerun so cached feed rows never show stale counts.
+        """
+        ids = list(set(activity_ids))
+        if not ids:
+            return {}
+        rows = self._connect().execute(
+            f"""
+            SELECT activities.id, activities.capacity, activities.registered_count,
+                (SELECT COUNT(*) FROM registrations
+                 WHERE activity_id = activities.id AND status = ?) AS waitlisted,
+                (SELECT status FROM registrations
+                 WHERE activity_id = activities.id AND user_id = ?) AS status
+            FROM activities WHERE id IN ({', '.join('?' for _ in ids)})
+            """,
+            [WAITLISTED, user_id, *ids],
+        )
+        return {
+            row["id"]: {
+                "capacity": row["capacity"],
+                "registered": row["registered_count"],
+                "waitlisted": row["waitlisted"],
+                "status": row["status"],
+            }
+            for row in rows
+        }
+
+    def user_registrations(self, user_id):
+        """Activities ``user_id`` signed up for, with status and waitlist position."""
+        rows = self._connect().execute(
+            """
+            SELECT activities.*, registrations.status AS registration_status,
+                CASE WHEN registrations.status = ? THEN (
+                    SELECT COUNT(*) FROM registrations AS ahead
+                    WHERE ahead.activity_id = registrations.activity_id
+                    AND ahead.status = ? AND ahead.id <= registrations.id
+                ) END AS waitlist_position
+            FROM registrations JOIN activities ON activities.id = registrations.activity_id
+            WHERE registrations.user_id = ?
+            ORDER BY activities.date, activities.id
+            """,
+            (WAITLISTED, WAITLISTED, user_id),
+        )
+        return [dict(row) for row in rows]
+
+    # ---------- ROLLUPS ----------
+    def rollup(self, dimension, start=None, end=None, limit=None, by_count=False):
+        """``(bucket, count)`` pairs for one rollup dimension.
+
+        Ordered by bucket (or by count, highest first), optionally limited to
+        buckets in [start, end]. Reads only the rollup table.
+        """
+        sql = "SELECT bucket, count FROM activity_rollups WHERE dimension = ? AND count > 0"
+        params = [dimension]
+        if start is not None:
+            sql += " AND bucket >= ?"
+            params.append(str(start))
+        if end is not None:
+            sql += " AND bucket <= ?"
+            params.append(str(end))
+        sql += " ORDER BY count DESC, bucket" if by_count else " ORDER BY bucket"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [tuple(row) for row in self._connect().execute(sql, params)]
+
+    def rebuild_rollups(self):
+        """Recount every rollup from the activities table."""
+        conn = self._connect()
+        with conn:
+            self._rebuild_rollups(conn)
+
+    @staticmethod
+    def _rebuild_rollups(conn):
+        conn.execute("DELETE FROM activity_rollups")
+        for dimension, expression in ROLLUP_DIMENSIONS.items():
+            bucket = expression.format(row="activities")
+            conn.execute(
+                f"""
+                INSERT INTO activity_rollups (dimension, bucket, count)
+                SELECT ?, {bucket}, COUNT(*) FROM activities WHERE {LISTED} AND {PUBLISHED} GROUP BY {bucket}
+                """,
+                (dimension,),
+            )
+
+    # ---------- RANKING ----------
+    def ranking_rows(self):
+        """``(id, cause, date, place, like_count)`` for every listed public activity."""
+        cursor = self._connect().cursor()
+        cursor.row_factory = None  # plain tuples; sqlite3.Row costs ~25% on a full scan
+        return cursor.execute(
+            f"SELECT id, cause, date, place, like_count FROM activities WHERE {LISTED} AND {PUBLISHED}"
+        ).fetchall()
+
+    def user_interactions(self, user_id, like_weight=1.0, registration_weight=2.0):
+        """``(cause, place, weight)`` for each activity ``user_id`` liked or signed up for."""
+        return self._connect().execute(
+            """
+            SELECT activities.cause, activities.place, ? FROM likes
+            JOIN activities ON activities.id = likes.activity_id WHERE likes.user_id = ?
+            UNION ALL
+            SELECT activities.cause, activities.place, ? FROM registrations
+            JOIN activities ON activities.id = registrations.activity_id WHERE registrations.user_id = ?
+            """,
+            (like_weight, user_id, registration_weight, user_id),
+        ).fetchall()
+
+    # ---------- LIKES ----------
+    def add_like(self, activity_id, user_id, liked_at=None):
+        """Record a like and count it; returns False if the user already liked it."""
+        conn = self._connect()
+        with conn:
+            added = conn.execute(
+                "INSERT OR IGNORE INTO likes (activity_id, user_id, liked_at) VALUES (?, ?, ?)",
+                (activity_id, user_id, liked_at or time.time()),
+            ).rowcount == 1
+            if added:
+                conn.execute("UPDATE activities SET like_count = like_count + 1 WHERE id = ?", (activity_id,))
+            return added
+
+    def remove_like(self, activity_id, user_id):
+        """Remove a like and uncount it; returns False if there was none."""
+        conn = self._connect()
+        with conn:
+            removed = conn.execute(
+                "DELETE FROM likes WHERE activity_id = ? AND user_id = ?", (activity_id, user_id)
+            ).rowcount == 1
+            if removed:
+                conn.execute("UPDATE activities SET like_count = like_count - 1 WHERE id = ?", (activity_id,))
+            return removed
+
+    def recount_likes(self):
+        """Set every ``like_count`` from the likes table; returns how many were wrong."""
+        conn = self._connect()
+        with conn:
+            fixed = conn.execute(
+                "UPDATE activities SET like_count = 0 WHERE like_count != 0 "
+                "AND id NOT IN (SELECT activity_id FROM likes)"
+            ).rowcount
+            fixed += conn.execute(
+                """
+                UPDATE activities SET like_count = counts.total
+                FROM (SELECT activity_id, COUNT(*) AS total FROM likes GROUP BY activity_id) AS counts
+                WHERE activities.id = counts.activity_id AND activities.like_count != counts.total
+                """
+            ).rowcount
+        return fixed
+
+    def like_summary(self, activity_ids, user_id=None):
+        """Map each id to ``(stored like count, whether user_id liked it)``."""
+        ids = list(set(activity_ids))
+        if not ids:
+            return {}
+        rows = self._connect().execute(
+            f"""
+            SELECT id, like_count,
+                EXISTS (SELECT 1 FROM likes WHERE activity_id = activities.id AND user_id = ?) AS liked
+            FROM activities WHERE id IN ({', '.join('?' for _ in ids)})
+            """,
+            [user_id, *ids],
+        )
+        return {row["id"]: (row["like_count"], bool(row["liked"])) for row in rows}
+
+    def user_likes(self, user_id):
+        """Listed activities ``user_id`` liked, most recent like first."""
+        return self._activities(
+            f"""
+            SELECT activities.* FROM likes JOIN activities ON activities.id = likes.activity_id
+            WHERE likes.user_id = ? AND activities.{LISTED}
+            ORDER BY likes.liked_at DESC
+            """,
+            (user_id,),
+        )
+
+    def recent_likes(self, since):
+        """``(activity_id, liked_at)`` for every like newer than ``since``."""
+        return self._connect().execute(
+            "SELECT activity_id, liked_at FROM likes WHERE liked_at > ?", (since,)
+        ).fetchall()
+
+    # ---------- NOTIFICATIONS ----------
+    def save_notification_prefs(self, user_id, email, remind_days=1, enabled=True):
+        """Create or update a user's reminder settings."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                """
+                INSERT INTO notification_prefs (user_id, email, remind_days, enabled) VALUES (?, ?, ?, ?)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    email = excluded.email, remind_days = excluded.remind_days, enabled = excluded.enabled
+                """,
+                (user_id, email, remind_days, int(enabled)),
+            )
+
+    def notification_prefs(self, user_id):
+        """A user's reminder settings, or None if they never saved any."""
+        row = self._connect().execute(
+            "SELECT * FROM notification_prefs WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def reminder_candidates(self, from_date, to_date, claim_seconds=REMINDER_CLAIM_SECONDS):
+        """Unsent reminders for registered events dated in [from_date, to_date].
+
+        Returns ``(activity_id, user_id, date, remind_days)`` rows for users
+        who opted in. Reminders another sender claimed are left out until
+        the claim runs out.
+        """
+        return self._connect().execute(
+            f"""
+            SELECT registrations.activity_id, registrations.user_id, activities.date, notification_prefs.remind_days
+            FROM registrations
+            JOIN notification_prefs ON notification_prefs.user_id = registrations.user_id
+            JOIN activities ON activities.id = registrations.activity_id
+            LEFT JOIN reminders_sent ON reminders_sent.activity_id = registrations.activity_id
+                AND reminders_sent.user_id = registrations.user_id
+            WHERE registrations.status = ? AND notification_prefs.enabled AND activities.{LISTED}
+            AND activities.date BETWEEN ? AND ?
+            AND (reminders_sent.activity_id IS NULL OR (reminders_sent.status = ? AND reminders_sent.sent_at < ?))
+            """,
+            (REGISTERED, str(from_date), str(to_date), SENDING, time.time() - claim_seconds),
+        ).fetchall()
+
+    def claim_reminders(self, keys, claim_seconds=REMINDER_CLAIM_SECONDS):
+        """Claim ``(activity_id, user_id)`` reminders for sending; returns the keys this caller got.
+
+        Each claim is one INSERT ... ON CONFLICT, so when several processes
+        run a scheduler only one of them sends a given reminder. Reminders
+        already done, or claimed by someone else less than ``claim_seconds``
+        ago, are skipped.
+        """
+        now = time.time()
+        claimed = []
+        conn = self._connect()
+        with conn:
+            for activity_id, user_id in keys:
+                row = conn.execute(
+                    """
+                    INSERT INTO reminders_sent (activity_id, user_id, sent_at, status) VALUES (?, ?, ?, ?)
+                    ON CONFLICT (activity_id, user_id) DO UPDATE SET sent_at = excluded.sent_at
+                    WHERE reminders_sent.status = ? AND reminders_sent.sent_at < ?
+                    RETURNING activity_id
+                    """,
+                    (activity_id, user_id, now, SENDING, SENDING, now - claim_seconds),
+                ).fetchone()
+                if row is not None:
+                    claimed.append((activity_id, user_id))
+        return claimed
+
+    def release_reminders(self, keys):
+        """Drop claims on reminders that weren't sent, so they can be tried again."""
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "DELETE FROM reminders_sent WHERE activity_id = ? AND user_id = ? AND status = ?",
+                [(activity_id, user_id, SENDING) for activity_id, user_id in keys],
+            )
+
+    def reminder_details(self, keys):
+        """Current details for ``(activity_id, user_id)`` pairs that still need a reminder.
+
+        Pairs whose registration was cancelled, whose user opted out or that
+        were already sent (or failed) are left out.
+        """
+        details = []
+        conn = self._connect()
+        for activity_id, user_id in keys:
+            row = conn.execute(
+                f"""
+                SELECT activities.*, notification_prefs.email, registrations.user_id
+                FROM registrations
+                JOIN notification_prefs ON notification_prefs.user_id = registrations.user_id
+                JOIN activities ON activities.id = registrations.activity_id
+                WHERE registrations.activity_id = ? AND registrations.user_id = ?
+                AND registrations.status = ? AND notification_prefs.enabled AND activities.{LISTED}
+                AND NOT EXISTS (
+                    SELECT 1 FROM reminders_sent WHERE activity_id = ? AND user_id = ? AND status != ?
+                )
+                """,
+                (activity_id, user_id, REGISTERED, activity_id, user_id, SENDING),
+            ).fetchone()
+            if row is not None:
+                details.append(dict(row))
+        return details
+
+    def mark_reminders(self, keys, status="sent"):
+        """Record that reminders for ``(activity_id, user_id)`` pairs are done."""
+        now = time.time()
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO reminders_sent (activity_id, user_id, sent_at, status) VALUES (?, ?, ?, ?)",
+                [(activity_id, user_id, now, status) for activity_id, user_id in keys],
+            )
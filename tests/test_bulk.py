@@ -0,0 +1,46 @@
+"""Import validation shared by bulk import, the API and the Submit form, and export."""
+import io
+import json
+from datetime import date as Date, timedelta
+
+import pytest
+
+from helpize.bulk import EXPORT_FIELDS, export_jsonl, import_activities, validate_activity
+from helpize.storage import ActivityStore
+
+RECORD = {"date": "2031-01-04", "place": "City Hall", "about_event": "Park clean-up",
+          "cause": "Environmental", "poster": "poster.png"}
+
+
+@pytest.mark.parametrize("link", ["https://example.org/register", " http://example.org ", "HTTPS://EXAMPLE.ORG"])
+def test_web_links_are_accepted(link):
+    activity, reason = validate_activity(dict(RECORD, registration_link=link))
+    assert reason is None
+    assert activity["registration_link"] == link.strip()
+
+
+@pytest.mark.parametrize("link", ["javascript:alert(1)", "data:text/html,hi", "ftp://example.org", "http://", "example.org"])
+def test_other_links_are_rejected(link):
+    activity, reason = validate_activity(dict(RECORD, registration_link=link))
+    assert activity is None
+    assert reason.startswith("registration_link must be an http or https URL")
+
+
+def test_past_dates_are_rejected():
+    yesterday = Date.today() - timedelta(days=1)
+    activity, reason = validate_activity(dict(RECORD, registration_link="https://example.org", date=str(yesterday)))
+    assert activity is None
+    assert reason.endswith("is in the past")
+    activity, reason = validate_activity(dict(RECORD, registration_link="https://example.org", date=str(Date.today())))
+    assert reason is None
+
+
+def test_jsonl_export_has_the_csv_columns(tmp_path):
+    store = ActivityStore(str(tmp_path / "helpize.db"))
+    report = import_activities(store, enumerate([dict(RECORD, registration_link="https://example.org")], start=1))
+    assert report["imported"] == 1
+    out = io.StringIO()
+    assert export_jsonl(store, out) == 1
+    record = json.loads(out.getvalue())
+    assert tuple(record) == EXPORT_FIELDS
+    assert record["place"] == "City Hall"
@@ -0,0 +1,65 @@
+"""Near-duplicate checks and the background indexer."""
+import time
+
+import pytest
+
+from helpize.bulk import import_activities
+from helpize.dedup import DuplicateDetector
+from helpize.storage import ActivityStore
+
+EVENT = {"registration_link": "https://example.org/register", "place": "Riverside Park",
+         "about_event": "Weekly river clean-up, gloves and bags provided", "cause": "Environmental",
+         "poster": "poster.png", "date": "2031-01-04"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ActivityStore(str(tmp_path / "helpize.db"))
+
+
+def submit(store, detector, activity):
+    check = detector.check(activity)
+    activity_id = store.add_activity(dict(activity, duplicate_of=check.duplicate_of))
+    detector.add(activity_id, check)
+    return activity_id, check
+
+
+def test_copy_on_the_same_date_is_flagged(store):
+    detector = DuplicateDetector(store)
+    original, _ = submit(store, detector, EVENT)
+    for day in ("2031-01-04", "2031-01-05"):
+        _, check = submit(store, detector, dict(EVENT, about_event=EVENT["about_event"] + "!", date=day))
+        assert check.duplicate_of == original
+
+
+def test_next_week_of_a_recurring_event_is_not_flagged(store):
+    detector = DuplicateDetector(store)
+    submit(store, detector, EVENT)
+    for day in ("2031-01-11", "2031-01-18"):
+        _, check = submit(store, detector, dict(EVENT, date=day))
+        assert check.duplicate_of is None
+        assert check.similarity == 0.0
+
+
+def test_imported_activities_are_indexed_after_start(store):
+    detector = DuplicateDetector(store, index_interval=0.05).start()
+    try:
+        report = import_activities(store, enumerate([EVENT], start=1))
+        assert report["imported"] == 1
+        deadline = time.monotonic() + 5
+        while detector.check(EVENT).duplicate_of is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert detector.check(EVENT).duplicate_of is not None
+    finally:
+        detector.stop()
+
+
+def test_import_flags_copies(store):
+    detector = DuplicateDetector(store)
+    original, _ = submit(store, detector, EVENT)
+    rows = [EVENT, dict(EVENT, place="Town Library", about_event="Reading club for kids", date="2031-02-01"),
+            dict(EVENT, place="Town Library", about_event="Reading club for kids!", date="2031-02-01")]
+    report = import_activities(store, enumerate(rows, start=1), batch_size=2, detector=detector)
+    assert (report["imported"], report["flagged"]) == (3, 2)
+    flagged = [activity["duplicate_of"] for activity in store.iter_activities()]
+    assert flagged == [None, original, None, original + 2]
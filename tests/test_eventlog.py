@@ -0,0 +1,42 @@
+"""Event log writers sharing one root and replay merging them."""
+import os
+
+from helpize.eventlog import NAVIGATE, SUBMIT, EventLog, Views, open_writer, replay
+
+
+def submit(log, activity_id, cause="Health", visibility="Public"):
+    log.append(SUBMIT, id=activity_id, activity={"cause": cause, "visibility": visibility})
+
+
+def test_each_process_gets_its_own_directory(tmp_path):
+    first, second = open_writer(str(tmp_path), fsync=False), open_writer(str(tmp_path), fsync=False)
+    try:
+        assert first.directory != second.directory
+        assert os.path.dirname(first.directory) == os.path.dirname(second.directory) == str(tmp_path)
+    finally:
+        first.stop()
+        second.stop()
+    # Both directories are free again
+    assert open_writer(str(tmp_path), fsync=False).directory == first.directory
+
+
+def test_replay_merges_writers_by_time(tmp_path):
+    # An old single-directory log at the root is still read
+    legacy = EventLog(str(tmp_path), fsync=False)
+    first, second = open_writer(str(tmp_path), fsync=False), open_writer(str(tmp_path), fsync=False)
+    for log, activity_id in [(legacy, 1), (first, 2), (second, 3), (first, 4), (second, 5)]:
+        submit(log, activity_id)
+        log.write_pending()
+    second.append(NAVIGATE, menu="Help")
+    for log in (legacy, first, second):
+        log.stop()
+
+    events = list(replay(str(tmp_path)))
+    assert [event.data.get("id") for event in events] == [1, 2, 3, 4, 5, None]
+    assert [event.time for event in events] == sorted(event.time for event in events)
+    views = Views.rebuild(events)
+    assert views.events == 6
+    assert views.positions == {str(tmp_path): 1, first.directory: 2, second.directory: 3}
+    assert [activity["id"] for activity in views.feed()] == [5, 4, 3, 2, 1]
+    # One writer's directory replays on its own
+    assert [event.data["id"] for event in replay(first.directory)] == [2, 4]
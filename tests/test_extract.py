@@ -0,0 +1,47 @@
+"""Text extraction of uploaded documents, once per blob."""
+import io
+import zipfile
+
+import pytest
+
+from helpize.blobstore import BlobStore
+from helpize.extract import FAILED, OK, TextExtractor
+from helpize.storage import ActivityStore
+
+DOCUMENT_XML = (
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    "<w:body><w:p><w:r><w:t>Bring gloves and water</w:t></w:r></w:p></w:body></w:document>"
+)
+
+
+def docx():
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr("word/document.xml", DOCUMENT_XML)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def extractor(tmp_path):
+    extractor = TextExtractor(ActivityStore(str(tmp_path / "helpize.db")), BlobStore(str(tmp_path / "blobs")))
+    yield extractor
+    extractor.stop()
+
+
+def test_same_file_is_extracted_once(extractor):
+    digest = extractor.blobs.put_stream(io.BytesIO(docx()))
+    assert extractor.submit(digest)
+    assert extractor.wait_idle(timeout=30)
+    # The same file uploaded again
+    assert not extractor.submit(digest)
+    assert extractor.wait_idle(timeout=30)
+    assert extractor.counts[OK] == 1
+    assert extractor.store.document_previews([digest])[digest]["preview"] == "Bring gloves and water"
+
+
+def test_failed_extraction_is_retried(extractor):
+    digest = extractor.blobs.put_stream(io.BytesIO(docx()))
+    extractor.store.save_document_text(digest, FAILED, error="worker failed")
+    assert extractor.submit(digest)
+    assert extractor.wait_idle(timeout=30)
+    assert extractor.store.document_status(digest) == OK
@@ -0,0 +1,43 @@
+"""Shared feed cache."""
+import threading
+
+from helpize.feedcache import FeedCache
+
+
+def test_hits_until_invalidated():
+    cache, builds = FeedCache(), []
+    build = lambda: builds.append(1) or len(builds)  # noqa: E731
+    assert cache.get_or_build("feed", build) == 1
+    assert cache.get_or_build("feed", build) == 1
+    cache.invalidate()
+    assert cache.get_or_build("feed", build) == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+
+
+def test_build_racing_an_invalidate_is_not_stored():
+    cache = FeedCache()
+    building, release = threading.Event(), threading.Event()
+
+    def slow_build():
+        building.set()
+        release.wait(5)
+        return "stale"
+
+    thread = threading.Thread(target=cache.get_or_build, args=("feed", slow_build))
+    thread.start()
+    building.wait(5)
+    cache.invalidate()
+    release.set()
+    thread.join()
+    assert cache.get_or_build("feed", lambda: "fresh") == "fresh"
+
+
+def test_expired_and_evicted_entries_are_rebuilt():
+    cache = FeedCache(maxsize=2, ttl=0)
+    assert cache.get_or_build("a", lambda: 1) == 1
+    assert cache.get_or_build("a", lambda: 2) == 2
+    cache = FeedCache(maxsize=2)
+    for key in "abc":
+        cache.get_or_build(key, lambda: key)
+    assert cache.stats()["entries"] == 2
+    assert cache.get_or_build("a", lambda: "rebuilt") == "rebuilt"
@@ -0,0 +1,60 @@
+"""Likes, their stored counts and the trending list."""
+import pytest
+
+from helpize.likes import LikeCounter
+from helpize.storage import ActivityStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ActivityStore(str(tmp_path / "helpize.db"))
+
+
+def add_event(store, about):
+    return store.add_activity({
+        "registration_link": "https://example.com/register",
+        "date": "2031-01-04",
+        "place": "City Hall",
+        "about_event": about,
+        "cause": "Community Help",
+        "poster": "poster.png",
+    })
+
+
+def like_count(store, activity_id):
+    return store._connect().execute("SELECT like_count FROM activities WHERE id = ?", (activity_id,)).fetchone()[0]
+
+
+def test_like_count_follows_the_likes_table(store):
+    activity_id = add_event(store, "Park clean-up")
+    counter = LikeCounter(store).start()
+    assert counter.like(activity_id, "ana")
+    assert counter.like(activity_id, "ben")
+    assert not counter.like(activity_id, "ana")
+    assert like_count(store, activity_id) == 2
+    assert counter.unlike(activity_id, "ana")
+    assert not counter.unlike(activity_id, "ana")
+    assert like_count(store, activity_id) == 1
+    assert store.like_summary([activity_id], "ben") == {activity_id: (1, True)}
+
+
+def test_start_recounts_drifted_counts(store):
+    liked, unliked = add_event(store, "Park clean-up"), add_event(store, "Food drive")
+    store.add_like(liked, "ana")
+    store._connect().execute("UPDATE activities SET like_count = 7")
+    store._connect().commit()
+    LikeCounter(store).start()
+    assert like_count(store, liked) == 1
+    assert like_count(store, unliked) == 0
+    assert store.recount_likes() == 0
+
+
+def test_trending_is_seeded_and_updated(store):
+    quiet, busy = add_event(store, "Park clean-up"), add_event(store, "Food drive")
+    for user_id in ("ana", "ben"):
+        store.add_like(busy, user_id)
+    counter = LikeCounter(store).start()
+    assert counter.top() == [busy]
+    for user_id in ("cy", "di", "ed"):
+        counter.like(quiet, user_id)
+    assert counter.top() == [quiet, busy]
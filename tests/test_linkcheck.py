@@ -0,0 +1,110 @@
+"""LinkChecker against stand-in HTTP servers on loopback addresses."""
+import ipaddress
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+pytest.importorskip("aiohttp")
+
+from helpize.linkcheck import LinkChecker  # noqa: E402
+from helpize.storage import ActivityStore  # noqa: E402
+
+STAND_IN = ipaddress.ip_address("127.0.0.1")
+
+
+class StandIn(ThreadingHTTPServer):
+    """Serves a few fixed paths and remembers which were requested."""
+
+    def __init__(self, host):
+        super().__init__((host, 0), Handler)
+        self.requests = []
+        self.redirect_to = None
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def url(self, path):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}{path}"
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_HEAD(self):
+        self.server.requests.append((self.command, self.path))
+        if self.path == "/ok":
+            self.send_response(200)
+        elif self.path == "/no-head" and self.command == "HEAD":
+            self.send_response(405)
+        elif self.path == "/no-head":
+            self.send_response(200)
+        elif self.path == "/moved":
+            self.send_response(302)
+            self.send_header("Location", "/ok")
+        elif self.path == "/elsewhere":
+            self.send_response(302)
+            self.send_header("Location", self.server.redirect_to)
+        else:
+            self.send_response(404)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    do_GET = do_HEAD
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = StandIn("127.0.0.1")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ActivityStore(str(tmp_path / "helpize.db"))
+
+
+def check(store, urls, **kwargs):
+    checker = LinkChecker(store, timeout=5, **kwargs).start()
+    try:
+        for url in urls:
+            checker.enqueue(url)
+        checker.wait_idle(timeout=10)
+    finally:
+        checker.stop()
+    statuses = store.link_statuses(urls)
+    return {url: (statuses[url]["status"], statuses[url]["http_status"]) for url in urls}
+
+
+def test_statuses_from_stand_in(server, store):
+    urls = [server.url(path) for path in ("/ok", "/missing", "/no-head", "/moved")]
+    results = check(store, urls, allowed=lambda address: address == STAND_IN)
+    assert results == {
+        urls[0]: ("ok", 200),
+        urls[1]: ("broken", 404),
+        urls[2]: ("ok", 200),  # retried with GET
+        urls[3]: ("ok", 200),
+    }
+    assert ("GET", "/no-head") in server.requests
+
+
+def test_loopback_is_never_contacted(server, store):
+    port = server.server_address[1]
+    urls = [server.url("/ok"), f"http://localhost:{port}/ok", f"http://[::ffff:127.0.0.1]:{port}/ok"]
+    results = check(store, urls)
+    assert set(results.values()) == {("unreachable", None)}
+    assert server.requests == []
+
+
+def test_redirect_to_blocked_address_is_not_followed(server, store):
+    other = StandIn("127.0.0.2")
+    try:
+        server.redirect_to = other.url("/ok")
+        url = server.url("/elsewhere")
+        assert check(store, [url], allowed=lambda address: address == STAND_IN) == {url: ("unreachable", None)}
+        assert server.requests == [("HEAD", "/elsewhere")]
+        assert other.requests == []
+    finally:
+        other.shutdown()
+        other.server_close()
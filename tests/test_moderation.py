@@ -0,0 +1,74 @@
+"""Moderation queue leases."""
+import threading
+
+import pytest
+
+from helpize.storage import ACCEPTED, DENIED, PRIVATE, ActivityStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "helpize.db")
+
+
+def add_posts(store, count, **fields):
+    store.add_activities([{
+        "registration_link": "https://example.org/register",
+        "date": "2031-01-04",
+        "place": "City Hall",
+        "about_event": f"Event {number}",
+        "cause": "Environmental",
+        "poster": "poster.png",
+        **fields,
+    } for number in range(count)])
+
+
+def test_concurrent_claims_never_share_a_post(db):
+    add_posts(ActivityStore(db), 50)
+    moderators = [f"mod{number}" for number in range(5)]
+    start = threading.Barrier(len(moderators))
+    claimed = {}
+
+    def claim(moderator):
+        store = ActivityStore(db)
+        start.wait()
+        claimed[moderator] = [post["id"] for post in store.claim_pending(moderator, limit=15)]
+
+    threads = [threading.Thread(target=claim, args=(moderator,)) for moderator in moderators]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    ids = [post_id for batch in claimed.values() for post_id in batch]
+    assert len(ids) == len(set(ids)) == 50
+
+
+def test_claims_respect_visibility(db):
+    store = ActivityStore(db)
+    add_posts(store, 2)
+    add_posts(store, 3, visibility=PRIVATE)
+    assert len(store.claim_pending("ana", visibility=PRIVATE)) == 3
+    assert store.claim_pending("ben", visibility=PRIVATE) == []
+    assert store.pending_count(PRIVATE) == 3
+
+
+def test_expired_lease_is_reclaimed(db):
+    store = ActivityStore(db)
+    add_posts(store, 3)
+    stale = [post["id"] for post in store.claim_pending("ana", lease_seconds=-1)]
+    assert store.claimed_posts("ana") == []
+    assert [post["id"] for post in store.claim_pending("ben")] == stale
+    # The first moderator's decision no longer counts
+    assert store.review_posts(stale, "ana", ACCEPTED) == []
+    assert store.review_posts(stale, "ben", DENIED) == stale
+    assert store.pending_count() == 0
+
+
+def test_released_posts_go_back_to_the_queue(db):
+    store = ActivityStore(db)
+    add_posts(store, 3)
+    ids = [post["id"] for post in store.claim_pending("ana")]
+    assert store.claim_pending("ben") == []
+    store.release_claims("ana")
+    assert [post["id"] for post in store.claim_pending("ben")] == ids
+    assert store.review_posts(ids, "ana", ACCEPTED) == []
@@ -0,0 +1,122 @@
+"""Reminder scheduler against a stand-in aiosmtpd server."""
+import socket
+import threading
+import time
+from datetime import date as Date, timedelta
+
+import pytest
+
+pytest.importorskip("aiosmtpd")
+
+from aiosmtpd.controller import Controller  # noqa: E402
+
+from helpize.notify import ReminderScheduler, SMTPPool  # noqa: E402
+from helpize.storage import ActivityStore  # noqa: E402
+
+
+class Inbox:
+    """aiosmtpd handler keeping every message it receives."""
+
+    def __init__(self):
+        self.envelopes = []
+
+    async def handle_DATA(self, server, session, envelope):
+        self.envelopes.append(envelope)
+        return "250 OK"
+
+    def recipients(self):
+        return sorted(recipient for envelope in self.envelopes for recipient in envelope.rcpt_tos)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@pytest.fixture
+def inbox():
+    inbox = Inbox()
+    controller = Controller(inbox, hostname="127.0.0.1", port=free_port())
+    controller.start()
+    inbox.port = controller.port
+    yield inbox
+    controller.stop()
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "helpize.db")
+
+
+def add_event(store, about, days_ahead=3):
+    return store.add_activity({
+        "registration_link": "https://example.com/register",
+        "date": str(Date.today() + timedelta(days=days_ahead)),
+        "place": "City Hall",
+        "about_event": about,
+        "cause": "Community Help",
+        "poster": "poster.png",
+    })
+
+
+def sign_up(store, user_id, *activity_ids):
+    store.save_notification_prefs(user_id, f"{user_id}@example.com", 7)
+    for activity_id in activity_ids:
+        store.register(activity_id, user_id)
+
+
+def scheduler(store, inbox):
+    return ReminderScheduler(store, SMTPPool("127.0.0.1", inbox.port, rate=100, backoff=0.01))
+
+
+def test_one_email_per_user(inbox, db):
+    store = ActivityStore(db)
+    first, second = add_event(store, "Park clean-up"), add_event(store, "Food drive", days_ahead=5)
+    sign_up(store, "ana", first, second)
+    sign_up(store, "ben", first)
+    reminders = scheduler(store, inbox)
+    assert reminders.run_once() == 2
+    assert inbox.recipients() == ["ana@example.com", "ben@example.com"]
+    # Nothing is sent twice
+    assert reminders.run_once() == 0
+    assert len(inbox.envelopes) == 2
+
+
+def test_cancelled_registration_is_not_reminded(inbox, db):
+    store = ActivityStore(db)
+    activity_id = add_event(store, "Park clean-up")
+    sign_up(store, "ana", activity_id)
+    reminders = scheduler(store, inbox)
+    reminders.load(time.time())
+    store.cancel_registration(activity_id, "ana")
+    assert reminders._heap
+    assert reminders.send_due(float("inf")) == 0
+    assert inbox.envelopes == []
+
+
+def test_replicas_send_each_reminder_once(inbox, db):
+    store = ActivityStore(db)
+    users = [f"user{number}" for number in range(20)]
+    activity_ids = [add_event(store, f"Event {number}") for number in range(3)]
+    for user_id in users:
+        sign_up(store, user_id, *activity_ids)
+
+    # Two processes' schedulers sharing one database
+    replicas = [scheduler(ActivityStore(db), inbox) for _ in range(2)]
+    for replica in replicas:
+        replica.load(time.time())
+    start = threading.Barrier(len(replicas))
+    sent = []
+
+    def run(replica):
+        start.wait()
+        sent.append(replica.send_due(float("inf")))
+
+    threads = [threading.Thread(target=run, args=(replica,)) for replica in replicas]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(sent) == len(users)
+    assert inbox.recipients() == sorted(f"{user_id}@example.com" for user_id in users)
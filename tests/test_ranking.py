@@ -0,0 +1,30 @@
+"""For You ranking and its background-rebuilt snapshot."""
+import time
+
+from helpize.ranking import RankingSnapshot, UserProfile, rank
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def test_profile_ranks_its_cause_first():
+    rows = [(1, "Health", "2031-01-04", "City Hall", 0), (2, "Education", "2031-01-04", "City Hall", 0)]
+    snapshot = RankingSnapshot(lambda: rows)
+    profile = UserProfile([("Education", "City Hall", 1.0)])
+    assert rank(snapshot.columns, profile, k=2)[0] == 2
+
+
+def test_invalidate_rebuilds_in_the_background():
+    rows = [(1, "Health", "2031-01-04", "City Hall", 0)]
+    snapshot = RankingSnapshot(lambda: list(rows), refresh_interval=3600).start()
+    before = snapshot.columns
+    rows.append((2, "Health", "2031-01-05", "City Hall", 0))
+    # The old snapshot keeps serving until the rebuild is done
+    assert snapshot.columns is before
+    snapshot.invalidate()
+    assert wait_for(lambda: len(snapshot.columns) == 2)
+    assert snapshot.builds == 2
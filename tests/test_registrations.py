@@ -0,0 +1,70 @@
+"""Seat limits and the waitlist."""
+import threading
+
+import pytest
+
+from helpize.storage import REGISTERED, WAITLISTED, ActivityStore
+
+
+@pytest.fixture
+def db(tmp_path):
+    return str(tmp_path / "helpize.db")
+
+
+def add_event(store, capacity):
+    return store.add_activity({
+        "registration_link": "https://example.org/register",
+        "date": "2031-01-04",
+        "place": "City Hall",
+        "about_event": "Park clean-up",
+        "cause": "Environmental",
+        "poster": "poster.png",
+        "capacity": capacity,
+    })
+
+
+def test_concurrent_sign_ups_never_exceed_capacity(db):
+    activity_id = add_event(ActivityStore(db), capacity=5)
+    users = [f"user{number}" for number in range(20)]
+    start = threading.Barrier(len(users))
+    statuses = {}
+
+    def sign_up(user_id):
+        store = ActivityStore(db)
+        start.wait()
+        statuses[user_id] = store.register(activity_id, user_id)
+
+    threads = [threading.Thread(target=sign_up, args=(user_id,)) for user_id in users]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert list(statuses.values()).count(REGISTERED) == 5
+    assert list(statuses.values()).count(WAITLISTED) == 15
+    summary = ActivityStore(db).registration_summary([activity_id])[activity_id]
+    assert (summary["registered"], summary["waitlisted"]) == (5, 15)
+
+
+def test_cancel_promotes_the_first_waitlisted_user(db):
+    store = ActivityStore(db)
+    activity_id = add_event(store, capacity=1)
+    assert store.register(activity_id, "ana") == REGISTERED
+    assert store.register(activity_id, "ben") == WAITLISTED
+    assert store.register(activity_id, "cy") == WAITLISTED
+    assert store.register(activity_id, "ana") == REGISTERED  # registering twice changes nothing
+    assert store.cancel_registration(activity_id, "ana") == "ben"
+    summary = store.registration_summary([activity_id], "ben")[activity_id]
+    assert (summary["registered"], summary["waitlisted"], summary["status"]) == (1, 1, REGISTERED)
+
+
+def test_cancel_without_waitlist_frees_the_seat(db):
+    store = ActivityStore(db)
+    activity_id = add_event(store, capacity=1)
+    store.register(activity_id, "ana")
+    # Leaving the waitlist doesn't free a seat
+    store.register(activity_id, "ben")
+    assert store.cancel_registration(activity_id, "ben") is None
+    assert store.registration_summary([activity_id])[activity_id]["registered"] == 1
+    assert store.cancel_registration(activity_id, "ana") is None
+    assert store.registration_summary([activity_id])[activity_id]["registered"] == 0
+    assert store.register(activity_id, "cy") == REGISTERED
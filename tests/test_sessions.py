@@ -0,0 +1,41 @@
+"""Which parts of a shared session snapshot a tab gets back."""
+import secrets
+
+from helpize.sessions import BINDING_COOKIE, BINDING_KEY, browser_binding, restorable
+
+
+def xsrf_cookie(token, timestamp=1700000000):
+    """A version 2 XSRF cookie as Streamlit writes it, freshly masked."""
+    mask = secrets.token_bytes(4)
+    masked = bytes(byte ^ mask[index % 4] for index, byte in enumerate(token))
+    return f"2|{mask.hex()}|{masked.hex()}|{timestamp}"
+
+
+def snapshot(binding):
+    return {"menu": "Profile", "permission": "Accepted", "user_id": "u1", "moderator_id": "m1", BINDING_KEY: binding}
+
+
+def test_binding_survives_remasking():
+    token = secrets.token_bytes(16)
+    first = browser_binding({BINDING_COOKIE: xsrf_cookie(token)})
+    assert first == browser_binding({BINDING_COOKIE: xsrf_cookie(token)})
+    assert first != browser_binding({BINDING_COOKIE: xsrf_cookie(secrets.token_bytes(16))})
+    assert browser_binding({}) is None
+
+
+def test_same_browser_gets_identities_back():
+    binding = browser_binding({BINDING_COOKIE: xsrf_cookie(secrets.token_bytes(16))})
+    restored, owned = restorable(snapshot(binding), binding)
+    assert owned
+    assert restored == {"menu": "Profile", "permission": "Accepted", "user_id": "u1", "moderator_id": "m1"}
+
+
+def test_other_browser_gets_navigation_only():
+    owner = browser_binding({BINDING_COOKIE: xsrf_cookie(secrets.token_bytes(16))})
+    other = browser_binding({BINDING_COOKIE: xsrf_cookie(secrets.token_bytes(16))})
+    for binding in (other, None):
+        restored, owned = restorable(snapshot(owner), binding)
+        assert not owned
+        assert restored == {"menu": "Profile", "permission": "Accepted"}
+    # Snapshots saved without a cookie never hand out identities
+    assert restorable(snapshot(None), None) == ({"menu": "Profile", "permission": "Accepted"}, False)
@@ -0,0 +1,142 @@
+"""Activity rows read back from the store."""
+import pytest
+
+from helpize.storage import ACTIVITY_COLUMNS, DENIED, PRIVATE, ActivityStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ActivityStore(str(tmp_path / "helpize.db"))
+
+
+def add_event(store, date="2031-01-04", cause="Environmental", **fields):
+    return store.add_activity({
+        "registration_link": "https://example.org/register",
+        "date": date,
+        "place": "City Hall",
+        "about_event": "Park clean-up",
+        "cause": cause,
+        "poster": "poster.png",
+        **fields,
+    })
+
+
+@pytest.fixture
+def activity(store):
+    return store.get_activity(add_event(store))
+
+
+def test_activity_reads_like_a_dict(activity):
+    assert activity["place"] == "City Hall"
+    assert set(activity) == set(ACTIVITY_COLUMNS)
+    assert dict(activity)["cause"] == "Environmental"
+
+
+@pytest.mark.parametrize("key", ["keys", "get", "__class__", "__slots__", "from_cursor", "_columns", 1])
+def test_only_columns_are_keys(activity, key):
+    assert key not in activity
+    assert activity.get(key) is None
+    with pytest.raises(KeyError):
+        activity[key]
+
+
+
+# ---------- PAGING AND SEARCH ----------
+def test_keyset_pages_cover_every_listed_post_once(store):
+    ids = [add_event(store, cause=cause) for cause in ["Environmental", "Health"] * 6]
+    add_event(store, visibility=PRIVATE)
+    pages, before_id = [], None
+    while True:
+        page = [activity["id"] for activity in store.list_activities(limit=5, before_id=before_id)]
+        if not page:
+            break
+        pages.append(page)
+        before_id = page[-1]
+    assert [len(page) for page in pages] == [5, 5, 2]
+    assert [activity_id for page in pages for activity_id in page] == ids[::-1]
+    assert [activity["id"] for activity in store.list_activities(cause="Health", limit=2, before_id=ids[-1])] \
+        == [ids[-3], ids[-5]]
+    assert [activity["id"] for activity in store.list_activities(after_id=ids[-3])] == ids[-2:]
+
+
+def test_search_matches_prefixes_of_public_posts(store):
+    park = add_event(store)
+    add_event(store, about_event="Food drive", place="Town Hall", cause="Health")
+    add_event(store, visibility=PRIVATE)
+    assert [activity["id"] for activity in store.search_activities("park cle")] == [park]
+    assert [activity["cause"] for activity in store.search_activities("health")] == ["Health"]
+    assert store.search_activities('"); DROP TABLE activities; --') == []
+    assert store.search_activities("   ") == []
+
+
+# ---------- ROLLUPS ----------
+def update(store, activity_id, **columns):
+    conn = store._connect()
+    with conn:
+        conn.execute(f"UPDATE activities SET {', '.join(f'{column} = ?' for column in columns)} WHERE id = ?",
+                     (*columns.values(), activity_id))
+
+
+def assert_rollups_match_rebuild(store):
+    dimensions = ("cause", "place", "month", "day", "submitted")
+    triggered = {dimension: store.rollup(dimension) for dimension in dimensions}
+    store.rebuild_rollups()
+    assert triggered == {dimension: store.rollup(dimension) for dimension in dimensions}
+
+
+def test_insert_counts_only_public_listed_posts(store):
+    add_event(store)
+    add_event(store, cause="Health")
+    add_event(store, visibility=PRIVATE)
+    assert store.rollup("cause") == [("Environmental", 1), ("Health", 1)]
+    assert store.rollup("day") == [("2031-01-04", 2)]
+    assert_rollups_match_rebuild(store)
+
+
+def test_update_moves_counts_between_buckets(store):
+    activity_id = add_event(store)
+    update(store, activity_id, date="2031-02-10", cause="Health")
+    assert store.rollup("month") == [("2031-02", 1)]
+    assert store.rollup("cause") == [("Health", 1)]
+    assert_rollups_match_rebuild(store)
+
+
+def test_denial_and_visibility_changes(store):
+    denied, hidden = add_event(store), add_event(store)
+    store.claim_pending("mod", visibility=None)
+    store.review_posts([denied], "mod", DENIED)
+    update(store, hidden, visibility=PRIVATE)
+    assert store.rollup("cause") == []
+    update(store, hidden, visibility="Public")
+    assert store.rollup("cause") == [("Environmental", 1)]
+    assert_rollups_match_rebuild(store)
+
+
+def test_delete_uncounts_only_counted_posts(store):
+    public, private = add_event(store), add_event(store, visibility=PRIVATE)
+    add_event(store)
+    conn = store._connect()
+    with conn:
+        conn.execute("DELETE FROM activities WHERE id IN (?, ?)", (public, private))
+    assert store.rollup("cause") == [("Environmental", 1)]
+    assert_rollups_match_rebuild(store)
+
+
+def test_old_triggers_are_replaced_on_open(tmp_path):
+    path = str(tmp_path / "helpize.db")
+    store = ActivityStore(path)
+    conn = store._connect()
+    with conn:
+        # The trigger as it was before private posts were left out
+        conn.execute("DROP TRIGGER activity_rollups_insert")
+        conn.execute(
+            "CREATE TRIGGER activity_rollups_insert AFTER INSERT ON activities WHEN new.status != 'denied' BEGIN "
+            "INSERT INTO activity_rollups (dimension, bucket, count) VALUES ('cause', new.cause, 1) "
+            "ON CONFLICT (dimension, bucket) DO UPDATE SET count = count + excluded.count; END"
+        )
+    add_event(store, visibility=PRIVATE)
+    assert store.rollup("cause") == [("Environmental", 1)]
+    reopened = ActivityStore(path)
+    assert reopened.rollup("cause") == []
+    add_event(reopened, visibility=PRIVATE)
+    assert reopened.rollup("cause") == []